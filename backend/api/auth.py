@@ -1,7 +1,10 @@
+import logging
 from fastapi import APIRouter, HTTPException, status
-from core.config import supabase
+from core.database import get_db
 from model.models import UserSignupSchema, UserLoginSchema, TokenResponse
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/auth",
     tags=["Authentication"]
@@ -11,8 +14,10 @@ router = APIRouter(
 @router.post("/signup", status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserSignupSchema):
     try:
+        db = await get_db()
+
         # Supabase Auth 회원가입 요청
-        auth_response = supabase.auth.sign_up({
+        auth_response = await db.auth.sign_up({
             "email": user_data.email,
             "password": user_data.password,
             "options": {
@@ -36,8 +41,10 @@ async def signup(user_data: UserSignupSchema):
 @router.post("/login", response_model=TokenResponse)
 async def login(user_data: UserLoginSchema):
     try:
+        db = await get_db()
+
         # Supabase Auth 로그인 요청
-        auth_response = supabase.auth.sign_in_with_password({
+        auth_response = await db.auth.sign_in_with_password({
             "email": user_data.email,
             "password": user_data.password
         })
@@ -53,7 +60,7 @@ async def login(user_data: UserLoginSchema):
 
     except Exception as e:
         # 보안을 위해 에러 메시지는 모호하게 처리하거나 로그로 남김
-        print(f"Login Error: {str(e)}")
+        logger.warning("Login Error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, 
             detail="Invalid email or password"
@@ -1,8 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import List
-from core.config import supabase
+from postgrest.exceptions import APIError
+from core.database import get_db
 from core.dependencies import get_current_user_id
-from model.models import FavoriteToggleRequest, FavoriteResponse, RoomDetail
+from core.room_status import live_statuses
+from model.models import (
+    FavoriteToggleRequest,
+    FavoriteBatchRequest,
+    FavoriteBatchResponse,
+    FavoriteResponse,
+    RoomAvailability,
+    RoomDetail,
+)
+
+# Postgres foreign_key_violation (없는 room_id)
+FOREIGN_KEY_VIOLATION = "23503"
 
 router = APIRouter(
     prefix="/favorites",
@@ -18,40 +30,73 @@ async def toggle_favorite(
     하트 버튼 클릭 시 호출:
     - 이미 즐겨찾기 되어 있으면 -> 삭제 (Unfavorite)
     - 없으면 -> 추가 (Favorite)
+
+    toggle_favorite DB 함수가 한 번의 호출로 원자적으로 처리합니다 (연타해도 PK 충돌 없음).
     """
     try:
-        # 1. 기존 존재 여부 확인
-        check_res = supabase.table("favorites")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .eq("room_id", req.room_id)\
-            .execute()
+        db = await get_db()
+
+        res = await db.rpc("toggle_favorite", {"p_user_id": user_id, "p_room_id": req.room_id}).execute()
+        favorited = bool(res.data)
 
-        if check_res.data:
-            # 존재하면 삭제
-            supabase.table("favorites")\
-                .delete()\
-                .eq("user_id", user_id)\
-                .eq("room_id", req.room_id)\
-                .execute()
-            return {"status": "removed", "message": "Favorites removed"}
-        else:
-            # 없으면 추가
-            supabase.table("favorites")\
-                .insert({"user_id": user_id, "room_id": req.room_id})\
-                .execute()
-            return {"status": "added", "message": "Favorites added"}
+        if favorited:
+            return {"status": "added", "message": "Favorites added", "favorited": True}
+        return {"status": "removed", "message": "Favorites removed", "favorited": False}
+
+    except APIError as e:
+        if e.code == FOREIGN_KEY_VIOLATION:
+            raise HTTPException(status_code=404, detail="Room not found")
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batch", response_model=FavoriteBatchResponse)
+async def update_favorites_batch(
+    req: FavoriteBatchRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    여러 강의실을 한 번에 즐겨찾기 추가/삭제합니다 (예: 학생 시간표의 강의실 일괄 등록).
+    set_favorites DB 함수 한 번으로 처리하며, 실제로 바뀐 room_id 만 반환합니다.
+    """
+    if not req.add and not req.remove:
+        return FavoriteBatchResponse(added=[], removed=[])
+
+    try:
+        db = await get_db()
+
+        res = await db.rpc("set_favorites", {
+            "p_user_id": user_id,
+            "p_add": sorted(set(req.add)),
+            "p_remove": sorted(set(req.remove)),
+        }).execute()
+
+        changed = res.data or []
+        return FavoriteBatchResponse(
+            added=sorted(row["room_id"] for row in changed if row["favorited"]),
+            removed=sorted(row["room_id"] for row in changed if not row["favorited"]),
+        )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("", response_model=List[FavoriteResponse])
-async def get_my_favorites(user_id: str = Depends(get_current_user_id)):
+async def get_my_favorites(
+    include_status: bool = Query(False, description="현재 상태·다음 변경 시각·오늘 빈 시간을 함께 반환"),
+    user_id: str = Depends(get_current_user_id)
+):
     """
     내 즐겨찾기 목록 조회 (방 상세 정보 포함)
+
+    include_status=true 이면 강의실마다 availability(현재 상태, 다음 변경 시각, 오늘 빈 시간)를 포함합니다.
+    모든 즐겨찾기를 메모리 시간표 인덱스 + 예약 쿼리 한 번으로 계산하므로,
+    앱이 강의실마다 /info/room/timetable/free-slots 를 호출할 필요가 없습니다.
     """
     try:
+        db = await get_db()
+
         # Supabase JOIN 문법: rooms 테이블과 그 안의 buildings 테이블까지 참조
         query = """
             user_id, room_id, created_at,
@@ -60,7 +105,7 @@ async def get_my_favorites(user_id: str = Depends(get_current_user_id)):
                 buildings ( code )
             )
         """
-        response = supabase.table("favorites")\
+        response = await db.table("favorites")\
             .select(query)\
             .eq("user_id", user_id)\
             .execute()
@@ -85,7 +130,12 @@ async def get_my_favorites(user_id: str = Depends(get_current_user_id)):
                 created_at=item["created_at"],
                 room=room_detail
             ))
-            
+
+        if include_status and results:
+            statuses = await live_statuses(item.room_id for item in results)
+            for item in results:
+                item.availability = RoomAvailability(**statuses[item.room_id])
+
         return results
 
     except Exception as e:
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from core.warmup import warmup
+
+router = APIRouter(
+    tags=["Health"]
+)
+
+
+@router.get("/healthz", include_in_schema=False)
+def liveness():
+    """프로세스가 살아 있으면 200 (재시작 판단용, 예열 여부와 무관)."""
+    return {"status": "ok"}
+
+
+@router.get("/readyz", include_in_schema=False)
+def readiness():
+    """예열(카탈로그·시간표 인덱스·점유 비트맵)이 끝났으면 200, 아니면 503 + 단계별 진행 상황. 로드밸런서 트래픽 투입 기준."""
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.status())
@@ -1,13 +1,35 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional, Dict
-from core.config import supabase
-from datetime import time, datetime
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from typing import List, Optional, Dict, Tuple
+from core.catalog import get_catalog, normalize_building_code, normalize_room_number
+from core.http_cache import json_serializer, response_cache
+from core.coalesce import single_flight
+from core.snapshot import SNAPSHOT_FORMATS, build_snapshot, serialize_snapshot, snapshot_version
+from core.occupancy import (
+    DAYS,
+    DEFAULT_START_TIME,
+    DEFAULT_END_TIME,
+    get_occupancy_index,
+    to_minutes,
+    format_minutes,
+)
+from core.availability_matrix import SlotQuery, get_availability_matrix, parse_slot
+from core.schedule import busy_between, free_slots_between, overlaps, validate_range
+from core.availability_rpc import rooms_free_for_slots, room_free_slots
+from core.config import AVAILABILITY_BACKEND
+from core.notification_scheduler import KST, occupied_room_ids
+from core.room_search import search_rooms
+from datetime import date, datetime, time
 from model.models import (
     BuildingResponse,
     RoomResponse,
     TimetableEntryResponse,
     FreeSlotDto,
-    FreeSlotsResponseDto
+    FreeSlotsResponseDto,
+    RoomSearchResult
 )
 
 router = APIRouter(
@@ -15,22 +37,76 @@ router = APIRouter(
     tags=["Public Info"]
 )
 
-# 전체 강의실 사용 가능 시간대
-DEFAULT_START_TIME = time(9, 0)   # 09:00
-DEFAULT_END_TIME = time(20, 0)    # 20:00
+# 캐시된 응답을 response_model 과 같은 형태로 직렬화하기 위한 어댑터
+BUILDINGS_JSON = json_serializer(TypeAdapter(List[BuildingResponse]))
+ROOMS_JSON = json_serializer(TypeAdapter(List[RoomResponse]))
+TIMETABLE_JSON = json_serializer(TypeAdapter(List[TimetableEntryResponse]))
+
+
+def _date_range(start_date: Optional[date], end_date: Optional[date]) -> Optional[Tuple[date, date]]:
+    """start_date / end_date 쿼리를 검증합니다. 날짜 조회가 아니면 None, 잘못된 기간이면 400."""
+    if start_date is None:
+        if end_date is not None:
+            raise HTTPException(status_code=400, detail="end_date requires start_date")
+        return None
+    end_date = end_date or start_date
+    try:
+        validate_range(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return start_date, end_date
+
+
+def _format_by_date(by_date: Dict[date, List[Tuple[int, int]]]) -> Dict[str, List[dict]]:
+    return {
+        day.isoformat(): [{"start": format_minutes(s), "end": format_minutes(e)} for s, e in slots]
+        for day, slots in sorted(by_date.items())
+    }
+
+
+async def _free_slots_between(room_ids: List[int], start_date: date, end_date: date, window_start: int, window_end: int, min_duration: int = 0):
+    """날짜별 빈 시간: AVAILABILITY_BACKEND 에 따라 room_free_slots RPC 한 번 또는 주 단위 캐시 엔진."""
+    if AVAILABILITY_BACKEND == "rpc":
+        return await room_free_slots(room_ids, start_date, end_date, window_start, window_end, min_duration)
+    return await free_slots_between(room_ids, start_date, end_date, window_start, window_end, min_duration)
+
+
+def _available_room(room: dict) -> dict:
+    return {
+        "room_id": room["id"], # room_id는 int 타입이므로 room["id"]로 수정 (AvailableRoomDto의 room_id는 Int)
+        "building_code": room["building_code"],
+        "room_number": room["room_number"]
+    }
+
+
+async def resolve_room(building_code: str, room_number: str) -> dict:
+    """
+    메모리 카탈로그에서 (building_code, room_number) 로 강의실을 찾습니다. 없으면 404.
+    """
+    catalog = await get_catalog()
+
+    if catalog.building(building_code) is None:
+        raise HTTPException(status_code=404, detail=f"Building code '{building_code.strip()}' not found")
+
+    room = catalog.room(building_code, room_number)
+    if room is None:
+        raise HTTPException(status_code=404, detail=f"Room '{room_number.strip()}' in {building_code.strip()} not found")
+    return room
 
 
 # ----------------------------------------
 # GET /info/buildings
 # ----------------------------------------
 @router.get("/buildings", response_model=List[BuildingResponse])
-async def get_buildings():
+async def get_buildings(request: Request):
     """
-    모든 건물 목록을 조회합니다.
+    모든 건물 목록을 조회합니다. (메모리 카탈로그, ETag 지원)
     """
     try:
-        response = supabase.table("buildings").select("*").order("code").execute()
-        return response.data
+        catalog = await get_catalog()
+        return await response_cache.respond(
+            request, ("buildings",), catalog.version, lambda: catalog.buildings, BUILDINGS_JSON
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -39,48 +115,30 @@ async def get_buildings():
 # ----------------------------------------
 @router.get("/rooms", response_model=List[RoomResponse])
 async def get_rooms(
+    request: Request,
     building_code: Optional[str] = Query(None, description="특정 건물 코드로 필터링")
 ):
     """
     강의실 목록을 조회하며, building_code로 필터링할 수 있습니다.
+    카탈로그의 강의실 항목에는 building 객체와 building_code가 이미 포함되어 있습니다. (ETag 지원)
     """
-    # 💡 [수정] building_id를 명시적으로 쿼리 목록에 추가합니다.
-    query = "*, building:buildings(id, code, name)"
-
     try:
-        if building_code:
-            # 1. 🏢 building_code를 사용하여 building_id를 조회합니다.
-            building_code = building_code.strip()
-            building_res = supabase.table("buildings").select("id").eq("code", building_code).single().execute()
-            
-            # 조회 결과가 없다면 404 반환
-            if not building_res.data:
-                 raise HTTPException(status_code=404, detail=f"Building code {building_code} not found")
-                 
-            target_building_id = building_res.data['id']
-            
-            # 2. 🎯 rooms 테이블의 building_id를 기준으로 필터링합니다.
-            #    이는 Supabase에게 명시적인 WHERE 절 필터링을 지시합니다.
-            response = supabase.table("rooms").select(query).eq("building_id", target_building_id).execute()
-        else:
-            # 필터링이 없으면 전체 조회
-            response = supabase.table("rooms").select(query).execute()
-        
-        data = response.data
-
-        # 💡 [추가] 데이터 후처리: building 객체에서 code를 꺼내 building_code로 격상
-        for item in data:
-            if item.get("building"):
-                item["building_code"] = item["building"]["code"]
-        
-        return data
+        catalog = await get_catalog()
+
+        rooms = catalog.rooms_in(building_code or None)
+
+        # 조회 결과가 없다면 404 반환
+        if rooms is None:
+            raise HTTPException(status_code=404, detail=f"Building code {building_code.strip()} not found")
+
+        key = ("rooms", normalize_building_code(building_code) if building_code else None)
+        return await response_cache.respond(request, key, catalog.version, lambda: rooms, ROOMS_JSON)
 
     except HTTPException as e:
         # 404 오류는 그대로 반환
         raise e
     except Exception as e:
         # 기타 DB 연결 오류 등은 500으로 처리
-        # print(e) # 디버깅용 로그
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 # ----------------------------------------
@@ -95,71 +153,32 @@ async def get_room_by_identifier(
     """
     건물 코드와 강의실 번호를 사용하여 특정 강의실의 상세 정보를 조회합니다.
     """
-    
-    # 쿼리: 모든 필드(*)와 JOIN된 building 객체를 모두 요청
-    query = "*, building:buildings(id, code, name)"
-
     try:
-        # 1. 🏢 building_code를 사용하여 building_id를 조회합니다.
-        if building_code:
-            building_code = building_code.strip()
-            building_res = supabase.table("buildings").select("id").eq("code", building_code).single().execute()
-        
-        if not building_res.data:
-             raise HTTPException(status_code=404, detail=f"Building code '{building_code}' not found")
-             
-        target_building_id = building_res.data['id']
-        
-        # 2. 🎯 building_id와 room_number를 기준으로 정확히 하나의 강의실을 조회합니다.
-        response = supabase.table("rooms")\
-            .select(query)\
-            .eq("building_id", target_building_id)\
-            .eq("room_number", room_number)\
-            .single()\
-            .execute()
-        
-        if not response.data:
-             raise HTTPException(status_code=404, detail=f"Room {room_number} in {building_code} not found")
-             
-        # single()을 사용했으므로 데이터는 딕셔너리 하나입니다.
-        return response.data
+        return await resolve_room(building_code, room_number)
 
     except HTTPException as e:
         # 404 오류는 그대로 반환
         raise e
     except Exception as e:
-        # 기타 DB 연결 오류 또는 single()이 여러 결과를 반환했을 경우 500 처리
-        # print(e) 
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
 # ----------------------------------------
 # GET /info/room/{room_id} (ID로 상세 조회)
 # ----------------------------------------
-@router.get("/room/{room_id}", response_model=RoomResponse)
+@router.get("/room/{room_id:int}", response_model=RoomResponse)
 async def get_room_by_id(
     room_id: int
 ):
     """
     Room ID(Primary Key)를 사용하여 강의실 상세 정보를 조회합니다.
     """
-    query = "*, building:buildings(id, code, name)"
-
     try:
-        # room_id를 기준으로 조회
-        response = supabase.table("rooms")\
-            .select(query)\
-            .eq("id", room_id)\
-            .single()\
-            .execute()
-        
-        data = response.data
+        catalog = await get_catalog()
+
+        data = catalog.rooms_by_id.get(room_id)
         if not data:
              raise HTTPException(status_code=404, detail=f"Room ID {room_id} not found")
 
-        # 💡 [추가] 데이터 후처리: building_code 평탄화
-        if data.get("building"):
-            data["building_code"] = data["building"]["code"]
-             
         return data
 
     except HTTPException as e:
@@ -172,47 +191,74 @@ async def get_room_by_id(
 # ----------------------------------------
 @router.get("/room/timetable", response_model=List[TimetableEntryResponse])
 async def get_timetable_by_room(
+    request: Request,
     building_code: str = Query(..., description="조회할 건물 코드"),
     room_number: str = Query(..., description="조회할 강의실 번호")
 ):
     """
-    특정 강의실의 전체 시간표 조회
+    특정 강의실의 전체 시간표 조회 (메모리 시간표 인덱스, ETag 지원)
     """
     try:
-        # 1. building_code -> building_id
-        building_code = building_code.strip()
-        building_res = supabase.table("buildings").select("id").eq("code", building_code).single().execute()
-        if not building_res.data:
-            raise HTTPException(status_code=404, detail=f"Building code '{building_code}' not found")
-        building_id = building_res.data['id']
-
-        # 2. room_number -> room_id
-        room_number = room_number.strip()
-        room_res = supabase.table("rooms")\
-            .select("id")\
-            .eq("building_id", building_id)\
-            .eq("room_number", room_number)\
-            .single()\
-            .execute()
-        if not room_res.data:
-            raise HTTPException(status_code=404, detail=f"Room '{room_number}' in {building_code} not found")
-        room_id = room_res.data['id']
-
-        # 3. room_id -> timetable_entries 조회
-        timetable_res = supabase.table("timetable_entries")\
-            .select("*")\
-            .eq("room_id", room_id)\
-            .order("day")\
-            .order("start_time")\
-            .execute()
-
-        return timetable_res.data
+        # 1. (building_code, room_number) -> room_id (메모리 카탈로그)
+        room = await resolve_room(building_code, room_number)
+        room_id = room['id']
+
+        # 2. room_id -> 요일·시작 시간 순으로 정렬된 시간표
+        index = await get_occupancy_index()
+        return await response_cache.respond(
+            request,
+            ("room_timetable", room_id),
+            index.version,
+            lambda: index.entries_by_room.get(room_id, []),
+            TIMETABLE_JSON,
+        )
 
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
+
+async def _room_free_slots(building_code: str, room_number: str, start_time: time, end_time: time, date_range: Optional[Tuple[date, date]]):
+    """한 강의실의 요일별 (+ 날짜별) 빈 시간 계산. 결과는 동시 요청 사이에 공유됩니다."""
+    # 1. (building_code, room_number) -> room_id (메모리 카탈로그)
+    room = await resolve_room(building_code, room_number)
+    room_id = room["id"]
+
+    # 2. 메모리 시간표 인덱스에서 요일별 빈 시간 계산
+    index = await get_occupancy_index()
+    window_start = to_minutes(start_time)
+    window_end = to_minutes(end_time)
+
+    days = ["월", "화", "수", "목", "금"]
+
+    # free slots per day
+    free_slots_by_day = {}
+
+    for day in days:
+        free_slots_by_day[day] = [
+            {"start": format_minutes(s), "end": format_minutes(e)}
+            for s, e in index.free_slots(room_id, day, window_start, window_end)
+        ]
+
+    # 3. 날짜별 빈 시간 (요일 시간표를 날짜에 펼치고 확정 예약과 병합)
+    free_slots_by_date = None
+    if date_range:
+        by_date = await _free_slots_between([room_id], *date_range, window_start, window_end)
+        free_slots_by_date = _format_by_date(by_date[room_id])
+
+    # 🔥 프론트 기대 형태로 변환
+    result = [
+        FreeSlotsResponseDto(
+            building_code=room["building_code"],
+            room_number=room["room_number"],
+            free_slots_by_day=free_slots_by_day,
+            free_slots_by_date=free_slots_by_date
+            )]
+
+    return result
+
+
 # ----------------------------------------
 # GET /info/room/timetable/free-slots
 # ----------------------------------------
@@ -221,212 +267,316 @@ async def get_free_slots_by_room(
     building_code: str = Query(..., description="조회할 건물 코드"),
     room_number: str = Query(..., description="조회할 강의실 번호"),
     start_time: time = Query(DEFAULT_START_TIME, description="조회 시작 시간"),
-    end_time: time = Query(DEFAULT_END_TIME, description="조회 종료 시간")
+    end_time: time = Query(DEFAULT_END_TIME, description="조회 종료 시간"),
+    start_date: Optional[date] = Query(None, description="날짜별 빈 시간 시작일 (예약 반영, 예: 2025-03-03)"),
+    end_date: Optional[date] = Query(None, description="날짜별 빈 시간 종료일 (생략 시 start_date 하루)")
 ):
+    """
+    요일별 빈 시간(free_slots_by_day). start_date 를 주면 그 기간의 실제 날짜별 빈 시간
+    (확정 예약 반영, free_slots_by_date)도 함께 반환합니다.
+    """
+    date_range = _date_range(start_date, end_date)
+    key = (normalize_building_code(building_code), normalize_room_number(room_number), start_time, end_time, date_range)
     try:
-        # 1. building_code -> building_id
-        building_code = building_code.strip()
-        building_res = (
-            supabase.table("buildings")
-            .select("id")
-            .eq("code", building_code)
-            .maybe_single()
-            .execute()
-        )
-
-        if not getattr(building_res, "data", None):
-            raise HTTPException(status_code=404, detail=f"Building code '{building_code}' not found")
-
-        building_id = building_res.data["id"]
-
-        # 2. room_number -> room_id
-        room_number = room_number.strip()
-        room_res = (
-            supabase.table("rooms")
-            .select("id")
-            .eq("building_id", building_id)
-            .eq("room_number", room_number)
-            .maybe_single()
-            .execute()
-        )
-
-        if not getattr(room_res, "data", None):
-            raise HTTPException(status_code=404, detail=f"Room '{room_number}' in {building_code} not found")
+        # 같은 파라미터의 동시 요청은 한 번만 계산 (core/coalesce.py)
+        return await single_flight.run("room_free_slots", key, lambda: _room_free_slots(building_code, room_number, start_time, end_time, date_range))
 
-        room_id = room_res.data["id"]
-
-        # 3. timetable entries (0 rows allowed)
-        timetable_res = (
-            supabase.table("timetable_entries")
-            .select("day,start_time,end_time")
-            .eq("room_id", room_id)
-            .order("day")
-            .order("start_time")
-            .execute()
-        )
-
-        occupied_entries = timetable_res.data or []
-
-        days = ["월", "화", "수", "목", "금"]
-
-        # free slots per day
-        free_slots_by_day = {}
-
-        for day in days:
-            day_entries = [e for e in occupied_entries if e["day"] == day]
+    except HTTPException:
+        raise
 
-            current_start = start_time
-            free_slots = []
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-            for entry in day_entries:
-                entry_start = datetime.strptime(entry["start_time"], "%H:%M:%S").time()
-                entry_end = datetime.strptime(entry["end_time"], "%H:%M:%S").time()
+# ----------------------------------------
+# GET /info/rooms/free-slots
+# ----------------------------------------
+@router.get("/rooms/free-slots")
+async def get_free_slots_by_building(
+    building_code: Optional[str] = Query(None, description="건물 코드 (예: 310)"),
+    room_ids: Optional[List[int]] = Query(None, description="강의실 ID 목록 (building_code 대신 또는 함께)"),
+    days: List[str] = Query(["월", "화", "수", "목", "금"], description="요일 필터 (예: 월, 수)"),
+    start_time: time = Query(DEFAULT_START_TIME, description="조회 시작 시간"),
+    end_time: time = Query(DEFAULT_END_TIME, description="조회 종료 시간"),
+    min_duration: int = Query(0, ge=0, le=24 * 60, description="이 시간(분)보다 짧은 빈 시간은 제외"),
+    start_date: Optional[date] = Query(None, description="날짜별 빈 시간 시작일 (예약 반영)"),
+    end_date: Optional[date] = Query(None, description="날짜별 빈 시간 종료일 (생략 시 start_date 하루)")
+):
+    """
+    건물 전체(또는 강의실 목록)의 요일별 빈 시간을 한 번에 계산해 NDJSON 으로 스트리밍합니다.
+    한 줄 = 강의실 하나: {"room_id", "building_code", "room_number", "free_slots_by_day": {요일: [{start, end}]}}
 
-                if entry_end <= current_start:
-                    continue
+    시간표는 (room_id, day) 별로 병합된 메모리 인덱스에서 읽으므로 DB 조회 없이 그룹마다 한 번씩만 훑습니다.
+    start_date 를 주면 free_slots_by_day 대신 free_slots_by_date({"YYYY-MM-DD": [...]}, days 에 해당하는
+    날짜만, 확정 예약 반영)를 내려주며, 예약은 모든 강의실에 대해 주마다 한 번만 조회합니다.
+    """
+    date_range = _date_range(start_date, end_date)
+    if building_code is None and not room_ids:
+        raise HTTPException(status_code=400, detail="building_code or room_ids is required")
+    invalid = [day for day in days if day.strip() not in DAYS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid day '{invalid[0]}'")
+    days = [day.strip() for day in days]
 
-                if entry_start > current_start:
-                    free_slots.append({
-                        "start": current_start.strftime("%H:%M"),
-                        "end": entry_start.strftime("%H:%M"),
-                    })
+    try:
+        catalog, index = await asyncio.gather(get_catalog(), get_occupancy_index())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-                if entry_end > current_start:
-                    current_start = entry_end
+    # 1) 대상 강의실 (메모리 카탈로그)
+    if building_code is not None:
+        room_list = catalog.rooms_in(building_code)
+        if room_list is None:
+            raise HTTPException(status_code=404, detail=f"Building code '{building_code.strip()}' not found")
+        if room_ids:
+            wanted = set(room_ids)
+            room_list = [room for room in room_list if room["id"] in wanted]
+    else:
+        room_list = [catalog.rooms_by_id[room_id] for room_id in dict.fromkeys(room_ids) if room_id in catalog.rooms_by_id]
+    if not room_list:
+        raise HTTPException(status_code=404, detail="No matching rooms")
+
+    window_start = to_minutes(start_time)
+    window_end = to_minutes(end_time)
+
+    by_date = None
+    if date_range:
+        room_id_list = [room["id"] for room in room_list]
+        key = (tuple(room_id_list), date_range, window_start, window_end, min_duration)
+        try:
+            by_date = await single_flight.run(
+                "building_free_slots",
+                key,
+                lambda: _free_slots_between(room_id_list, *date_range, window_start, window_end, min_duration),
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-            if current_start < end_time:
-                free_slots.append({
-                    "start": current_start.strftime("%H:%M"),
-                    "end": end_time.strftime("%H:%M"),
+    # 2) 강의실마다 한 줄씩 스트리밍 (첫 바이트를 기다리지 않고 바로 그리기 시작할 수 있음)
+    async def lines():
+        for room in room_list:
+            line = {
+                "room_id": room["id"],
+                "building_code": room["building_code"],
+                "room_number": room["room_number"],
+            }
+            if by_date is not None:
+                line["free_slots_by_date"] = _format_by_date({
+                    day: slots for day, slots in by_date[room["id"]].items() if DAYS[day.weekday()] in days
                 })
-
-            free_slots_by_day[day] = free_slots
-
-        # 🔥 프론트 기대 형태로 변환
-        result = [
-            FreeSlotsResponseDto(
-                building_code=building_code,
-                room_number=room_number,
-                free_slots_by_day=free_slots_by_day
-                )]
-
-        return result
-
-    except HTTPException:
-        raise
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+            else:
+                line["free_slots_by_day"] = {
+                    day: [
+                        {"start": format_minutes(s), "end": format_minutes(e)}
+                        for s, e in index.free_slots(room["id"], day, window_start, window_end, min_duration)
+                    ]
+                    for day in days
+                }
+            yield json.dumps(line, ensure_ascii=False).encode() + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def _available_rooms(room_list: List[dict], requested: List[SlotQuery], on_date: Optional[date]) -> List[dict]:
+    """후보 강의실 중 요청한 슬롯(과 날짜의 예약)이 모두 비어 있는 강의실. 결과는 동시 요청 사이에 공유됩니다."""
+    # 3-a) rpc: 후보 강의실 × 슬롯 (× 날짜의 예약) 판정을 DB 에서 한 번에
+    if AVAILABILITY_BACKEND == "rpc":
+        free_ids = {
+            row["room_id"]
+            for row in await rooms_free_for_slots(requested, room_ids=[room["id"] for room in room_list], on_date=on_date)
+        }
+        return [_available_room(room) for room in room_list if room["id"] in free_ids]
+
+    # 3) 점유 비트맵으로 모든 방 × 모든 슬롯을 한 번에 판정
+    matrix = await get_availability_matrix()
+    free = matrix.free_for_all([room["id"] for room in room_list], requested)
+    candidates = [room for room, is_free in zip(room_list, free) if is_free]
+
+    # 4) 날짜가 있으면 남은 후보만 그날의 확정 예약과 대조 (예약 쿼리는 주 단위 캐시, 최대 1회)
+    if on_date is not None and candidates:
+        busy = await busy_between([room["id"] for room in candidates], on_date, on_date)
+        candidates = [
+            room for room in candidates
+            if not any(overlaps(busy[room["id"]][on_date], start, end) for _, start, end in requested)
+        ]
+
+    return [_available_room(room) for room in candidates]
 
 # ----------------------------------------
 # GET /rooms/available
 # ----------------------------------------
 @router.get("/rooms/available")
 async def get_available_rooms(
-    building_code: str = Query(..., description="건물 코드 (예: 310)"),
-    slots: List[str] = Query(..., description="시간 슬롯 리스트 (예: ['09:00-10:00'])"),
-    room_number: Optional[str] = Query(None, description="강의실 번호 (선택, 예: 515)")
+    building_code: Optional[str] = Query(None, description="건물 코드 (예: 310). 생략하면 캠퍼스 전체"),
+    slots: List[str] = Query(..., description="시간 슬롯 리스트 (예: ['09:00-10:00', '목 13:00-15:00'])"),
+    room_number: Optional[str] = Query(None, description="강의실 번호 (선택, 예: 515)"),
+    day: Optional[str] = Query(None, description="요일 (예: 화). 생략하면 모든 요일 기준"),
+    on_date: Optional[date] = Query(None, alias="date", description="날짜 (예: 2025-03-05). 주면 그날의 확정 예약까지 확인")
 ):
     """
-    slots = ["09:00-10:00", "11:00-12:00"] 형태
-    해당 건물에서 모든 슬롯이 비어있는 강의실 리스트 반환
+    slots = ["09:00-10:00", "11:00-12:00"] 형태 (슬롯 앞에 요일을 붙이면 해당 요일만 확인)
+    해당 건물(또는 캠퍼스 전체)에서 모든 슬롯이 비어있는 강의실 리스트 반환
+
+    date 를 주면 모든 슬롯을 그 날짜(요일) 기준으로 보고, 시간표와 함께 그날의 확정 예약도 확인합니다.
     """
-    try:
-        # 1) building_code → building_id
-        building_code = building_code.strip()
-        building_res = (
-            supabase.table("buildings")
-            .select("id")
-            .eq("code", building_code)
-            .maybe_single()
-            .execute()
-        )
+    if day is not None and day.strip() not in DAYS:
+        raise HTTPException(status_code=400, detail=f"Invalid day '{day}'")
+    if on_date is not None:
+        day = DAYS[on_date.weekday()]
 
-        building_data = getattr(building_res, "data", None)
-        if not building_data:
+    try:
+        # 1) 후보 강의실 목록 (메모리 카탈로그)
+        # 💡 building_code가 있으면 해당 건물만, 없으면 캠퍼스 전체 방
+        catalog = await get_catalog()
+        room_list = catalog.rooms_in(building_code or None)
+        if not room_list:
             return []
 
-        building_id = building_data["id"]
-
-        # 2) Rooms 조회 쿼리 구성
-        # 💡 room_number가 있으면 해당 방만, 없으면 건물 전체 방 조회
-        rooms_query = supabase.table("rooms").select("id, room_number").eq("building_id", building_id)
-
+        # 💡 room_number가 있으면 해당 방만 ("호", 공백은 카탈로그에서 정규화)
         if room_number:
-            # "호" 제거 및 공백 제거 (프론트에서 어떻게 보내든 처리 가능하게)
-            clean_room_number = room_number.replace("호", "").strip()
-            rooms_query = rooms_query.eq("room_number", clean_room_number)
+            clean_room_number = normalize_room_number(room_number)
+            room_list = [room for room in room_list if normalize_room_number(room["room_number"]) == clean_room_number]
+            if not room_list:
+                return []
+
+        # 2) 슬롯 파싱 ([요일] HH:MM-HH:MM) - 형식·시간 범위가 잘못되면 400
+        try:
+            requested = [parse_slot(slot, day.strip() if day else None) for slot in slots]
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if on_date is not None:
+            # 날짜가 주어지면 슬롯의 요일 접두어는 무시하고 그 날짜의 요일로 판정
+            requested = [(on_date.weekday(), start, end) for _, start, end in requested]
+
+        # 같은 조건(정규화된 건물·강의실 번호, 슬롯 집합, 날짜)의 동시 요청은 한 번만 계산
+        key = (
+            normalize_building_code(building_code) if building_code else None,
+            normalize_room_number(room_number) if room_number else None,
+            frozenset(requested),
+            on_date,
+        )
+        return await single_flight.run("rooms_available", key, lambda: _available_rooms(room_list, requested, on_date))
 
-        rooms_res = rooms_query.execute()
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB error: {str(e)}")
 
-        room_list = rooms_res.data or []
+# ----------------------------------------
+# GET /info/rooms/available-at
+# ----------------------------------------
+@router.get("/rooms/available-at")
+async def get_rooms_available_at(
+    building_code: Optional[str] = Query(None, description="건물 코드 (예: 310). 생략하면 캠퍼스 전체"),
+    at: Optional[datetime] = Query(None, description="확인할 시각 (ISO 8601, 예: 2025-03-05T13:30:00+09:00). 생략하면 지금")
+):
+    """
+    지정한 시각(기본: 지금)에 수업도 확정 예약도 없는 강의실 리스트.
+    시간대가 없는 시각은 KST 로 봅니다.
+    """
+    # at 을 생략한 "지금" 요청끼리는 같은 키로 합침 (결과 보관은 COALESCE_TTL_SECONDS 이내)
+    key = (normalize_building_code(building_code) if building_code else None, at)
+    if at is None:
+        at = datetime.now(KST)
+    elif at.tzinfo is None:
+        at = KST.localize(at)
+    at = at.astimezone(KST)
+
+    try:
+        catalog = await get_catalog()
+        room_list = catalog.rooms_in(building_code or None)
         if not room_list:
             return []
 
-        available_rooms = []
+        async def compute():
+            occupied = await occupied_room_ids((room["id"] for room in room_list), at)
+            return [_available_room(room) for room in room_list if room["id"] not in occupied]
 
-        # 3) 각 방별로 시간표 확인 (시간 객체 변환 로직 적용)
-        for room in room_list:
-            room_id = room["id"]
-
-            # 해당 강의실의 예약·수업 일정 조회
-            timetable_res = (
-                supabase.table("timetable_entries")
-                .select("day,start_time,end_time")
-                .eq("room_id", room_id)
-                .execute()
-            )
+        return await single_flight.run("rooms_available_at", key, compute)
 
-            occupied = timetable_res.data or []
-
-            # 4) 모든 요청 슬롯이 비어 있는지 확인
-            all_free = True
-
-            for slot in slots:
-                # 슬롯 파싱 (HH:MM-HH:MM)
-                parts = slot.strip().split("-")
-                
-                # 형식이 잘못되었거나 요일이 섞여 있으면 실패 처리
-                if len(parts) != 2:
-                    all_free = False
-                    break
-                
-                try:
-                    # 💡 문자열 -> time 객체 변환 (안전한 비교를 위해)
-                    req_start = datetime.strptime(parts[0].strip(), "%H:%M").time()
-                    req_end = datetime.strptime(parts[1].strip(), "%H:%M").time()
-                except ValueError:
-                    all_free = False
-                    break
-
-                for entry in occupied:
-                    try:
-                        # DB 시간 -> time 객체 변환
-                        # DB가 HH:MM:SS.microseconds 일 수 있으므로 처리
-                        entry_start_str = entry["start_time"].split(".")[0]
-                        entry_end_str = entry["end_time"].split(".")[0]
-                        
-                        db_start = datetime.strptime(entry_start_str, "%H:%M:%S").time()
-                        db_end = datetime.strptime(entry_end_str, "%H:%M:%S").time()
-                    except ValueError:
-                        continue # 포맷 에러 시 해당 엔트리 무시 (안전장치)
-
-                    # 겹치는 경우 판별: (StartA < EndB) and (EndA > StartB)
-                    if (db_start < req_end) and (db_end > req_start):
-                        all_free = False
-                        break
-
-                if not all_free:
-                    break
-
-            if all_free:
-                available_rooms.append({
-                    "room_id": room["id"], # room_id는 int 타입이므로 room["id"]로 수정 (AvailableRoomDto의 room_id는 Int)
-                    "building_code": building_code,
-                    "room_number": room["room_number"]
-                })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB error: {str(e)}")
 
-        return available_rooms
+# ----------------------------------------
+# GET /info/rooms/search
+# ----------------------------------------
+@router.get("/rooms/search", response_model=List[RoomSearchResult])
+async def search_available_rooms(
+    start: Optional[datetime] = Query(None, description="사용 시작 시각 (ISO 8601). 생략하면 지금 (KST)"),
+    min_duration: int = Query(30, ge=0, le=24 * 60, description="최소 연속 사용 시간 (분)"),
+    min_capacity: Optional[int] = Query(None, ge=1, description="최소 수용 인원"),
+    features: Optional[List[str]] = Query(None, description="필수 설비 (예: features=빔프로젝터&features=전자교탁)"),
+    building_codes: Optional[List[str]] = Query(None, description="건물 코드 목록. 생략하면 캠퍼스 전체"),
+    room_type: Optional[str] = Query(None, description="강의실 유형"),
+    until: time = Query(DEFAULT_END_TIME, description="이 시각까지만 빈 시간으로 계산"),
+    limit: int = Query(10, ge=1, le=100, description="반환할 강의실 수 (top-k)")
+):
+    """
+    start 부터 연속으로 비어 있는 시간이 가장 긴 강의실 상위 limit 개 (수업 + 확정 예약 반영).
+    건물별로 /info/rooms/available 을 반복 호출하는 대신 캠퍼스 전체를 한 번에 찾습니다.
+    """
+    if start is None:
+        start = datetime.now(KST)
+    elif start.tzinfo is None:
+        start = KST.localize(start)
+    start = start.astimezone(KST)
+
+    try:
+        catalog = await get_catalog()
+        if building_codes:
+            unknown = [code for code in building_codes if catalog.building(code) is None]
+            if unknown:
+                raise HTTPException(status_code=404, detail=f"Building not found: {', '.join(unknown)}")
+
+        return await search_rooms(
+            catalog,
+            start,
+            to_minutes(until),
+            limit,
+            min_duration,
+            building_codes=building_codes,
+            min_capacity=min_capacity,
+            room_type=room_type,
+            features=features,
+        )
 
+    except HTTPException as e:
+        # 404 오류는 그대로 반환
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"DB error: {str(e)}")
+
+# ----------------------------------------
+# GET /info/snapshot
+# ----------------------------------------
+@router.get("/snapshot")
+async def get_campus_snapshot(
+    request: Request,
+    format: Optional[str] = Query(None, description="json | msgpack (생략 시 Accept 헤더 기준, 기본 json)")
+):
+    """
+    건물·강의실·시간표 전체를 한 번에 내려주는 버전 스냅샷 (열 단위 압축 인코딩).
+    앱은 version 이 바뀌었을 때만 다시 받고(If-None-Match → 304), 조회는 로컬에서 처리합니다.
+    이후 변경은 last_seq (본문 / X-Last-Seq 헤더) 를 since 로 /sync/changes 에서 이어 받습니다.
+    """
+    fmt = format
+    if fmt is None:
+        fmt = "msgpack" if "application/msgpack" in request.headers.get("accept", "") else "json"
+    if fmt not in SNAPSHOT_FORMATS:
+        raise HTTPException(status_code=406, detail=f"Unsupported snapshot format '{fmt}'")
+
+    try:
+        catalog, index = await asyncio.gather(get_catalog(), get_occupancy_index())
+        return await response_cache.respond(
+            request,
+            ("snapshot", fmt),
+            snapshot_version(catalog, index),
+            lambda: build_snapshot(catalog, index),
+            lambda snapshot: serialize_snapshot(snapshot, fmt),
+            media_type="application/msgpack" if fmt == "msgpack" else "application/json",
+            # format 을 생략하면 Accept 헤더로 본문 형식을 고르므로 캐시 키에 포함
+            vary=("Accept",) if format is None else (),
+            # 304 로 본문을 다시 받지 않아도 이어 받을 커서를 알 수 있게 헤더로도 전달
+            extra_headers={"X-Last-Seq": str(index.last_seq)},
+        )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"DB error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -0,0 +1,164 @@
+import asyncio
+import json
+from typing import List, Optional, Set
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from core.catalog import get_catalog
+from core.config import LIVE_HEARTBEAT_SECONDS
+from core.database import get_db
+from core.dependencies import get_optional_user_id, user_id_from_token
+from core.events import room_events
+from core.realtime import tracker
+
+router = APIRouter(
+    prefix="/live",
+    tags=["Live"]
+)
+
+
+async def resolve_room_filter(
+    building_codes: Optional[List[str]],
+    room_ids: Optional[List[int]],
+    favorites: bool,
+    user_id: Optional[str],
+) -> Optional[Set[int]]:
+    """구독할 강의실 ID 집합 (건물 / 강의실 ID / 즐겨찾기의 합집합). 조건이 없으면 None = 전체."""
+    if not building_codes and not room_ids and not favorites:
+        return None
+
+    selected: Set[int] = set(room_ids or [])
+    if building_codes:
+        catalog = await get_catalog()
+        for code in building_codes:
+            rooms = catalog.rooms_in(code)
+            if rooms is None:
+                raise HTTPException(status_code=404, detail=f"Building not found: {code}")
+            selected.update(room["id"] for room in rooms)
+    if favorites:
+        if user_id is None:
+            raise HTTPException(status_code=401, detail="favorites=true requires a bearer token")
+        db = await get_db()
+        res = await db.table("favorites").select("room_id").eq("user_id", user_id).execute()
+        selected.update(row["room_id"] for row in res.data or [])
+    return selected
+
+
+async def snapshot_message(room_filter: Optional[Set[int]]) -> dict:
+    catalog = await get_catalog()
+    statuses = await tracker.snapshot(room_filter)
+    return {
+        "type": "snapshot",
+        "rooms": [
+            {
+                "room_id": room_id,
+                "building_code": catalog.rooms_by_id[room_id]["building_code"] if room_id in catalog.rooms_by_id else None,
+                "room_number": catalog.rooms_by_id[room_id]["room_number"] if room_id in catalog.rooms_by_id else None,
+                **status,
+            }
+            for room_id, status in sorted(statuses.items())
+        ],
+    }
+
+
+# ----------------------------------------
+# GET /live/rooms  (Server-Sent Events)
+# ----------------------------------------
+@router.get("/rooms")
+async def stream_room_status(
+    building_codes: Optional[List[str]] = Query(None, description="건물 코드 목록"),
+    room_ids: Optional[List[int]] = Query(None, description="강의실 ID 목록"),
+    favorites: bool = Query(False, description="내 즐겨찾기 강의실 (Authorization 필요)"),
+    user_id: Optional[str] = Depends(get_optional_user_id)
+):
+    """
+    강의실 상태 변화를 SSE(text/event-stream)로 밀어줍니다. /info/rooms/available 폴링 대체용.
+
+    - 처음에 `event: snapshot` (필터에 해당하는 강의실의 현재 상태 전체)
+    - 이후 상태가 바뀔 때마다 `event: room_status` ("free" ↔ "occupied")
+    - 연결 유지를 위해 LIVE_HEARTBEAT_SECONDS 마다 주석(`: ping`)
+    조건(building_codes / room_ids / favorites)을 여러 개 주면 합집합, 없으면 캠퍼스 전체입니다.
+    """
+    try:
+        room_filter = await resolve_room_filter(building_codes, room_ids, favorites, user_id)
+        # 처음 한 번의 상태 계산(DB 조회)은 응답을 시작하기 전에: 실패하면 500
+        await tracker.snapshot(room_filter)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    def frame(message: dict) -> bytes:
+        return f"event: {message['type']}\ndata: {json.dumps(message, ensure_ascii=False)}\n\n".encode()
+
+    async def events():
+        # 구독은 본문을 실제로 보내기 시작할 때 만들고 끝나면 해제합니다
+        # (본문 전에 연결이 끊겨 이 제너레이터가 돌지 않으면 구독도 생기지 않음).
+        # 구독 후에 스냅샷을 만들어 그 사이의 변화도 놓치지 않습니다.
+        with room_events.subscribe(
+            None if room_filter is None else (lambda event: event["room_id"] in room_filter)
+        ) as subscription:
+            yield frame(await snapshot_message(room_filter))
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.get(), LIVE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield frame(message)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ----------------------------------------
+# WS /live/ws
+# ----------------------------------------
+@router.websocket("/ws")
+async def room_status_socket(
+    websocket: WebSocket,
+    building_codes: Optional[List[str]] = Query(None),
+    room_ids: Optional[List[int]] = Query(None),
+    favorites: bool = Query(False),
+    token: Optional[str] = Query(None, description="favorites=true 일 때 액세스 토큰")
+):
+    """
+    /live/rooms 와 같은 이벤트를 WebSocket JSON 메시지로 보냅니다 ({"type": "snapshot" | "room_status", ...}).
+    브라우저 WebSocket 은 헤더를 못 넣으므로 토큰은 ?token= 으로 받습니다.
+    """
+    try:
+        user_id = await user_id_from_token(token) if token else None
+        room_filter = await resolve_room_filter(building_codes, room_ids, favorites, user_id)
+    except HTTPException as e:
+        await websocket.close(code=4000 + e.status_code, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    subscription = room_events.subscribe(
+        None if room_filter is None else (lambda event: event["room_id"] in room_filter)
+    )
+    receiver = getter = None
+    with subscription:
+        try:
+            await websocket.send_json(await snapshot_message(room_filter))
+            receiver = asyncio.create_task(websocket.receive_text())  # 클라이언트 종료 감지 (보낸 메시지는 무시)
+            while True:
+                if getter is None:
+                    getter = asyncio.create_task(subscription.get())
+                done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    await websocket.send_json(getter.result())
+                    getter = None
+                if receiver in done:
+                    receiver.result()  # 연결이 끊겼으면 WebSocketDisconnect
+                    receiver = asyncio.create_task(websocket.receive_text())
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in (receiver, getter):
+                if task is not None and not task.done():
+                    task.cancel()
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from core.metrics import registry
+
+router = APIRouter(
+    tags=["Metrics"]
+)
+
+# Prometheus text exposition format 0.0.4
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """라우트별 지연·상태 코드·처리 중 요청 수, upstream 호출 수·시간·행 수."""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,36 +1,107 @@
+from datetime import date, timedelta
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
-from core.config import supabase
+from fastapi import APIRouter, Depends, HTTPException, Query
+from core.catalog import get_catalog
+from core.database import get_db
 from core.dependencies import get_current_user_id
+from core.gaps import class_summary, find_gaps, rooms_for_gaps
+from core.occupancy import DAYS, format_minutes
+from core.schedule import week_start
+from model.models import TimetableGapDto
 
 router = APIRouter(
     prefix="/timetable",
     tags=["Timetable"]
 )
 
+async def fetch_student_timetable(student_id: str) -> List[dict]:
+    db = await get_db()
+
+    response = await (
+        db
+        .table("student_timetable")
+        .select("*")
+        .eq("student_id", student_id)
+        .order("day")
+        .order("start_time")
+        .execute()
+    )
+
+    if response.data is None:
+        return []
+
+    return response.data
+
+
 # GET /timetable  → 현재 로그인한 학생의 시간표 조회
 @router.get("/", summary="Get student timetable")
-def get_student_timetable(
+async def get_student_timetable(
     student_id: str = Depends(get_current_user_id)
 ):
     try:
-        response = (
-            supabase
-            .table("student_timetable")
-            .select("*")
-            .eq("student_id", student_id)
-            .order("day")
-            .order("start_time")
-            .execute()
+        return await fetch_student_timetable(student_id)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch timetable: {str(e)}"
         )
 
-        if response.data is None:
+
+# GET /timetable/gaps  → 수업 사이 공강 + 공강 내내 비어 있는 강의실
+@router.get("/gaps", summary="Free periods between my classes", response_model=List[TimetableGapDto])
+async def get_timetable_gaps(
+    day: Optional[str] = Query(None, description="요일 (예: 화). 생략하면 한 주 전체"),
+    on_date: Optional[date] = Query(None, alias="date", description="날짜 (예: 2025-03-05). 주면 그날의 확정 예약까지 확인"),
+    week: bool = Query(False, description="date 가 속한 주(월~일) 전체를 날짜별로 조회"),
+    min_gap: int = Query(30, ge=1, le=24 * 60, description="이 시간(분)보다 짧은 공강은 제외"),
+    limit: int = Query(5, ge=0, le=50, description="공강마다 추천할 강의실 수"),
+    student_id: str = Depends(get_current_user_id)
+):
+    """
+    학생 시간표에서 수업 사이 공강을 찾고, 공강마다 그 시간 내내 비어 있는 강의실을
+    앞뒤 수업 강의실 → 같은 건물 → 그 외 순으로 추천합니다.
+    모든 공강을 한 번에 평가하므로 공강마다 /info/rooms/available 을 호출할 필요가 없습니다.
+    """
+    if day is not None and day.strip() not in DAYS:
+        raise HTTPException(status_code=400, detail=f"Invalid day '{day}'")
+    if week and on_date is None:
+        raise HTTPException(status_code=400, detail="week requires date")
+
+    if on_date is not None and week:
+        monday = week_start(on_date)
+        targets = [(DAYS[i], monday + timedelta(days=i)) for i in range(len(DAYS))]
+    elif on_date is not None:
+        targets = [(DAYS[on_date.weekday()], on_date)]
+    elif day is not None:
+        targets = [(day.strip(), None)]
+    else:
+        targets = [(d, None) for d in DAYS]
+
+    try:
+        rows = await fetch_student_timetable(student_id)
+        gaps = find_gaps(rows, targets, min_gap)
+        if not gaps:
             return []
 
-        return response.data
+        catalog = await get_catalog()
+        rooms = await rooms_for_gaps(catalog, gaps, limit)
+        return [
+            {
+                "day": gap["day"],
+                "date": gap["date"].isoformat() if gap["date"] else None,
+                "start": format_minutes(gap["start"]),
+                "end": format_minutes(gap["end"]),
+                "minutes": gap["end"] - gap["start"],
+                "previous_class": class_summary(catalog, gap["before"]),
+                "next_class": class_summary(catalog, gap["after"]),
+                "rooms": gap_rooms,
+            }
+            for gap, gap_rooms in zip(gaps, rooms)
+        ]
 
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to fetch timetable: {str(e)}"
+            detail=f"Failed to compute timetable gaps: {str(e)}"
         )
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+from core.database import get_db
+from model.models import ChangeEntry, ChangeFeedResponse
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["Sync"]
+)
+
+MAX_PAGE_SIZE = 1000
+
+
+# ----------------------------------------
+# GET /sync/changes
+# ----------------------------------------
+@router.get("/changes", response_model=ChangeFeedResponse)
+async def get_changes(
+    since: int = Query(0, ge=0, description="마지막으로 받은 변경 버전 (처음이면 0)"),
+    limit: int = Query(500, ge=1, le=MAX_PAGE_SIZE, description="한 번에 읽을 변경 로그 수")
+):
+    """
+    since 이후의 reservations / timetable_entries 변경 사항을 반환합니다.
+
+    - 같은 행이 여러 번 바뀌었으면 마지막 상태 하나로 압축합니다.
+    - has_more 가 true 이면 응답의 cursor 를 since 로 넘겨 다음 페이지를 요청합니다.
+    - since 가 보관 기간보다 오래되었으면 410 을 반환하므로 /info/snapshot 으로 전체를 다시 받고,
+      스냅샷의 last_seq 부터 이어 받아야 합니다. 410 본문에도 현재 last_seq 가 들어 있습니다.
+    """
+    try:
+        db = await get_db()
+
+        # change_feed: 발행된(seq 가 붙은) 변경 중 since 이후를 읽기만 함 (발행은 publish_change_log, db/change_log.sql)
+        feed_res = await db.rpc("change_feed", {"p_since": since, "p_limit": limit}).execute()
+        feed = feed_res.data or {}
+
+        # 커서 이후 로그 일부가 이미 정리(prune)되었다면 증분 동기화 불가
+        if since > 0 and since < (feed.get("pruned_through") or 0):
+            return JSONResponse(status_code=410, content={
+                "detail": "Cursor is too old, full resync required",
+                "last_seq": feed.get("last_seq") or 0,
+            })
+
+        rows = feed.get("changes") or []
+
+        # (테이블, 행 ID) 별로 마지막 변경만 남기고 버전 순서 유지
+        latest = {}
+        for row in rows:
+            latest[(row["table_name"], row["row_id"])] = row
+
+        changes = [
+            ChangeEntry(
+                table=row["table_name"],
+                id=row["row_id"],
+                op=row["op"],
+                version=row["version"],
+                data=row["row_data"],
+            )
+            for row in sorted(latest.values(), key=lambda r: r["version"])
+        ]
+
+        return ChangeFeedResponse(
+            cursor=rows[-1]["version"] if rows else since,
+            has_more=len(rows) == limit,
+            changes=changes,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -0,0 +1,100 @@
+"""
+동기 Supabase 클라이언트(기존) vs 비동기 데이터 접근 계층(core.database)의 동시 처리량 비교.
+
+로컬에 지연(latency)을 흉내 내는 PostgREST 스텁 서버를 띄우고,
+'핸들러 하나당 쿼리 Q번'인 요청 N개를 동시에 처리하는 데 걸리는 시간을 측정합니다.
+
+    cd backend
+    python -m benchmarks.bench_async_db --requests 200 --queries 3 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    latency = 0.02
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        body = json.dumps([{"id": 1}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(latency_ms: float) -> str:
+    _StubHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def run_sync_client(url: str, requests: int, queries: int) -> float:
+    from supabase import create_client
+
+    client = create_client(url, os.environ["SUPABASE_KEY"])
+
+    async def handler():
+        # 기존 라우터와 동일: async def 안에서 동기 .execute() 호출 → 이벤트 루프 블로킹
+        for _ in range(queries):
+            client.table("rooms").select("id").execute()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(requests)))
+    return time.perf_counter() - start
+
+
+async def run_async_client(requests: int, queries: int) -> float:
+    from core.database import close_db, get_db
+
+    db = await get_db()
+
+    async def handler():
+        for _ in range(queries):
+            await db.table("rooms").select("id").execute()
+
+    await handler()  # 커넥션 워밍업
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await close_db()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="동시 요청 수")
+    parser.add_argument("--queries", type=int, default=3, help="요청 하나당 DB 쿼리 수")
+    parser.add_argument("--latency-ms", type=float, default=20, help="스텁 서버 응답 지연 (ms)")
+    args = parser.parse_args()
+
+    url = start_stub_server(args.latency_ms)
+    # core.config 가 읽는 환경 변수를 스텁 서버로 지정 (import 전에 설정해야 함)
+    os.environ["SUPABASE_URL"] = url
+    os.environ.setdefault("SUPABASE_KEY", "benchmark-key")
+    os.environ["DB_HTTP2"] = "false"  # 스텁 서버는 HTTP/1.1 만 지원
+
+    results = {
+        "sync (before)": asyncio.run(run_sync_client(url, args.requests, args.queries)),
+        "async (after)": asyncio.run(run_async_client(args.requests, args.queries)),
+    }
+
+    print(f"{args.requests} concurrent requests x {args.queries} queries, {args.latency_ms:.0f} ms upstream latency")
+    for name, elapsed in results.items():
+        print(f"  {name:<14} {elapsed:8.2f} s  {args.requests / elapsed:10.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+main.py 의 모든 라우터에 대한 오프라인 부하 테스트.
+
+DATA_BACKEND=local (Final_timetable.csv 로 채운 인메모리 백엔드, core/local_backend.py)로 앱을
+프로세스 안에서 띄우고(ASGI), 엔드포인트마다 요청 N개를 동시성 C로 보내
+p50 / p95 / p99 지연, 초당 요청 수, 요청당 데이터 백엔드 호출 수(q/req)를 보고합니다.
+q/req 가 즐겨찾기·예약 수에 비례해 늘어나면 N+1 쿼리 회귀입니다.
+
+    cd backend
+    python -m benchmarks.load_test --requests 300 --concurrency 20 --latency-ms 15 --jitter-ms 10
+    python -m benchmarks.load_test --only info --json results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+Request = Tuple[str, str, dict]  # (method, url, httpx kwargs)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """nearest-rank 백분위수."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Fixture:
+    """부하 테스트용 사용자·즐겨찾기·예약을 시드하고, 요청 파라미터를 돌려가며 만들어 줍니다."""
+
+    def __init__(self, client, users: int, favorites_per_user: int, reservations: int, seed: int):
+        from core.local_backend import issue_token
+        from core.notification_scheduler import KST
+
+        self.store = client.store
+        self.rng = random.Random(seed)
+        self.rooms = [
+            (room["id"], building["code"], room["room_number"])
+            for room in self.store.rows("rooms")
+            for building in [self.store.by_id("buildings")[room["building_id"]]]
+        ]
+        self.password = "load-test-password"
+        self.emails: List[str] = []
+        self.tokens: List[str] = []
+        user_ids: List[str] = []
+        for i in range(users):
+            email = f"load{i}@example.com"
+            user = client.auth.create_user(email, self.password, f"load {i}")
+            self.emails.append(email)
+            user_ids.append(user["id"])
+            self.tokens.append(issue_token(user["id"], email))
+            picked = self.rng.sample(self.rooms, min(favorites_per_user, len(self.rooms)))
+            self.store.insert("favorites", [{"user_id": user["id"], "room_id": room_id} for room_id, _, _ in picked])
+            # 요일마다 2~3개 수업 (공강 계산용)
+            self.store.insert("student_timetable", [
+                {
+                    "student_id": user["id"],
+                    "day": day,
+                    "start_time": f"{hour:02d}:00:00",
+                    "end_time": f"{hour + 1:02d}:15:00",
+                    "course_name": f"course {day}{hour}",
+                    "room_id": self.rng.choice(self.rooms)[0],
+                }
+                for day in "월화수목금"
+                for hour in sorted(self.rng.sample(range(9, 18, 2), 3))
+            ])
+
+        # 지금부터 몇 시간 안에 걸친 확정 예약 (알림·가용성 판정 경로를 태우기 위함)
+        now = datetime.now(KST).replace(second=0, microsecond=0)
+        slots = {}
+        for _ in range(reservations):
+            room_id = self.rng.choice(self.rooms)[0]
+            start = now + timedelta(minutes=30 * self.rng.randrange(-4, 12))
+            if (room_id, start) in slots:
+                continue
+            slots[(room_id, start)] = True
+            self.store.insert("reservations", [{
+                "room_id": room_id,
+                "user_id": self.rng.choice(user_ids),
+                "start_at": start.isoformat(),
+                "end_at": (start + timedelta(minutes=30)).isoformat(),
+                "purpose": "load test",
+            }])
+        self._counter = 0
+
+    def next(self) -> int:
+        self._counter += 1
+        return self._counter
+
+    def room(self) -> Tuple[int, str, str]:
+        return self.rng.choice(self.rooms)
+
+    def auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.rng.choice(self.tokens)}"}
+
+
+def scenarios(fx: Fixture) -> Dict[str, Callable[[], Request]]:
+    """엔드포인트 이름 → 요청 하나를 만드는 함수. main.py 에 등록된 라우터를 모두 포함합니다."""
+
+    def room_params():
+        _, code, number = fx.room()
+        return {"building_code": code, "room_number": number}
+
+    def available():
+        _, code, _ = fx.room()
+        start = fx.rng.randrange(9, 18)
+        return {"building_code": code, "slots": [f"{start:02d}:00-{start + 1:02d}:30"], "day": fx.rng.choice("월화수목금")}
+
+    def signup():
+        n = fx.next()
+        return "POST", "/auth/signup", {"json": {"email": f"signup{n}@example.com", "password": "pw123456", "name": f"u{n}"}}
+
+    return {
+        "GET /": lambda: ("GET", "/", {}),
+        "POST /auth/signup": signup,
+        "POST /auth/login": lambda: ("POST", "/auth/login", {
+            "json": {"email": fx.rng.choice(fx.emails), "password": fx.password},
+        }),
+        "GET /info/buildings": lambda: ("GET", "/info/buildings", {}),
+        "GET /info/rooms": lambda: ("GET", "/info/rooms", {"params": {"building_code": fx.room()[1]}}),
+        "GET /info/room/details": lambda: ("GET", "/info/room/details", {"params": room_params()}),
+        "GET /info/room/{id}": lambda: ("GET", f"/info/room/{fx.room()[0]}", {}),
+        "GET /info/room/timetable": lambda: ("GET", "/info/room/timetable", {"params": room_params()}),
+        "GET /info/room/timetable/free-slots": lambda: ("GET", "/info/room/timetable/free-slots", {"params": room_params()}),
+        "GET /info/rooms/free-slots": lambda: ("GET", "/info/rooms/free-slots", {
+            "params": {"building_code": fx.room()[1], "min_duration": 60},
+        }),
+        "GET /info/rooms/available": lambda: ("GET", "/info/rooms/available", {"params": available()}),
+        "GET /info/rooms/available-at": lambda: ("GET", "/info/rooms/available-at", {"params": {"building_code": fx.room()[1]}}),
+        "GET /info/rooms/search": lambda: ("GET", "/info/rooms/search", {
+            "params": {"min_duration": fx.rng.choice([30, 60, 90]), "limit": 10},
+        }),
+        "GET /info/snapshot": lambda: ("GET", "/info/snapshot", {"params": {"format": "json"}}),
+        "GET /favorites": lambda: ("GET", "/favorites", {"headers": fx.auth()}),
+        "GET /favorites?include_status": lambda: ("GET", "/favorites", {
+            "headers": fx.auth(), "params": {"include_status": "true"},
+        }),
+        "POST /favorites/toggle": lambda: ("POST", "/favorites/toggle", {
+            "headers": fx.auth(), "json": {"room_id": fx.room()[0]},
+        }),
+        "POST /favorites/batch": lambda: ("POST", "/favorites/batch", {
+            "headers": fx.auth(),
+            "json": {"add": [fx.room()[0] for _ in range(5)], "remove": [fx.room()[0] for _ in range(5)]},
+        }),
+        "POST /notifications/check-availability": lambda: ("POST", "/notifications/check-availability", {
+            "headers": fx.auth(), "json": {"minutes_before": 10},
+        }),
+        "GET /timetable/": lambda: ("GET", "/timetable/", {"headers": fx.auth()}),
+        "GET /timetable/gaps": lambda: ("GET", "/timetable/gaps", {"headers": fx.auth()}),
+        "GET /sync/changes": lambda: ("GET", "/sync/changes", {"params": {"since": 0, "limit": 500}}),
+    }
+
+
+async def run_endpoint(http, db, make_request: Callable[[], Request], requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = iter(range(requests))
+    calls_before = sum(db.calls.values())
+
+    async def worker():
+        for _ in remaining:
+            method, url, kwargs = make_request()
+            start = time.perf_counter()
+            response = await http.request(method, url, **kwargs)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": sum(n for status, n in statuses.items() if status >= 400),
+        "statuses": statuses,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "rps": round(requests / elapsed, 1),
+        "queries_per_request": round((sum(db.calls.values()) - calls_before) / requests, 2),
+    }
+
+
+def print_table(results: Dict[str, dict]):
+    width = max(len(name) for name in results)
+    header = f"{'endpoint':<{width}}  {'n':>5} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>9} {'q/req':>6}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(
+            f"{name:<{width}}  {r['requests']:>5} {r['errors']:>5} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['rps']:>9.1f} {r['queries_per_request']:>6.2f}"
+        )
+    print("(latency in ms)")
+
+
+async def run(args) -> Dict[str, dict]:
+    import httpx
+
+    from core.database import get_db
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        db = await get_db()
+        fx = Fixture(db, args.users, args.favorites, args.reservations, args.seed)
+        selected = {
+            name: make for name, make in scenarios(fx).items()
+            if not args.only or any(word in name for word in args.only)
+        }
+
+        transport = httpx.ASGITransport(app=app)
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as http:
+            for name, make_request in selected.items():
+                # 워밍업 (캐시 채우기) 후 측정
+                for _ in range(args.warmup):
+                    method, url, kwargs = make_request()
+                    await http.request(method, url, **kwargs)
+                results[name] = await run_endpoint(http, db, make_request, args.requests, args.concurrency)
+        return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="엔드포인트당 요청 수")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시 요청 수")
+    parser.add_argument("--warmup", type=int, default=5, help="측정 전 워밍업 요청 수")
+    parser.add_argument("--latency-ms", type=float, default=10, help="데이터 백엔드 호출당 지연 (ms)")
+    parser.add_argument("--jitter-ms", type=float, default=5, help="추가 무작위 지연 상한 (ms)")
+    parser.add_argument("--users", type=int, default=50, help="시드할 사용자 수")
+    parser.add_argument("--favorites", type=int, default=8, help="사용자당 즐겨찾기 수")
+    parser.add_argument("--reservations", type=int, default=100, help="시드할 확정 예약 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드 (같은 값이면 같은 요청 순서)")
+    parser.add_argument("--only", nargs="*", help="이름에 이 문자열이 들어간 엔드포인트만 실행")
+    parser.add_argument("--availability", choices=["memory", "rpc"], default="memory", help="AVAILABILITY_BACKEND (가용성 판정 위치)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장 (회귀 비교용)")
+    args = parser.parse_args(argv)
+
+    # core.config 를 import 하기 전에 설정해야 함
+    os.environ["DATA_BACKEND"] = "local"
+    os.environ["LOCAL_DB_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["LOCAL_DB_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["LOCAL_DB_RANDOM_SEED"] = str(args.seed)
+    os.environ["NOTIFICATION_SCHEDULER_ENABLED"] = "false"
+    os.environ["AVAILABILITY_BACKEND"] = args.availability
+    if "core.config" in sys.modules:
+        parser.error("benchmarks.load_test must be run before core.config is imported")
+
+    results = asyncio.run(run(args))
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
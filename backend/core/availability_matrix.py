@@ -0,0 +1,129 @@
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .occupancy import DAYS, OccupancyIndex, get_occupancy_index, to_minutes
+
+# 5분 단위 슬롯: 하루 288칸, 강의실·요일마다 288비트(36바이트)로 저장
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# (요일 인덱스 또는 None=모든 요일, 시작 분, 종료 분)
+SlotQuery = Tuple[Optional[int], int, int]
+
+
+def _slot_range(start: int, end: int) -> slice:
+    """[start, end) 분 구간이 걸치는 슬롯 범위 (바깥쪽으로 반올림해 보수적으로 판단)."""
+    first = max(start // SLOT_MINUTES, 0)
+    last = min(-(-end // SLOT_MINUTES), SLOTS_PER_DAY)
+    return slice(first, last)
+
+
+class AvailabilityMatrix:
+    """
+    강의실 × 요일 × 5분 슬롯 점유 비트맵.
+
+    슬롯 축을 np.packbits 로 압축해 (rooms, 7, 36) uint8 배열로 보관하며,
+    "요청한 모든 슬롯이 비어 있는가"를 모든 강의실에 대해 한 번의 AND/any 로 계산합니다.
+    """
+
+    def __init__(self, index: OccupancyIndex):
+        self.source = index
+        bitmap = getattr(index, "bitmap", None)
+        if bitmap is not None:
+            # 워커 공유 스냅샷(core/shared_snapshot.py)에 미리 계산된 비트맵을 복사 없이 사용
+            self.room_ids, self.bits = bitmap
+            self._rows = {int(room_id): row for row, room_id in enumerate(self.room_ids)}
+            return
+
+        self.room_ids = np.array(sorted(index.room_ids), dtype=np.int64)
+        self._rows = {int(room_id): row for row, room_id in enumerate(self.room_ids)}
+
+        packed_width = SLOTS_PER_DAY // 8
+        self.bits = np.zeros((len(self.room_ids), len(DAYS), packed_width), dtype=np.uint8)
+
+        day_pos = {day: i for i, day in enumerate(DAYS)}
+        scratch = np.zeros((len(DAYS), SLOTS_PER_DAY), dtype=bool)
+        by_room = {}
+        for room_id, day, intervals in index.items():
+            by_room.setdefault(room_id, []).append((day_pos[day], intervals))
+
+        for room_id, days in by_room.items():
+            scratch[:] = False
+            for d, intervals in days:
+                for start, end in intervals:
+                    scratch[d, _slot_range(start, end)] = True
+            self.bits[self._rows[room_id]] = np.packbits(scratch, axis=-1)
+
+    def query_mask(self, slots: Iterable[SlotQuery]) -> np.ndarray:
+        """요청 슬롯 목록을 (7, 36) 비트 마스크로 변환합니다."""
+        mask = np.zeros((len(DAYS), SLOTS_PER_DAY), dtype=bool)
+        for day, start, end in slots:
+            mask[slice(None) if day is None else day, _slot_range(start, end)] = True
+        return np.packbits(mask, axis=-1)
+
+    def free_for_all(self, room_ids: Sequence[int], slots: Sequence[SlotQuery]) -> np.ndarray:
+        """
+        room_ids 각각이 slots 전체에서 비어 있는지 bool 배열로 반환합니다.
+        시간표에 한 번도 등장하지 않는 강의실은 항상 비어 있는 것으로 봅니다.
+        """
+        rows = np.fromiter((self._rows.get(int(r), -1) for r in room_ids), dtype=np.int64, count=len(room_ids))
+        result = np.ones(len(rows), dtype=bool)
+
+        known = rows >= 0
+        if known.any():
+            mask = self.query_mask(slots)
+            conflict = (self.bits[rows[known]] & mask).any(axis=(1, 2))
+            result[known] = ~conflict
+        return result
+
+    def free_per_slot(self, room_ids: Sequence[int], slots: Sequence[SlotQuery]) -> np.ndarray:
+        """
+        (len(room_ids), len(slots)) bool 배열: 각 강의실이 슬롯 하나하나에서 비어 있는지.
+        슬롯마다 따로 묻지 않고 모든 슬롯 마스크를 쌓아 한 번의 AND/any 로 계산합니다.
+        """
+        rows = np.fromiter((self._rows.get(int(r), -1) for r in room_ids), dtype=np.int64, count=len(room_ids))
+        result = np.ones((len(rows), len(slots)), dtype=bool)
+
+        known = rows >= 0
+        if known.any() and slots:
+            masks = np.stack([self.query_mask([slot]) for slot in slots])  # (slots, 7, 36)
+            conflict = (self.bits[rows[known]][:, None] & masks[None]).any(axis=(2, 3))
+            result[known] = ~conflict
+        return result
+
+
+# ----------------------------------------
+# 프로세스 전역 비트맵 (시간표 인덱스가 바뀌면 다시 생성)
+# ----------------------------------------
+_matrix: Optional[AvailabilityMatrix] = None
+
+
+async def get_availability_matrix() -> AvailabilityMatrix:
+    global _matrix
+    index = await get_occupancy_index()
+    if _matrix is None or _matrix.source is not index:
+        _matrix = AvailabilityMatrix(index)
+    return _matrix
+
+
+def parse_slot(slot: str, default_day: Optional[str] = None) -> SlotQuery:
+    """
+    '10:00-12:00' 또는 '화 10:00-12:00' 형태의 슬롯을 파싱합니다.
+    요일이 없으면 default_day 를, 그것도 없으면 모든 요일(None)을 대상으로 합니다.
+    """
+    text = slot.strip()
+    day = default_day
+    if text and text[0] in DAYS:
+        day, text = text[0], text[1:].strip()
+
+    parts = text.split("-")
+    if len(parts) != 2:
+        raise ValueError(f"Invalid slot format: {slot}")
+
+    start = to_minutes(parts[0])
+    end = to_minutes(parts[1])
+    if end <= start:
+        raise ValueError(f"Invalid slot range: {slot}")
+    return (None if day is None else DAYS.index(day), start, end)
+
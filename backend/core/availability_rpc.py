@@ -0,0 +1,90 @@
+"""
+db/functions.sql 의 가용성 집합 함수(rooms_available_at / rooms_free_for_slots / room_free_slots) 호출.
+
+AVAILABILITY_BACKEND=rpc 일 때 /info, /notifications 와 알림 스케줄러가 메모리 인덱스 대신 이 함수들을 씁니다.
+강의실 수와 상관없이 질문 하나당 한 번의 RPC 로 끝나며, 필터링은 DB 의 인덱스 위에서 실행됩니다.
+결과가 PostgREST max-rows 를 넘을 수 있는 함수는 페이지 단위로 읽습니다.
+"""
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+
+from .availability_matrix import SlotQuery
+from .database import get_db
+from .occupancy import DAYS, PAGE_SIZE, Interval, format_minutes, to_minutes
+
+
+async def _call(fn: str, params: dict, *order: str) -> List[dict]:
+    """집합을 반환하는 RPC 를 order 기준으로 페이지 단위로 모두 읽어옵니다."""
+    db = await get_db()
+    rows: List[dict] = []
+    offset = 0
+    while True:
+        query = db.rpc(fn, params)
+        for column in order:
+            query = query.order(column)
+        res = await query.range(offset, offset + PAGE_SIZE - 1).execute()
+        page = res.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+async def rooms_available_at(
+    at: datetime,
+    building_code: Optional[str] = None,
+    room_ids: Optional[Sequence[int]] = None,
+) -> List[dict]:
+    """at 시점에 수업도 확정 예약도 없는 강의실 [{room_id, building_code, room_number}]."""
+    return await _call("rooms_available_at", {
+        "p_at": at.isoformat(),
+        "p_building_code": building_code,
+        "p_room_ids": None if room_ids is None else list(room_ids),
+    }, "room_id")
+
+
+async def rooms_free_for_slots(
+    slots: Sequence[SlotQuery],
+    building_code: Optional[str] = None,
+    room_ids: Optional[Sequence[int]] = None,
+    on_date: Optional[date] = None,
+) -> List[dict]:
+    """모든 슬롯에서 비어 있는 강의실. on_date 가 있으면 그날의 확정 예약도 확인합니다."""
+    return await _call("rooms_free_for_slots", {
+        "p_days": [None if day is None else DAYS[day] for day, _, _ in slots],
+        "p_starts": [format_minutes(start) for _, start, _ in slots],
+        "p_ends": [format_minutes(end) for _, _, end in slots],
+        "p_building_code": building_code,
+        "p_room_ids": None if room_ids is None else list(room_ids),
+        "p_date": on_date.isoformat() if on_date else None,
+    }, "room_id")
+
+
+async def room_free_slots(
+    room_ids: Sequence[int],
+    start_date: date,
+    end_date: date,
+    window_start: int,
+    window_end: int,
+    min_duration: int = 0,
+) -> Dict[int, Dict[date, List[Interval]]]:
+    """
+    core.schedule.free_slots_between 와 같은 형태(강의실 → 날짜 → 빈 구간)로 반환합니다.
+    빈 구간이 없는 날도 빈 리스트로 채웁니다.
+    """
+    rows = await _call("room_free_slots", {
+        "p_from": start_date.isoformat(),
+        "p_to": end_date.isoformat(),
+        "p_start": format_minutes(window_start),
+        "p_end": format_minutes(window_end),
+        "p_room_ids": list(room_ids),
+        "p_min_minutes": min_duration,
+    }, "room_id", "day", "slot_start")
+
+    days = [date.fromordinal(n) for n in range(start_date.toordinal(), end_date.toordinal() + 1)]
+    result: Dict[int, Dict[date, List[Interval]]] = {room_id: {day: [] for day in days} for room_id in room_ids}
+    for row in rows:
+        by_date = result.get(row["room_id"])
+        if by_date is not None:
+            by_date[date.fromisoformat(row["day"])].append((to_minutes(row["slot_start"]), to_minutes(row["slot_end"])))
+    return result
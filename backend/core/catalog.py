@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .config import CATALOG_TTL_SECONDS, SHARED_SNAPSHOT_PATH
+from .database import get_db
+from .occupancy import PAGE_SIZE
+
+
+def normalize_building_code(code: str) -> str:
+    """' 310관 ' → '310'"""
+    return code.strip().removesuffix("관").strip()
+
+
+def normalize_room_number(room_number: str) -> str:
+    """' 515호 ' → '515'"""
+    return "".join(room_number.split()).removesuffix("호")
+
+
+def parse_features(features: Optional[str]) -> frozenset:
+    """rooms.features ('빔프로젝터, 전자교탁') → 소문자 토큰 집합"""
+    if not features:
+        return frozenset()
+    return frozenset(token.strip().lower() for token in features.split(",") if token.strip())
+
+
+class Catalog:
+    """
+    buildings / rooms 전체를 메모리에 보관하고 dict 인덱스로 조회합니다.
+
+    rooms 항목은 /info/rooms 응답과 같은 형태(building 객체 + building_code 포함)로 미리 만들어 두며,
+    version 은 내용 해시라서 데이터가 바뀌었을 때만 달라집니다.
+    """
+
+    def __init__(self, buildings: List[dict], rooms: List[dict]):
+        self.buildings = sorted(buildings, key=lambda b: b["code"])
+        self.buildings_by_id: Dict[int, dict] = {b["id"]: b for b in self.buildings}
+        self.buildings_by_code: Dict[str, dict] = {b["code"]: b for b in self.buildings}
+
+        self.rooms: List[dict] = []
+        self.rooms_by_id: Dict[int, dict] = {}
+        self.rooms_by_key: Dict[Tuple[int, str], dict] = {}
+        self.rooms_by_building: Dict[int, List[dict]] = {}
+        self.features_by_id: Dict[int, frozenset] = {}
+        for row in sorted(rooms, key=lambda r: r["id"]):
+            building = self.buildings_by_id.get(row["building_id"])
+            room = {
+                **row,
+                "building": building,
+                "building_code": building["code"] if building else None,
+            }
+            self.rooms.append(room)
+            self.rooms_by_id[room["id"]] = room
+            self.rooms_by_key[(room["building_id"], normalize_room_number(room["room_number"]))] = room
+            self.rooms_by_building.setdefault(room["building_id"], []).append(room)
+            self.features_by_id[room["id"]] = parse_features(room.get("features"))
+
+        digest = hashlib.sha1(
+            json.dumps([self.buildings, rooms], sort_keys=True, default=str).encode()
+        )
+        self.version = digest.hexdigest()[:16]
+        self.loaded_at = time.monotonic()
+
+    def building(self, building_code: str) -> Optional[dict]:
+        return self.buildings_by_code.get(normalize_building_code(building_code))
+
+    def rooms_in(self, building_code: Optional[str] = None) -> Optional[List[dict]]:
+        """건물의 강의실 목록 (building_code 가 없으면 전체). 건물이 없으면 None."""
+        if building_code is None:
+            return self.rooms
+        building = self.building(building_code)
+        if building is None:
+            return None
+        return self.rooms_by_building.get(building["id"], [])
+
+    def room(self, building_code: str, room_number: str) -> Optional[dict]:
+        building = self.building(building_code)
+        if building is None:
+            return None
+        return self.rooms_by_key.get((building["id"], normalize_room_number(room_number)))
+
+
+async def _fetch_all(table: str, columns: str) -> List[dict]:
+    db = await get_db()
+    rows: List[dict] = []
+    offset = 0
+    while True:
+        res = await (
+            db.table(table)
+            .select(columns)
+            .order("id")
+            .range(offset, offset + PAGE_SIZE - 1)
+            .execute()
+        )
+        page = res.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+# ----------------------------------------
+# 프로세스 전역 카탈로그
+# ----------------------------------------
+_catalog: Optional[Catalog] = None
+_lock: Optional[asyncio.Lock] = None
+
+
+def _expired(catalog: Optional[Catalog]) -> bool:
+    return catalog is None or time.monotonic() - catalog.loaded_at > CATALOG_TTL_SECONDS
+
+
+async def fetch_catalog() -> Catalog:
+    """buildings, rooms 를 동시에 읽어 카탈로그를 만듭니다 (전역 카탈로그는 그대로)."""
+    buildings, rooms = await asyncio.gather(
+        _fetch_all("buildings", "*"),
+        _fetch_all("rooms", "*"),
+    )
+    return Catalog(buildings, rooms)
+
+
+async def load_catalog() -> Catalog:
+    """DB에서 다시 읽어 전역 카탈로그를 교체합니다."""
+    global _catalog
+    _catalog = await fetch_catalog()
+    return _catalog
+
+
+async def get_catalog() -> Catalog:
+    """
+    전역 카탈로그를 반환합니다. 아직 로드되지 않았거나 TTL이 지났으면 다시 로드합니다.
+    SHARED_SNAPSHOT_PATH 가 설정되어 있으면 워커 공유 스냅샷의 카탈로그를 반환합니다.
+    """
+    global _lock
+    if SHARED_SNAPSHOT_PATH:
+        from .shared_snapshot import shared_campus  # 순환 import 방지 (shared_snapshot 이 Catalog 를 사용)
+        return (await shared_campus.current()).catalog
+
+    if not _expired(_catalog):
+        return _catalog
+
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _expired(_catalog):
+            await load_catalog()
+    return _catalog
+
@@ -0,0 +1,85 @@
+"""
+같은 파라미터로 동시에 들어온 조회 요청 합치기 (single-flight).
+
+정시마다 수백 명이 같은 건물·같은 슬롯으로 /info/rooms/available 등을 거의 동시에 호출합니다.
+  - 키(엔드포인트 + 정규화된 파라미터)별로 첫 요청만 계산하고, 계산 중에 들어온 같은 요청은 같은 Future 를 기다립니다.
+  - 끝난 결과는 COALESCE_TTL_SECONDS(기본 1초) 동안 보관해 뒤늦게 도착한 요청도 흡수합니다.
+  - 실패(HTTPException 포함)는 기다리던 요청 모두에게 전달되지만 보관하지 않습니다.
+  - 계산은 별도 태스크에서 돌기 때문에 첫 요청의 클라이언트가 끊어도 나머지 요청은 영향을 받지 않습니다.
+
+결과 객체는 요청 사이에 공유되므로 호출하는 쪽에서 수정하면 안 됩니다.
+예약·시간표 변경이 들어오면 core/realtime.py 가 clear() 로 보관된 결과를 버립니다. clear() 는 세대(generation)를
+올리므로, 그 전에 시작된 계산은 새 요청과 합쳐지지 않고 끝나도 결과가 보관되지 않습니다 (변경 전 데이터일 수 있음).
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from .config import COALESCE_MAX_ENTRIES, COALESCE_TTL_SECONDS
+from .metrics import registry
+
+COALESCE_REQUESTS = registry.counter(
+    "coalesce_requests_total",
+    "Coalesced query lookups by endpoint and result (leader = computed, joined = awaited an in-flight call, cached = micro-TTL hit).",
+    ("endpoint", "result"))
+COALESCE_IN_FLIGHT = registry.gauge(
+    "coalesce_in_flight", "Distinct coalesced computations currently running.")
+COALESCE_IN_FLIGHT.set(0)
+
+
+class SingleFlight:
+    def __init__(self, ttl: float = COALESCE_TTL_SECONDS, max_entries: int = COALESCE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._in_flight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._results: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._generation = 0
+
+    async def run(self, endpoint: str, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """(endpoint, key) 결과. 보관된 결과 → 진행 중인 계산 → 새 계산 순으로 찾습니다."""
+        full_key = (endpoint, key)
+
+        cached = self._results.get(full_key)
+        if cached is not None:
+            expires_at, value = cached
+            if expires_at > time.monotonic():
+                COALESCE_REQUESTS.inc(endpoint=endpoint, result="cached")
+                return value
+            del self._results[full_key]
+
+        task = self._in_flight.get(full_key)
+        if task is not None:
+            COALESCE_REQUESTS.inc(endpoint=endpoint, result="joined")
+        else:
+            COALESCE_REQUESTS.inc(endpoint=endpoint, result="leader")
+            task = asyncio.ensure_future(compute())
+            self._in_flight[full_key] = task
+            COALESCE_IN_FLIGHT.inc()
+            generation = self._generation
+            task.add_done_callback(lambda done: self._finish(full_key, done, generation))
+
+        # shield: 이 요청이 취소돼도 공유 계산은 계속
+        return await asyncio.shield(task)
+
+    def _finish(self, full_key: Hashable, task: "asyncio.Task[Any]", generation: int):
+        if self._in_flight.get(full_key) is task:
+            del self._in_flight[full_key]
+        COALESCE_IN_FLIGHT.dec()
+        if task.cancelled() or task.exception() is not None or self.ttl <= 0:
+            return
+        if generation != self._generation:
+            return  # clear() 이후에 끝난 이전 세대 계산
+        self._results[full_key] = (time.monotonic() + self.ttl, task.result())
+        self._results.move_to_end(full_key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        """보관된 결과를 모두 버리고 세대를 올립니다. 진행 중인 계산은 기다리던 요청에게만 결과를 돌려줍니다."""
+        self._generation += 1
+        self._results.clear()
+        self._in_flight.clear()
+
+
+single_flight = SingleFlight()
@@ -1,6 +1,10 @@
 import os
+from typing import TYPE_CHECKING, Optional
+
 from dotenv import load_dotenv
-from supabase import create_client, Client
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 # .env 파일 로드
 load_dotenv()
@@ -8,8 +12,132 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY") # Service Role(Secret key)
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Supabase URL and Key must be set in .env file")
+# 데이터 백엔드: supabase (기본) | local (CSV 로 채운 인메모리 스탠드인, core/local_backend.py)
+DATA_BACKEND = os.getenv("DATA_BACKEND", "supabase").lower()
+if DATA_BACKEND not in ("supabase", "local"):
+    raise ValueError(f"Unknown DATA_BACKEND '{DATA_BACKEND}' (expected 'supabase' or 'local')")
+
+
+def require_supabase_credentials():
+    """Supabase 클라이언트를 만들기 직전에 확인합니다 (import 시점에는 자격 증명이 없어도 됨)."""
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise ValueError("Supabase URL and Key must be set in .env file")
+
+
+_supabase: Optional["Client"] = None
+
+
+def get_supabase() -> Optional["Client"]:
+    """
+    동기 Supabase 클라이언트 (CLI db/import_timetable.py, 원격 토큰 확인용). 처음 쓸 때 만듭니다.
+    local 백엔드면 None (두 기능 모두 사용할 수 없음).
+    """
+    global _supabase
+    if DATA_BACKEND != "supabase":
+        return None
+    if _supabase is None:
+        require_supabase_credentials()
+        from supabase import create_client  # supabase 패키지 import(~0.5초)도 실제로 쓸 때만
+        _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _supabase
+
+# local 백엔드 설정: 시드 CSV, 호출당 지연(ms) + 0~JITTER(ms) 무작위 추가 지연
+LOCAL_DB_SEED_CSV = os.getenv(
+    "LOCAL_DB_SEED_CSV",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "db", "Final_timetable.csv"),
+)
+LOCAL_DB_LATENCY_MS = float(os.getenv("LOCAL_DB_LATENCY_MS", "0"))
+LOCAL_DB_JITTER_MS = float(os.getenv("LOCAL_DB_JITTER_MS", "0"))
+LOCAL_DB_RANDOM_SEED = int(os.getenv("LOCAL_DB_RANDOM_SEED", "0"))
+
+# 메모리 시간표 인덱스 재로딩 주기 (초)
+OCCUPANCY_INDEX_TTL_SECONDS = int(os.getenv("OCCUPANCY_INDEX_TTL_SECONDS", "600"))
+
+# 건물·강의실 카탈로그 재로딩 주기 (초) - 학기 중 거의 바뀌지 않음
+CATALOG_TTL_SECONDS = int(os.getenv("CATALOG_TTL_SECONDS", "3600"))
+
+# 멀티 워커 공유 스냅샷 (core/shared_snapshot.py): 카탈로그 + 시간표 인덱스를 mmap 파일 하나로 모든 워커가 공유
+# 비워 두면 워커마다 따로 로드 (기본). 예: /dev/shm/classroom-informer/campus.snapshot
+SHARED_SNAPSHOT_PATH = os.getenv("SHARED_SNAPSHOT_PATH") or None
+SHARED_SNAPSHOT_POLL_SECONDS = float(os.getenv("SHARED_SNAPSHOT_POLL_SECONDS", "1"))   # 새 세대 확인 주기
+SHARED_SNAPSHOT_WAIT_SECONDS = float(os.getenv("SHARED_SNAPSHOT_WAIT_SECONDS", "30"))  # 첫 발행 대기 상한
+
+# 가용성 판정 위치: memory (메모리 시간표 인덱스 + 예약 쿼리, 기본) | rpc (db/functions.sql 의 집합 함수 한 번 호출)
+AVAILABILITY_BACKEND = os.getenv("AVAILABILITY_BACKEND", "memory").lower()
+if AVAILABILITY_BACKEND not in ("memory", "rpc"):
+    raise ValueError(f"Unknown AVAILABILITY_BACKEND '{AVAILABILITY_BACKEND}' (expected 'memory' or 'rpc')")
+
+# 실시간 변경 구독 (Supabase Realtime → 캐시 무효화 + /live 상태 푸시)
+REALTIME_ENABLED = os.getenv("REALTIME_ENABLED", "true").lower() == "true"
+LIVE_HEARTBEAT_SECONDS = float(os.getenv("LIVE_HEARTBEAT_SECONDS", "15"))
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "256"))  # 구독자별 대기 이벤트 수 (넘치면 오래된 것부터 버림)
+
+# 날짜별 빈 시간 엔진: (강의실, 주) 단위 점유 구간 캐시 (예약 반영 지연 상한)
+SCHEDULE_CACHE_TTL_SECONDS = int(os.getenv("SCHEDULE_CACHE_TTL_SECONDS", "60"))
+SCHEDULE_CACHE_MAX_ENTRIES = int(os.getenv("SCHEDULE_CACHE_MAX_ENTRIES", "4096"))
+
+# 동일 조회 합치기 (core/coalesce.py): 끝난 결과 보관 시간(초, 0 이면 진행 중인 요청만 합침)
+COALESCE_TTL_SECONDS = float(os.getenv("COALESCE_TTL_SECONDS", "1"))
+COALESCE_MAX_ENTRIES = int(os.getenv("COALESCE_MAX_ENTRIES", "1024"))
+
+# /info 정적 응답 캐시 (ETag + 미리 압축한 본문)
+HTTP_CACHE_MAX_AGE_SECONDS = int(os.getenv("HTTP_CACHE_MAX_AGE_SECONDS", "300"))
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "1024"))
+# 즐겨찾기 알림 스케줄러 설정
+# 실제 전달 대상(file | fcm)을 설정했을 때만 기본으로 켜집니다. memory 는 local 백엔드 전용 (확인용, 최대 MAX_ALERTS 건 보관)
+NOTIFICATION_SINK = os.getenv("NOTIFICATION_SINK", "").lower()  # file | fcm | memory
+NOTIFICATION_SCHEDULER_ENABLED = os.getenv(
+    "NOTIFICATION_SCHEDULER_ENABLED", "true" if NOTIFICATION_SINK in ("file", "fcm") else "false"
+).lower() == "true"
+NOTIFICATION_INTERVAL_SECONDS = int(os.getenv("NOTIFICATION_INTERVAL_SECONDS", "60"))
+NOTIFICATION_MINUTES_BEFORE = int(os.getenv("NOTIFICATION_MINUTES_BEFORE", "10"))
+NOTIFICATION_FILE_PATH = os.getenv("NOTIFICATION_FILE_PATH", "notifications.jsonl")
+NOTIFICATION_MEMORY_MAX_ALERTS = int(os.getenv("NOTIFICATION_MEMORY_MAX_ALERTS", "1000"))
+
+# JWT 로컬 검증 설정
+# - HS256 프로젝트: Supabase 대시보드의 JWT Secret 을 SUPABASE_JWT_SECRET 에 설정
+# - 비대칭 키 프로젝트: SUPABASE_JWKS_URL (기본값: {SUPABASE_URL}/auth/v1/.well-known/jwks.json)
+# - local 백엔드: 설정하지 않으면 개발용 고정 Secret 으로 토큰을 발급·검증
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET") or ("local-development-jwt-secret-not-for-production" if DATA_BACKEND == "local" else None)
+SUPABASE_JWKS_URL = os.getenv(
+    "SUPABASE_JWKS_URL",
+    f"{SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json" if SUPABASE_URL else None,
+)
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+AUTH_TOKEN_CACHE_TTL_SECONDS = int(os.getenv("AUTH_TOKEN_CACHE_TTL_SECONDS", "300"))
+# 로컬 검증에 필요한 키를 구할 수 없을 때 supabase.auth.get_user 로 확인할지 여부 (opt-in)
+AUTH_REMOTE_FALLBACK = os.getenv("AUTH_REMOTE_FALLBACK", "false").lower() == "true"
+
+# 요청 계측 (/metrics) 과 느린 요청 로그 기준 (ms)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+
+# 요청 프로파일링 (opt-in): 관리자 토큰 + X-Profile 헤더, 또는 SAMPLE_RATE 비율의 실제 트래픽
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "1"))
+
+# 앱 시작 (main.py lifespan): 예열이 끝날 때까지 연결을 받지 않을지, 그 대기 상한 (초)
+WARMUP_BLOCKING = os.getenv("WARMUP_BLOCKING", "true").lower() == "true"
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "60"))
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))  # 예열 실패 시 재시도 간격
+
+# 비동기 DB 클라이언트 HTTP 커넥션 풀 설정
+DB_HTTP2 = os.getenv("DB_HTTP2", "true").lower() == "true"
+DB_POOL_MAX_CONNECTIONS = int(os.getenv("DB_POOL_MAX_CONNECTIONS", "100"))
+DB_POOL_MAX_KEEPALIVE = int(os.getenv("DB_POOL_MAX_KEEPALIVE", "20"))
+DB_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("DB_KEEPALIVE_EXPIRY_SECONDS", "30"))
+DB_TIMEOUT_SECONDS = float(os.getenv("DB_TIMEOUT_SECONDS", "10"))
+DB_CONNECT_TIMEOUT_SECONDS = float(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "5"))
 
-# Supabase 클라이언트 인스턴스 생성
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+# upstream 장애 대응 (core/resilience.py): 읽기 마감·헤지, 회로 차단기, 마지막 정상 결과로 응답
+DB_RESILIENCE_ENABLED = os.getenv("DB_RESILIENCE_ENABLED", "true").lower() == "true"
+DB_READ_DEADLINE_SECONDS = float(os.getenv("DB_READ_DEADLINE_SECONDS", "2"))   # 읽기 한 번의 전체 마감 (헤지 포함)
+DB_HEDGE_AFTER_SECONDS = float(os.getenv("DB_HEDGE_AFTER_SECONDS", "0.3"))     # 응답이 없으면 같은 읽기를 다시 보낼 시간 (0 = 끔)
+DB_READ_ATTEMPTS = int(os.getenv("DB_READ_ATTEMPTS", "2"))                     # 읽기 한 번에 보낼 수 있는 최대 요청 수
+DB_BREAKER_FAILURES = int(os.getenv("DB_BREAKER_FAILURES", "5"))               # 연속 실패 몇 번이면 회로 열림
+DB_BREAKER_RESET_SECONDS = float(os.getenv("DB_BREAKER_RESET_SECONDS", "10"))  # 열린 뒤 시험 호출까지
+STALE_CACHE_MAX_ENTRIES = int(os.getenv("STALE_CACHE_MAX_ENTRIES", "2048"))
+STALE_MAX_AGE_SECONDS = float(os.getenv("STALE_MAX_AGE_SECONDS", "3600"))      # 이보다 오래된 결과는 쓰지 않음
@@ -0,0 +1,92 @@
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+from .metrics import InstrumentedClient
+from .resilience import ResilientClient
+
+from .config import (
+    DATA_BACKEND,
+    DB_RESILIENCE_ENABLED,
+    METRICS_ENABLED,
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    DB_HTTP2,
+    DB_POOL_MAX_CONNECTIONS,
+    DB_POOL_MAX_KEEPALIVE,
+    DB_KEEPALIVE_EXPIRY_SECONDS,
+    DB_TIMEOUT_SECONDS,
+    DB_CONNECT_TIMEOUT_SECONDS,
+    require_supabase_credentials,
+)
+
+# ----------------------------------------
+# 비동기 데이터 접근 계층
+# - 모든 라우터는 get_db() 로 얻은 AsyncClient 를 await 해서 사용합니다.
+# - PostgREST / Storage / Functions 호출은 keep-alive + HTTP/2 커넥션 풀 하나를 공유합니다.
+# - DATA_BACKEND=local 이면 같은 쿼리 API 를 흉내 내는 인메모리 클라이언트를 반환합니다.
+# - Supabase 가 느리거나 멈추면 읽기는 마지막 정상 결과로 응답합니다 (core/resilience.py).
+# ----------------------------------------
+_http_client: Optional[httpx.AsyncClient] = None
+_db: Optional["AsyncClient"] = None
+_lock: Optional[asyncio.Lock] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """설정값(풀 크기, 타임아웃, HTTP/2)으로 공유 httpx 클라이언트를 생성합니다."""
+    return httpx.AsyncClient(
+        http2=DB_HTTP2,
+        limits=httpx.Limits(
+            max_connections=DB_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=DB_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=DB_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(DB_TIMEOUT_SECONDS, connect=DB_CONNECT_TIMEOUT_SECONDS),
+        follow_redirects=True,
+    )
+
+
+async def get_db() -> "AsyncClient":
+    """프로세스 전역 AsyncClient 를 반환합니다 (최초 호출 시 생성 - import 만으로는 만들지 않음)."""
+    global _db, _http_client, _lock
+    if _db is not None:
+        return _db
+
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _db is None:
+            if DATA_BACKEND == "local":
+                from .local_backend import create_local_client
+                client = create_local_client()
+            else:
+                require_supabase_credentials()
+                from supabase import AsyncClientOptions, acreate_client  # 무거운 import 는 클라이언트를 만들 때만
+                _http_client = create_http_client()
+                client = await acreate_client(
+                    SUPABASE_URL,
+                    SUPABASE_KEY,
+                    options=AsyncClientOptions(
+                        httpx_client=_http_client,
+                        postgrest_client_timeout=DB_TIMEOUT_SECONDS,
+                    ),
+                )
+            # 요청별 upstream 호출 수·시간·행 수 기록 (core.metrics) - 헤지로 보낸 요청도 각각 기록
+            if METRICS_ENABLED:
+                client = InstrumentedClient(client)
+            # 읽기 마감·헤지, 회로 차단기, 장애 시 마지막 정상 결과 (core.resilience)
+            _db = ResilientClient(client) if DB_RESILIENCE_ENABLED else client
+    return _db
+
+
+async def close_db():
+    """공유 커넥션 풀을 닫습니다 (앱 종료 시)."""
+    global _db, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _db = None
+    _http_client = None
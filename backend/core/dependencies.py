@@ -1,6 +1,8 @@
+from typing import Optional
 from fastapi import Request, HTTPException, status, Depends, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from .config import supabase
+from .jwt_verifier import InvalidToken, VerificationUnavailable, cached_user_id, verify_token
 
 bearer_scheme = HTTPBearer()
 
@@ -8,21 +10,41 @@ bearer_scheme = HTTPBearer()
 async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
 ) -> str:
-    token = credentials.credentials
+    return await user_id_from_token(credentials.credentials)
 
-    try:
-        user_response = supabase.auth.get_user(token)
 
-        if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid or expired token"
-            )
-        
-        return user_response.user.id
+# 로그인은 선택인 엔드포인트용 (토큰이 없으면 None, 있으면 검증)
+async def get_optional_user_id(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+) -> Optional[str]:
+    if credentials is None:
+        return None
+    return await user_id_from_token(credentials.credentials)
+
+
+# 토큰 → 사용자 ID (WebSocket 처럼 헤더 의존성을 쓸 수 없는 곳에서도 사용)
+async def user_id_from_token(token: str) -> str:
+    # 최근 검증한 토큰은 캐시에서 바로 반환 (네트워크·서명 검증 생략)
+    user_id = cached_user_id(token)
+    if user_id:
+        return user_id
+
+    try:
+        # JWKS 조회·원격 fallback 이 이벤트 루프를 막지 않도록 스레드에서 검증
+        return await run_in_threadpool(verify_token, token)
 
+    except InvalidToken:
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired token"
+        )
+    except VerificationUnavailable:
+        raise HTTPException(
+            status_code=503,
+            detail="Token verification is temporarily unavailable"
+        )
     except Exception:
         raise HTTPException(
             status_code=401,
             detail="Could not validate credentials"
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,94 @@
+"""
+프로세스 내부 이벤트 버스.
+
+  - change_bus : reservations / timetable_entries 행 변경 (ChangeEvent)
+                 Supabase Realtime(postgres_changes) 수신기 또는 local 백엔드(core/local_backend.py)가 발행
+  - room_events: 강의실 상태 변화 ("지금 비었음 / 사용 중") - /live SSE·WebSocket 구독자에게 전달
+
+publish 는 이벤트 루프 스레드에서 호출하는 동기 함수이며 기다리지 않습니다.
+구독자 큐가 가득 차면(느린 클라이언트) 가장 오래된 이벤트를 버립니다.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, List, Optional, Set, TypeVar
+
+from .config import LIVE_QUEUE_SIZE
+
+T = TypeVar("T")
+
+
+@dataclass
+class ChangeEvent:
+    """행 변경 하나. op 는 Realtime 과 같은 'INSERT' | 'UPDATE' | 'DELETE'."""
+    table: str
+    op: str
+    record: Optional[dict] = None
+    old_record: Optional[dict] = None
+
+    @property
+    def row_id(self) -> Any:
+        return (self.record or {}).get("id", (self.old_record or {}).get("id"))
+
+    @property
+    def room_ids(self) -> Set[int]:
+        """변경 전후 행의 room_id. 삭제 이벤트의 old_record 에 room_id 가 없으면 (REPLICA IDENTITY DEFAULT) 빈 집합."""
+        return {
+            row["room_id"]
+            for row in (self.record, self.old_record)
+            if row and row.get("room_id") is not None
+        }
+
+
+class Subscription(Generic[T]):
+    def __init__(self, bus: "EventBus[T]", predicate: Optional[Callable[[T], bool]], maxsize: int):
+        self._bus = bus
+        self.predicate = predicate
+        self.queue: "asyncio.Queue[T]" = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def offer(self, event: T):
+        if self.predicate is not None and not self.predicate(event):
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> T:
+        return await self.queue.get()
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription[T]":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class EventBus(Generic[T]):
+    def __init__(self, maxsize: int = LIVE_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._subscriptions: List[Subscription[T]] = []
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, predicate: Optional[Callable[[T], bool]] = None, maxsize: Optional[int] = None) -> Subscription[T]:
+        subscription = Subscription(self, predicate, maxsize or self.maxsize)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription[T]):
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def publish(self, event: T):
+        for subscription in list(self._subscriptions):
+            subscription.offer(event)
+
+
+change_bus: EventBus[ChangeEvent] = EventBus(maxsize=10_000)
+room_events: EventBus[dict] = EventBus()
@@ -0,0 +1,118 @@
+"""
+학생 시간표의 공강(수업과 수업 사이 빈 시간) 계산과 공강마다 쓸 수 있는 강의실 추천.
+
+한 학생의 모든 공강을 한 번에 평가합니다.
+  - 수업: 점유 비트맵에서 강의실 × 공강 전체를 한 번의 AND/any 로 판정 (AvailabilityMatrix.free_per_slot)
+  - 예약: 날짜가 주어지면 후보 강의실 전체에 대해 busy_between 한 번 (주 단위 캐시, 예약 쿼리 최대 1회/주)
+공강마다 availability 요청을 따로 보내지 않아도 됩니다.
+"""
+import heapq
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .availability_matrix import get_availability_matrix
+from .catalog import Catalog
+from .occupancy import DAYS, format_minutes, to_minutes
+from .schedule import busy_between, overlaps
+
+# (요일, 날짜 또는 None) - 날짜가 있으면 그날의 확정 예약도 확인
+Target = Tuple[str, Optional[date]]
+
+
+def find_gaps(rows: Iterable[dict], targets: Sequence[Target], min_gap: int) -> List[dict]:
+    """
+    student_timetable 행에서 요일(날짜)별 수업 사이 빈 시간을 찾습니다. 겹치는 수업은 하나로 봅니다.
+    각 공강: {day, date, start, end (분), before, after (앞뒤 수업 행)}
+    """
+    by_day: Dict[str, List[Tuple[int, int, dict]]] = {}
+    for row in rows:
+        try:
+            start, end = to_minutes(row["start_time"]), to_minutes(row["end_time"])
+        except (KeyError, TypeError, ValueError):
+            continue  # 포맷 에러 시 해당 행 무시
+        if end > start:
+            by_day.setdefault(row["day"], []).append((start, end, row))
+
+    gaps = []
+    for day, on_date in targets:
+        classes = sorted(by_day.get(day, []), key=lambda c: (c[0], c[1]))
+        if not classes:
+            continue
+        busy_until, before = classes[0][1], classes[0][2]
+        for start, end, row in classes[1:]:
+            if start - busy_until >= min_gap:
+                gaps.append({"day": day, "date": on_date, "start": busy_until, "end": start, "before": before, "after": row})
+            if end >= busy_until:
+                busy_until, before = end, row
+    return gaps
+
+
+def _rank(room: dict, near_rooms: set, near_buildings: set) -> int:
+    """0: 앞뒤 수업 강의실, 1: 앞뒤 수업 건물, 2: 그 외"""
+    if room["id"] in near_rooms:
+        return 0
+    if room["building_id"] in near_buildings:
+        return 1
+    return 2
+
+
+async def rooms_for_gaps(catalog: Catalog, gaps: List[dict], limit: int) -> List[List[dict]]:
+    """공강마다 그 시간 내내 비어 있는 강의실을 (앞뒤 수업 강의실 → 같은 건물 → 그 외) 순으로 limit 개."""
+    if not gaps:
+        return []
+
+    rooms = catalog.rooms
+    matrix = await get_availability_matrix()
+    free = matrix.free_per_slot(
+        [room["id"] for room in rooms],
+        [(DAYS.index(gap["day"]), gap["start"], gap["end"]) for gap in gaps],
+    )
+
+    # 날짜가 있는 공강은 수업 기준으로 남은 후보만 예약과 대조 (한 번에)
+    dated = [i for i, gap in enumerate(gaps) if gap["date"] is not None]
+    if dated:
+        days = [gaps[i]["date"] for i in dated]
+        candidates = np.flatnonzero(free[:, dated].any(axis=1))
+        busy = await busy_between([rooms[r]["id"] for r in candidates], min(days), max(days))
+        for r in candidates:
+            by_date = busy[rooms[r]["id"]]
+            for i in dated:
+                gap = gaps[i]
+                if free[r, i] and overlaps(by_date[gap["date"]], gap["start"], gap["end"]):
+                    free[r, i] = False
+
+    result = []
+    for i, gap in enumerate(gaps):
+        near = [row.get("room_id") for row in (gap["before"], gap["after"]) if row.get("room_id") is not None]
+        near_rooms = set(near)
+        near_buildings = {catalog.rooms_by_id[room_id]["building_id"] for room_id in near if room_id in catalog.rooms_by_id}
+        ranked = heapq.nsmallest(
+            limit,
+            (rooms[r] for r in np.flatnonzero(free[:, i])),
+            key=lambda room: (_rank(room, near_rooms, near_buildings), room["id"]),
+        )
+        result.append([
+            {
+                "room_id": room["id"],
+                "building_code": room["building_code"],
+                "room_number": room["room_number"],
+                "same_building": room["building_id"] in near_buildings,
+            }
+            for room in ranked
+        ])
+    return result
+
+
+def class_summary(catalog: Catalog, row: dict) -> dict:
+    """공강 앞뒤 수업 요약 (강의실은 카탈로그에서)."""
+    room = catalog.rooms_by_id.get(row.get("room_id"))
+    return {
+        "course_name": row.get("course_name"),
+        "start": format_minutes(to_minutes(row["start_time"])),
+        "end": format_minutes(to_minutes(row["end_time"])),
+        "room_id": room["id"] if room else None,
+        "building_code": room["building_code"] if room else None,
+        "room_number": room["room_number"] if room else None,
+    }
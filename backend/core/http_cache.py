@@ -0,0 +1,157 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from .config import HTTP_CACHE_MAX_AGE_SECONDS, HTTP_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli  # requirements.txt 에 고정
+except ImportError:  # brotli 미설치 시 gzip 만 제공
+    brotli = None
+    logger.warning("brotli is not installed; cached /info responses are precompressed with gzip only")
+
+# CachedBody 가 항상 만드는 변형 (304 응답의 ETag 도 이 중에서 고름)
+ENCODINGS = ("identity", "gzip", "br") if brotli is not None else ("identity", "gzip")
+
+
+class CachedBody:
+    """직렬화가 끝난 본문과 미리 압축해 둔 gzip / brotli 변형. 압축이 무거우므로 이벤트 루프 밖(스레드)에서 만듭니다."""
+
+    def __init__(self, version: str, body: bytes):
+        self.version = version
+        self.variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body, quality=11)
+
+
+def _accepted_encoding(request: Request, available) -> str:
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        token, _, params = part.strip().partition(";")
+        if token and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(token.lower())
+    for encoding in ("br", "gzip"):
+        if encoding in accepted and encoding in available:
+            return encoding
+    return "identity"
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        # 인코딩별 변형("-gzip", "-br")도 같은 내용으로 취급 (If-None-Match 는 약한 비교)
+        if candidate.split("-", 1)[0] == etag:
+            return True
+    return False
+
+
+def json_serializer(adapter: TypeAdapter) -> Callable[[Any], bytes]:
+    """response_model 과 같은 형태로 검증·직렬화하는 함수를 만듭니다."""
+    return lambda data: adapter.dump_json(adapter.validate_python(data))
+
+
+class ResponseCache:
+    """
+    (엔드포인트, 정규화된 파라미터) 키별로 직렬화된 응답을 보관하는 LRU 캐시.
+
+    항목은 데이터 버전(카탈로그/시간표 해시)에 묶여 있어, 버전이 바뀌면 다음 요청에서 다시 만들어집니다.
+    ETag 는 (키, 버전)에서 바로 계산되므로, If-None-Match 가 일치하면 캐시가 비어 있어도
+    본문을 만들지 않고 304 를 반환합니다.
+    """
+
+    def __init__(self, max_entries: int = HTTP_CACHE_MAX_ENTRIES, max_age: int = HTTP_CACHE_MAX_AGE_SECONDS):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._items: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._lock = Lock()
+        # 버전이 바뀐 직후 몰린 요청이 같은 본문을 여러 번 압축하지 않도록 (키, 버전)별 진행 중인 빌드
+        self._building: "Dict[Tuple[Hashable, str], asyncio.Future[CachedBody]]" = {}
+
+    def _get(self, key: Hashable, version: str) -> Optional[CachedBody]:
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is None or cached.version != version:
+                return None
+            self._items.move_to_end(key)
+            return cached
+
+    def _put(self, key: Hashable, cached: CachedBody):
+        with self._lock:
+            self._items[key] = cached
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    async def _build(
+        self, key: Hashable, version: str, build: Callable[[], Any], serialize: Callable[[Any], bytes]
+    ) -> CachedBody:
+        building_key = (key, version)
+        future = self._building.get(building_key)
+        if future is None:
+            future = asyncio.ensure_future(
+                asyncio.to_thread(lambda: CachedBody(version, serialize(build())))
+            )
+            self._building[building_key] = future
+            try:
+                cached = await asyncio.shield(future)
+            finally:
+                if self._building.get(building_key) is future:
+                    del self._building[building_key]
+            self._put(key, cached)
+            return cached
+        return await asyncio.shield(future)
+
+    async def respond(
+        self,
+        request: Request,
+        key: Hashable,
+        version: str,
+        build: Callable[[], Any],
+        serialize: Callable[[Any], bytes],
+        media_type: str = "application/json",
+        vary: Tuple[str, ...] = (),
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """
+        캐시된 본문으로 응답합니다. 없으면 build() 결과를 serialize() 로 직렬화·압축해(스레드에서, 키·버전당 한 번) 저장합니다.
+        본문이 Accept-Encoding 외의 요청 헤더에 따라 달라지면 vary 로 넘겨 공유 캐시(CDN)가 구분하게 합니다.
+        extra_headers 는 200 과 304 응답 모두에 붙습니다.
+        """
+        etag = hashlib.sha1(f"{key!r}:{version}".encode()).hexdigest()[:20]
+        headers = {
+            "Cache-Control": f"public, max-age={self.max_age}, must-revalidate",
+            "Vary": ", ".join(("Accept-Encoding",) + vary),
+            **(extra_headers or {}),
+        }
+
+        # 인코딩마다 바이트가 다르므로 강한 ETag 도 변형별로 구분 (304 도 200 과 같은 값)
+        encoding = _accepted_encoding(request, ENCODINGS)
+        headers["ETag"] = f'"{etag}"' if encoding == "identity" else f'"{etag}-{encoding}"'
+
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        cached = self._get(key, version)
+        if cached is None:
+            cached = await self._build(key, version, build, serialize)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=cached.variants[encoding], media_type=media_type, headers=headers)
+
+
+response_cache = ResponseCache()
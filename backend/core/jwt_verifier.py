@@ -0,0 +1,134 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+
+import jwt
+
+from .config import (
+    get_supabase,
+    SUPABASE_JWT_SECRET,
+    SUPABASE_JWKS_URL,
+    SUPABASE_JWT_AUDIENCE,
+    AUTH_TOKEN_CACHE_SIZE,
+    AUTH_TOKEN_CACHE_TTL_SECONDS,
+    AUTH_REMOTE_FALLBACK,
+)
+
+
+class InvalidToken(Exception):
+    """토큰이 위조·만료되었거나 필요한 클레임이 없을 때."""
+
+
+class VerificationUnavailable(Exception):
+    """로컬 검증에 필요한 키(Secret/JWKS)를 구할 수 없을 때."""
+
+
+class TokenCache:
+    """
+    검증이 끝난 토큰 → user_id 를 보관하는 LRU + TTL 캐시.
+    항목은 설정한 TTL 과 토큰 자체의 exp 중 더 이른 시각에 만료됩니다.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, token: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            item = self._items.get(token)
+            if item is None:
+                return None
+            user_id, expires_at = item
+            if expires_at <= now:
+                del self._items[token]
+                return None
+            self._items.move_to_end(token)
+            return user_id
+
+    def put(self, token: str, user_id: str, exp: Optional[float] = None):
+        expires_at = time.time() + self.ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        with self._lock:
+            self._items[token] = (user_id, expires_at)
+            self._items.move_to_end(token)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+token_cache = TokenCache(AUTH_TOKEN_CACHE_SIZE, AUTH_TOKEN_CACHE_TTL_SECONDS)
+
+# JWKS 는 PyJWKClient 가 내부적으로 캐시합니다 (키 교체 시 kid 미스로 재조회).
+_jwks_client = jwt.PyJWKClient(SUPABASE_JWKS_URL, cache_keys=True, lifespan=3600) if SUPABASE_JWKS_URL else None
+
+
+def _signing_key(token: str, algorithm: str):
+    if algorithm == "HS256":
+        if not SUPABASE_JWT_SECRET:
+            raise VerificationUnavailable("SUPABASE_JWT_SECRET is not set")
+        return SUPABASE_JWT_SECRET
+    if _jwks_client is None:
+        raise VerificationUnavailable("SUPABASE_JWKS_URL is not set")
+    try:
+        return _jwks_client.get_signing_key_from_jwt(token).key
+    except jwt.PyJWKClientConnectionError as e:
+        raise VerificationUnavailable(str(e))
+    except jwt.PyJWKClientError as e:
+        raise InvalidToken(str(e))
+
+
+def verify_locally(token: str) -> Tuple[str, Optional[float]]:
+    """
+    서명·만료·audience 를 로컬에서 검증하고 (user_id, exp) 를 반환합니다.
+    """
+    try:
+        algorithm = jwt.get_unverified_header(token).get("alg")
+        claims = jwt.decode(
+            token,
+            _signing_key(token, algorithm),
+            algorithms=[algorithm] if algorithm in ("HS256", "RS256", "ES256") else [],
+            audience=SUPABASE_JWT_AUDIENCE,
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.InvalidTokenError as e:
+        raise InvalidToken(str(e))
+    return claims["sub"], claims.get("exp")
+
+
+def verify_remotely(token: str) -> str:
+    """Supabase Auth 서버에 직접 확인합니다 (네트워크 왕복 발생)."""
+    supabase = get_supabase()
+    if supabase is None:
+        raise VerificationUnavailable("remote verification requires DATA_BACKEND=supabase")
+    user_response = supabase.auth.get_user(token)
+    if not user_response or not user_response.user:
+        raise InvalidToken("Invalid or expired token")
+    return user_response.user.id
+
+
+def cached_user_id(token: str) -> Optional[str]:
+    return token_cache.get(token)
+
+
+def verify_token(token: str) -> str:
+    """
+    토큰을 검증해 user_id 를 반환합니다.
+    로컬 키를 쓸 수 없는 경우에만, 그리고 AUTH_REMOTE_FALLBACK 이 켜져 있을 때만 원격 확인합니다.
+    """
+    user_id = token_cache.get(token)
+    if user_id:
+        return user_id
+
+    try:
+        user_id, exp = verify_locally(token)
+    except VerificationUnavailable:
+        if not AUTH_REMOTE_FALLBACK:
+            raise
+        user_id, exp = verify_remotely(token), None
+
+    token_cache.put(token, user_id, exp)
+    return user_id
@@ -0,0 +1,868 @@
+"""
+Supabase(PostgREST + Auth) 대신 쓸 수 있는 인메모리 데이터 백엔드.
+
+DATA_BACKEND=local 이면 core.database.get_db() 가 이 클라이언트를 반환합니다.
+Final_timetable.csv 로 buildings / rooms / timetable_entries 를 채우고,
+호출마다 LOCAL_DB_LATENCY_MS (+ 0 ~ LOCAL_DB_JITTER_MS) 만큼 지연시켜 네트워크 왕복을 흉내 냅니다.
+
+라우터가 실제로 쓰는 쿼리 빌더 부분집합만 구현합니다.
+  - select (embed 포함: "user_id, rooms(room_number, buildings(code))"), insert / upsert / update / delete
+  - eq / neq / gt / gte / lt / lte / in_ / is_, order / limit / range, single / maybe_single
+  - rpc (LOCAL_RPC 에 등록된 함수, order / range 포함), auth.sign_up / sign_in_with_password
+"""
+import asyncio
+import hashlib
+import itertools
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import jwt
+from postgrest.exceptions import APIError
+from supabase_auth.errors import AuthApiError
+
+from .config import (
+    SUPABASE_JWT_SECRET,
+    SUPABASE_JWT_AUDIENCE,
+    LOCAL_DB_SEED_CSV,
+    LOCAL_DB_LATENCY_MS,
+    LOCAL_DB_JITTER_MS,
+    LOCAL_DB_RANDOM_SEED,
+)
+from .events import ChangeEvent, change_bus
+from .occupancy import DAYS, Interval, format_minutes, free_gaps, merge_intervals, to_minutes
+from .schedule import parse_timestamp, split_by_date
+
+# (테이블, 컬럼) → 참조 테이블. embed("rooms(...)") 해석과 FK 검사에 사용
+FOREIGN_KEYS: Dict[Tuple[str, str], str] = {
+    ("rooms", "building_id"): "buildings",
+    ("timetable_entries", "room_id"): "rooms",
+    ("reservations", "room_id"): "rooms",
+    ("favorites", "room_id"): "rooms",
+    ("student_timetable", "room_id"): "rooms",
+}
+
+# upsert 의 기본 on_conflict 와 insert 중복 검사에 쓰는 유니크 키 (schema.sql 기준)
+UNIQUE_KEYS: Dict[str, List[Tuple[str, ...]]] = {
+    "buildings": [("id",), ("code",)],
+    "rooms": [("id",), ("building_id", "room_number")],
+    "timetable_entries": [("id",), ("room_id", "day", "start_time", "end_time", "course_code")],
+    "reservations": [("id",)],
+    "favorites": [("user_id", "room_id")],
+    "profiles": [("id",)],
+    "student_timetable": [("id",)],
+    "change_log": [("version",)],
+}
+
+IDENTITY_COLUMNS = {
+    "buildings": "id",
+    "rooms": "id",
+    "timetable_entries": "id",
+    "reservations": "id",
+    "student_timetable": "id",
+    "change_log": "version",
+}
+
+DEFAULTS: Dict[str, Dict[str, Callable[[], Any]]] = {
+    "timetable_entries": {"source": lambda: "Final_timetable.csv"},
+    "reservations": {"status": lambda: "confirmed"},
+    "profiles": {"role": lambda: "student"},
+}
+CREATED_AT_TABLES = {"timetable_entries", "reservations", "favorites", "profiles", "student_timetable"}
+
+# change_log.sql 의 record_change 트리거와 같은 동작
+CHANGE_LOGGED_TABLES = {"reservations", "timetable_entries"}
+RESERVATION_LOG_COLUMNS = ("id", "room_id", "start_at", "end_at", "status")
+
+# enum 컬럼은 선언 순서로 정렬 (Postgres 와 동일)
+ENUM_ORDER = {"day": {day: i for i, day in enumerate(DAYS)}}
+
+# supabase.rpc(name, params) 로 호출할 수 있는 함수: (store, params) → 결과
+LOCAL_RPC: Dict[str, Callable[["LocalStore", dict], Any]] = {}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _comparable(value: Any) -> Any:
+    """ISO 타임스탬프 문자열은 datetime 으로 바꿔 시간대가 달라도 비교되게 합니다."""
+    if isinstance(value, str) and len(value) >= 19 and value[4] == "-" and value[10] in "T ":
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    return value
+
+
+def _coerce(expected: Any, value: Any) -> Any:
+    """PostgREST 처럼 필터 값을 컬럼 타입에 맞춥니다 (예: bigint 컬럼에 '5')."""
+    if isinstance(expected, int) and not isinstance(expected, bool) and isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return _comparable(value)
+
+
+def _split_top_level(text: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        depth += (ch == "(") - (ch == ")")
+        current.append(ch)
+    parts.append("".join(current))
+    return [p for p in parts if p]
+
+
+def parse_columns(columns: str) -> List[Tuple[str, Optional[list]]]:
+    """'id, rooms(room_number, buildings(code))' → [('id', None), ('rooms', [...])]"""
+    compact = "".join(columns.split())
+    parsed = []
+    for part in _split_top_level(compact or "*"):
+        if part.endswith(")") and "(" in part:
+            name, inner = part[:-1].split("(", 1)
+            name = name.split(":")[-1].split("!")[0]
+            parsed.append((name, parse_columns(inner)))
+        else:
+            parsed.append((part, None))
+    return parsed
+
+
+class LocalStore:
+    """테이블 이름 → 행 목록. 모든 쓰기는 이벤트 루프 안에서 동기적으로 일어나므로 락이 필요 없습니다."""
+
+    def __init__(self):
+        self.tables: Dict[str, List[dict]] = {name: [] for name in UNIQUE_KEYS}
+        self._ids: Dict[str, itertools.count] = {name: itertools.count(1) for name in IDENTITY_COLUMNS}
+        self._by_id: Dict[str, Dict[Any, dict]] = {}
+        self._by_key: Dict[Tuple[str, Tuple[str, ...]], Dict[tuple, dict]] = {}
+        self.users: Dict[str, dict] = {}
+
+    # ---------- 조회 ----------
+    def rows(self, table: str) -> List[dict]:
+        if table not in self.tables:
+            raise APIError({
+                "message": f'relation "public.{table}" does not exist',
+                "code": "42P01",
+                "hint": None,
+                "details": None,
+            })
+        return self.tables[table]
+
+    def by_id(self, table: str) -> Dict[Any, dict]:
+        index = self._by_id.get(table)
+        if index is None:
+            index = self._by_id[table] = {row["id"]: row for row in self.rows(table) if "id" in row}
+        return index
+
+    def _invalidate(self, table: str):
+        self._by_id.pop(table, None)
+        for cached in [k for k in self._by_key if k[0] == table]:
+            del self._by_key[cached]
+
+    def project(self, table: str, row: dict, columns: List[Tuple[str, Optional[list]]]) -> dict:
+        result = {}
+        for name, nested in columns:
+            if nested is None:
+                if name == "*":
+                    result.update(row)
+                else:
+                    result[name] = row.get(name)
+                continue
+            result[name] = self._embed(table, row, name, nested)
+        return result
+
+    def _embed(self, table: str, row: dict, target: str, columns: list):
+        for (source, column), ref in FOREIGN_KEYS.items():
+            if source == table and ref == target:
+                # many-to-one: 객체 하나 (없으면 None)
+                parent = self.by_id(target).get(row.get(column))
+                return self.project(target, parent, columns) if parent else None
+        for (source, column), ref in FOREIGN_KEYS.items():
+            if source == target and ref == table:
+                # one-to-many: 배열
+                return [
+                    self.project(target, child, columns)
+                    for child in self.rows(target) if child.get(column) == row.get("id")
+                ]
+        raise APIError({
+            "message": f"Could not find a relationship between '{table}' and '{target}'",
+            "code": "PGRST200",
+            "hint": None,
+            "details": None,
+        })
+
+    # ---------- 쓰기 ----------
+    def _conflict(self, table: str, row: dict, keys: Tuple[str, ...]) -> Optional[dict]:
+        if any(key not in row for key in keys):
+            return None
+        index = self._by_key.get((table, keys))
+        if index is None:
+            index = self._by_key[(table, keys)] = {
+                tuple(existing.get(key) for key in keys): existing for existing in self.rows(table)
+            }
+        return index.get(tuple(row[key] for key in keys))
+
+    def _check_foreign_keys(self, table: str, row: dict):
+        for (source, column), ref in FOREIGN_KEYS.items():
+            if source == table and row.get(column) is not None and row[column] not in self.by_id(ref):
+                raise APIError({
+                    "message": f'insert or update on table "{table}" violates foreign key constraint',
+                    "code": "23503",
+                    "hint": None,
+                    "details": f"Key ({column})=({row[column]}) is not present in table \"{ref}\".",
+                })
+
+    def _log_change(self, table: str, row: dict, op: str, old: Optional[dict] = None):
+        if table not in CHANGE_LOGGED_TABLES:
+            return
+        # Supabase Realtime(postgres_changes, REPLICA IDENTITY FULL)과 같은 이벤트
+        change_bus.publish(ChangeEvent(
+            table=table,
+            op=op.upper(),
+            record=None if op == "delete" else dict(row),
+            old_record=None if op == "insert" else dict(old or row),
+        ))
+        data = None
+        if op != "delete":
+            if table == "reservations":
+                data = {key: row.get(key) for key in RESERVATION_LOG_COLUMNS}
+                if row.get("status") == "cancelled":
+                    op = "cancel"
+            else:
+                data = dict(row)
+        version = next(self._ids["change_log"])
+        self.tables["change_log"].append({
+            "version": version,
+            "seq": version,  # 쓰기가 바로 커밋되므로 삽입 순서 = 발행 순서
+            "table_name": table,
+            "row_id": row["id"],
+            "op": op,
+            "row_data": data,
+            "changed_at": _now(),
+        })
+
+    def insert(
+        self,
+        table: str,
+        rows: List[dict],
+        on_conflict: Optional[Tuple[str, ...]] = None,
+        upsert: bool = False,
+        ignore_duplicates: bool = False,
+    ) -> List[dict]:
+        written = []
+        for payload in rows:
+            keys_list = [on_conflict] if on_conflict else UNIQUE_KEYS.get(table, [])
+            existing = None
+            for keys in keys_list:
+                existing = self._conflict(table, payload, keys)
+                if existing is not None:
+                    break
+
+            if existing is not None:
+                if not upsert:
+                    raise APIError({
+                        "message": f'duplicate key value violates unique constraint "{table}_{"_".join(keys)}_key"',
+                        "code": "23505",
+                        "hint": None,
+                        "details": None,
+                    })
+                if ignore_duplicates:
+                    continue
+                self._check_foreign_keys(table, {**existing, **payload})
+                old = dict(existing)
+                existing.update(payload)
+                self._invalidate(table)  # 키 컬럼이 바뀌었을 수 있음
+                self._log_change(table, existing, "update", old)
+                written.append(existing)
+                continue
+
+            row = dict(payload)
+            identity = IDENTITY_COLUMNS.get(table)
+            if identity and identity not in row:
+                row[identity] = next(self._ids[table])
+            for column, default in DEFAULTS.get(table, {}).items():
+                row.setdefault(column, default())
+            if table in CREATED_AT_TABLES:
+                row.setdefault("created_at", _now())
+            self._check_foreign_keys(table, row)
+            self.rows(table).append(row)
+            for (indexed_table, keys), index in self._by_key.items():
+                if indexed_table == table:
+                    index[tuple(row.get(key) for key in keys)] = row
+            self._log_change(table, row, "insert")
+            written.append(row)
+
+        self._invalidate(table)
+        return written
+
+    def update(self, table: str, rows: List[dict], values: dict) -> List[dict]:
+        for row in rows:
+            self._check_foreign_keys(table, {**row, **values})
+            old = dict(row)
+            row.update(values)
+            self._log_change(table, row, "update", old)
+        self._invalidate(table)
+        return rows
+
+    def delete(self, table: str, rows: List[dict]) -> List[dict]:
+        doomed = {id(row) for row in rows}
+        self.tables[table] = [row for row in self.rows(table) if id(row) not in doomed]
+        for row in rows:
+            if "id" in row:
+                self._log_change(table, row, "delete")
+        self._invalidate(table)
+        return rows
+
+    # ---------- 시드 ----------
+    def seed_from_csv(self, path: str) -> int:
+        """import_timetable 과 같은 검증·정규화로 CSV 를 읽어 세 테이블을 채웁니다. 반환값: 시간표 행 수."""
+        from db.import_timetable import parse_row, read_chunks
+
+        buildings: Dict[str, dict] = {}
+        rooms: Dict[Tuple[int, str], dict] = {}
+        for chunk in read_chunks(path, 2000):
+            entries = []
+            for _, raw in chunk:
+                try:
+                    row = parse_row(raw)
+                except ValueError:
+                    continue
+                building = buildings.get(row["building"])
+                if building is None:
+                    building = buildings[row["building"]] = self.insert("buildings", [{"code": row["building"], "name": None}])[0]
+                room = rooms.get((building["id"], row["room"]))
+                if room is None:
+                    room = rooms[(building["id"], row["room"])] = self.insert("rooms", [{
+                        "building_id": building["id"],
+                        "room_number": row["room"],
+                        "capacity": None,
+                        "room_type": None,
+                        "features": None,
+                        "photo_url": None,
+                    }])[0]
+                entries.append({
+                    "room_id": room["id"],
+                    "day": row["day"],
+                    "start_time": row["start_time"],
+                    "end_time": row["end_time"],
+                    "course_code": row["course_code"],
+                    "course_name": row["course_name"],
+                    "department": row["department"],
+                    "instructor": row["instructor"],
+                })
+            self.insert("timetable_entries", entries, upsert=True, ignore_duplicates=True)
+        # 시드 데이터는 변경 이력이 아님
+        self.tables["change_log"].clear()
+        return len(self.tables["timetable_entries"])
+
+
+# ----------------------------------------
+# db/functions.sql 의 RPC 함수 (이벤트 루프 안에서 동기 실행되므로 원자적)
+# ----------------------------------------
+def _toggle_favorite(store: LocalStore, params: dict) -> bool:
+    user_id, room_id = params["p_user_id"], params["p_room_id"]
+    existing = [row for row in store.rows("favorites") if row["user_id"] == user_id and row["room_id"] == room_id]
+    if existing:
+        store.delete("favorites", existing)
+        return False
+    store.insert("favorites", [{"user_id": user_id, "room_id": room_id}])
+    return True
+
+
+def _set_favorites(store: LocalStore, params: dict) -> List[dict]:
+    user_id = params["p_user_id"]
+    add = set(params.get("p_add") or [])
+    remove = set(params.get("p_remove") or []) - add
+    current = {row["room_id"]: row for row in store.rows("favorites") if row["user_id"] == user_id}
+
+    removed = [current[room_id] for room_id in remove if room_id in current]
+    store.delete("favorites", removed)
+    rooms = store.by_id("rooms")
+    added = [room_id for room_id in sorted(add) if room_id in rooms and room_id not in current]
+    store.insert("favorites", [{"user_id": user_id, "room_id": room_id} for room_id in added])
+
+    return [{"room_id": room_id, "favorited": True} for room_id in added] + [
+        {"room_id": row["room_id"], "favorited": False} for row in removed
+    ]
+
+
+def _target_rooms(store: LocalStore, params: dict) -> List[dict]:
+    """p_building_code / p_room_ids 필터를 적용한 강의실 (building_code 포함)."""
+    buildings = store.by_id("buildings")
+    room_ids = params.get("p_room_ids")
+    room_ids = None if room_ids is None else set(room_ids)
+    code = params.get("p_building_code")
+    return [
+        {**room, "building_code": buildings[room["building_id"]]["code"]}
+        for room in store.rows("rooms")
+        if (room_ids is None or room["id"] in room_ids)
+        and (code is None or buildings[room["building_id"]]["code"] == code)
+    ]
+
+
+def _classes(store: LocalStore, room_ids: set) -> Dict[Tuple[int, str], List[Interval]]:
+    """(room_id, 요일) → 수업 구간 (분)."""
+    result: Dict[Tuple[int, str], List[Interval]] = {}
+    for entry in store.rows("timetable_entries"):
+        if entry["room_id"] in room_ids:
+            result.setdefault((entry["room_id"], entry["day"]), []).append(
+                (to_minutes(entry["start_time"]), to_minutes(entry["end_time"]))
+            )
+    return result
+
+
+def _reservations(store: LocalStore, room_ids: set) -> Dict[int, List[Tuple[datetime, datetime]]]:
+    """room_id → 확정 예약 (KST start_at, end_at)."""
+    result: Dict[int, List[Tuple[datetime, datetime]]] = {}
+    for row in store.rows("reservations"):
+        if row["room_id"] in room_ids and row.get("status") == "confirmed":
+            result.setdefault(row["room_id"], []).append(
+                (parse_timestamp(row["start_at"]), parse_timestamp(row["end_at"]))
+            )
+    return result
+
+
+def _reserved_on(reservations: List[Tuple[datetime, datetime]], day: date) -> List[Interval]:
+    return [
+        interval
+        for start_at, end_at in reservations
+        for on, interval in split_by_date(start_at, end_at)
+        if on == day
+    ]
+
+
+def _room_row(room: dict) -> dict:
+    return {"room_id": room["id"], "building_code": room["building_code"], "room_number": room["room_number"]}
+
+
+def _rooms_available_at(store: LocalStore, params: dict) -> List[dict]:
+    at = parse_timestamp(params.get("p_at") or _now())
+    day, minute = DAYS[at.weekday()], at.hour * 60 + at.minute
+    rooms = _target_rooms(store, params)
+    ids = {room["id"] for room in rooms}
+    classes, reservations = _classes(store, ids), _reservations(store, ids)
+    return [
+        _room_row(room) for room in rooms
+        if not any(start <= minute < end for start, end in classes.get((room["id"], day), []))
+        and not any(start_at <= at < end_at for start_at, end_at in reservations.get(room["id"], []))
+    ]
+
+
+def _rooms_free_for_slots(store: LocalStore, params: dict) -> List[dict]:
+    on_date = date.fromisoformat(params["p_date"]) if params.get("p_date") else None
+    slots = [
+        (DAYS[on_date.weekday()] if on_date else day, to_minutes(start), to_minutes(end))
+        for day, start, end in zip(params["p_days"], params["p_starts"], params["p_ends"])
+    ]
+    rooms = _target_rooms(store, params)
+    ids = {room["id"] for room in rooms}
+    classes = _classes(store, ids)
+    reservations = _reservations(store, ids) if on_date else {}
+
+    def free(room_id: int) -> bool:
+        for day, start, end in slots:
+            days = DAYS if day is None else [day]
+            busy = [interval for d in days for interval in classes.get((room_id, d), [])]
+            if on_date:
+                busy += _reserved_on(reservations.get(room_id, []), on_date)
+            if any(s < end and e > start for s, e in busy):
+                return False
+        return True
+
+    return [_room_row(room) for room in rooms if free(room["id"])]
+
+
+def _room_free_slots(store: LocalStore, params: dict) -> List[dict]:
+    start_date, end_date = date.fromisoformat(params["p_from"]), date.fromisoformat(params["p_to"])
+    window_start = to_minutes(params.get("p_start") or "09:00")
+    window_end = to_minutes(params.get("p_end") or "20:00")
+    min_minutes = params.get("p_min_minutes") or 0
+    rooms = _target_rooms(store, params)
+    ids = {room["id"] for room in rooms}
+    classes, reservations = _classes(store, ids), _reservations(store, ids)
+
+    rows = []
+    for room in rooms:
+        day = start_date
+        while day <= end_date:
+            busy = classes.get((room["id"], DAYS[day.weekday()]), []) + _reserved_on(reservations.get(room["id"], []), day)
+            starts, ends = merge_intervals(busy)
+            for start, end in free_gaps(starts, ends, window_start, window_end, min_minutes):
+                rows.append({
+                    "room_id": room["id"],
+                    "day": day.isoformat(),
+                    "slot_start": format_minutes(start) + ":00",
+                    "slot_end": format_minutes(end) + ":00",
+                })
+            day += timedelta(days=1)
+    return rows
+
+
+def _change_feed(store: LocalStore, params: dict) -> dict:
+    """change_log.sql 의 change_feed. 정리(prune)하지 않으므로 pruned_through 는 0."""
+    rows = sorted(
+        (row for row in store.rows("change_log") if row["seq"] > params["p_since"]),
+        key=lambda row: row["seq"],
+    )[:params.get("p_limit", 500)]
+    return {
+        "pruned_through": 0,
+        "last_seq": max((row["seq"] for row in store.rows("change_log")), default=0),
+        "changes": [
+            {
+                "version": row["seq"],
+                "table_name": row["table_name"],
+                "row_id": row["row_id"],
+                "op": row["op"],
+                "row_data": row["row_data"],
+            }
+            for row in rows
+        ],
+    }
+
+
+LOCAL_RPC["toggle_favorite"] = _toggle_favorite
+LOCAL_RPC["set_favorites"] = _set_favorites
+LOCAL_RPC["rooms_available_at"] = _rooms_available_at
+LOCAL_RPC["rooms_free_for_slots"] = _rooms_free_for_slots
+LOCAL_RPC["room_free_slots"] = _room_free_slots
+LOCAL_RPC["change_feed"] = _change_feed
+
+
+class LocalResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class _RoundTrip:
+    """호출마다 지연을 주고 호출 수를 세는 공통 부분."""
+
+    def __init__(self, client: "LocalClient", label: str):
+        self._client = client
+        self._label = label
+
+    async def _roundtrip(self):
+        client = self._client
+        client.calls[self._label] += 1
+        delay = client.latency_ms + client.rng.uniform(0, client.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+
+class LocalQuery(_RoundTrip):
+    """supabase AsyncQueryRequestBuilder 와 같은 체이닝 API."""
+
+    def __init__(self, client: "LocalClient", table: str):
+        super().__init__(client, table)
+        self.table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload: Any = None
+        self._on_conflict: Optional[Tuple[str, ...]] = None
+        self._ignore_duplicates = False
+        self._minimal = False
+        self._count: Optional[str] = None
+        self._filters: List[Tuple[str, Callable[[Any], bool]]] = []
+        self._orders: List[Tuple[str, bool]] = []
+        self._offset = 0
+        self._limit: Optional[int] = None
+        self._single: Optional[str] = None
+
+    # ---------- 동작 ----------
+    def select(self, *columns: str, count: Optional[str] = None, **_):
+        self._columns = ",".join(columns) or "*"
+        self._count = count
+        return self
+
+    def _write(self, op: str, payload: Any, returning: Any, count: Optional[str]):
+        self._op = op
+        self._payload = payload
+        self._count = count
+        self._minimal = str(getattr(returning, "value", returning)) == "minimal"
+        return self
+
+    def insert(self, json: Any, count: Optional[str] = None, returning: Any = None, upsert: bool = False, **_):
+        self._write("upsert" if upsert else "insert", json, returning, count)
+        return self
+
+    def upsert(
+        self,
+        json: Any,
+        count: Optional[str] = None,
+        returning: Any = None,
+        ignore_duplicates: bool = False,
+        on_conflict: str = "",
+        **_,
+    ):
+        self._write("upsert", json, returning, count)
+        self._ignore_duplicates = ignore_duplicates
+        if on_conflict:
+            self._on_conflict = tuple(c.strip() for c in on_conflict.split(","))
+        return self
+
+    def update(self, json: dict, count: Optional[str] = None, returning: Any = None, **_):
+        return self._write("update", json, returning, count)
+
+    def delete(self, count: Optional[str] = None, returning: Any = None, **_):
+        return self._write("delete", None, returning, count)
+
+    # ---------- 필터 ----------
+    def _filter(self, column: str, test: Callable[[Any, Any], bool], value: Any):
+        def check(row):
+            actual = row.get(column)
+            if actual is None:
+                return False
+            return test(_comparable(actual), _coerce(actual, value))
+
+        self._filters.append((column, check))
+        return self
+
+    def eq(self, column: str, value: Any):
+        return self._filter(column, lambda a, b: a == b, value)
+
+    def neq(self, column: str, value: Any):
+        return self._filter(column, lambda a, b: a != b, value)
+
+    def gt(self, column: str, value: Any):
+        return self._filter(column, lambda a, b: a > b, value)
+
+    def gte(self, column: str, value: Any):
+        return self._filter(column, lambda a, b: a >= b, value)
+
+    def lt(self, column: str, value: Any):
+        return self._filter(column, lambda a, b: a < b, value)
+
+    def lte(self, column: str, value: Any):
+        return self._filter(column, lambda a, b: a <= b, value)
+
+    def in_(self, column: str, values):
+        values = list(values)
+
+        def check(row):
+            actual = row.get(column)
+            return actual is not None and actual in {_coerce(actual, v) for v in values}
+
+        self._filters.append((column, check))
+        return self
+
+    def is_(self, column: str, value: Any):
+        expected = None if value in (None, "null") else value
+        self._filters.append((column, lambda row: row.get(column) is expected))
+        return self
+
+    # ---------- 정렬 / 페이징 ----------
+    def order(self, column: str, desc: bool = False, **_):
+        self._orders.append((column, desc))
+        return self
+
+    def limit(self, size: int, **_):
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **_):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self):
+        self._single = "single"
+        return self
+
+    def maybe_single(self):
+        self._single = "maybe"
+        return self
+
+    # ---------- 실행 ----------
+    def _matching(self, store: LocalStore) -> List[dict]:
+        return [row for row in store.rows(self.table) if all(check(row) for _, check in self._filters)]
+
+    def _sorted(self, rows: List[dict]) -> List[dict]:
+        for column, desc in reversed(self._orders):
+            order = ENUM_ORDER.get(column)
+
+            def key(row, column=column, order=order):
+                value = row.get(column)
+                if value is None:
+                    # Postgres 기본값: ASC 는 NULLS LAST, DESC 는 NULLS FIRST
+                    return (1, 0)
+                return (0, order.get(value, len(order)) if order else _comparable(value))
+
+            rows = sorted(rows, key=key, reverse=desc)
+        return rows
+
+    def _run(self, store: LocalStore) -> LocalResponse:
+        if self._op in ("insert", "upsert"):
+            payload = self._payload if isinstance(self._payload, list) else [self._payload]
+            written = store.insert(
+                self.table,
+                payload,
+                on_conflict=self._on_conflict,
+                upsert=self._op == "upsert",
+                ignore_duplicates=self._ignore_duplicates,
+            )
+            rows = written
+        elif self._op == "update":
+            rows = store.update(self.table, self._matching(store), self._payload)
+        elif self._op == "delete":
+            rows = store.delete(self.table, self._matching(store))
+        else:
+            rows = self._sorted(self._matching(store))
+
+        total = len(rows)
+        if self._op == "select":
+            end = None if self._limit is None else self._offset + self._limit
+            rows = rows[self._offset:end]
+
+        count = total if self._count else None
+        if self._minimal:
+            return LocalResponse([], count)
+
+        columns = parse_columns(self._columns)
+        data = [store.project(self.table, row, columns) for row in rows]
+
+        if self._single:
+            if len(data) == 1:
+                return LocalResponse(data[0], count)
+            if not data and self._single == "maybe":
+                return LocalResponse(None, count)
+            raise APIError({
+                "message": "JSON object requested, multiple (or no) rows returned",
+                "code": "PGRST116",
+                "hint": None,
+                "details": f"The result contains {len(data)} rows",
+            })
+        return LocalResponse(data, count)
+
+    async def execute(self) -> LocalResponse:
+        await self._roundtrip()
+        return self._run(self._client.store)
+
+
+class LocalRpc(_RoundTrip):
+    def __init__(self, client: "LocalClient", fn: str, params: dict):
+        super().__init__(client, f"rpc:{fn}")
+        self.fn = fn
+        self.params = params or {}
+        self._orders: List[Tuple[str, bool]] = []
+        self._offset = 0
+        self._limit: Optional[int] = None
+
+    # 집합을 반환하는 함수의 결과 정렬 / 페이징 (PostgREST 와 동일하게 함수 결과에 적용)
+    def order(self, column: str, desc: bool = False, **_):
+        self._orders.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int, **_):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def _page(self, result: Any) -> Any:
+        if not isinstance(result, list):
+            return result
+        for column, desc in reversed(self._orders):
+            result = sorted(result, key=lambda row, column=column: _comparable(row.get(column)), reverse=desc)
+        end = None if self._limit is None else self._offset + self._limit
+        return result[self._offset:end]
+
+    async def execute(self) -> LocalResponse:
+        await self._roundtrip()
+        handler = LOCAL_RPC.get(self.fn)
+        if handler is None:
+            raise APIError({
+                "message": f"Could not find the function public.{self.fn} in the schema cache",
+                "code": "PGRST202",
+                "hint": None,
+                "details": None,
+            })
+        return LocalResponse(self._page(handler(self._client.store, self.params)))
+
+
+def issue_token(user_id: str, email: Optional[str] = None, expires_in: int = 3600) -> str:
+    """Supabase Auth 와 같은 형태(HS256, aud=authenticated)의 액세스 토큰을 발급합니다."""
+    now = int(time.time())
+    claims = {
+        "sub": user_id,
+        "aud": SUPABASE_JWT_AUDIENCE,
+        "role": "authenticated",
+        "email": email,
+        "iat": now,
+        "exp": now + expires_in,
+    }
+    return jwt.encode(claims, SUPABASE_JWT_SECRET, algorithm="HS256")
+
+
+class LocalAuth(_RoundTrip):
+    """auth.sign_up / sign_in_with_password (이메일 인증 없이 바로 세션 발급)."""
+
+    def __init__(self, client: "LocalClient"):
+        super().__init__(client, "auth")
+
+    @staticmethod
+    def _hash(password: str) -> str:
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def _session(self, user: dict):
+        return SimpleNamespace(
+            access_token=issue_token(user["id"], user["email"]),
+            refresh_token=uuid.uuid4().hex,
+        )
+
+    def create_user(self, email: str, password: str, full_name: str = "") -> dict:
+        store = self._client.store
+        if email in store.users:
+            raise AuthApiError("User already registered", 422, "user_already_exists")
+        user = {"id": str(uuid.uuid4()), "email": email, "password": self._hash(password)}
+        store.users[email] = user
+        # handle_new_user 트리거처럼 profiles 행 생성
+        store.insert("profiles", [{"id": user["id"], "name": full_name}])
+        return user
+
+    async def sign_up(self, credentials: dict):
+        await self._roundtrip()
+        full_name = credentials.get("options", {}).get("data", {}).get("full_name", "")
+        user = self.create_user(credentials["email"], credentials["password"], full_name)
+        return SimpleNamespace(user=SimpleNamespace(id=user["id"], email=user["email"]), session=self._session(user))
+
+    async def sign_in_with_password(self, credentials: dict):
+        await self._roundtrip()
+        user = self._client.store.users.get(credentials.get("email"))
+        if user is None or user["password"] != self._hash(credentials.get("password", "")):
+            raise AuthApiError("Invalid login credentials", 400, "invalid_credentials")
+        return SimpleNamespace(user=SimpleNamespace(id=user["id"], email=user["email"]), session=self._session(user))
+
+
+class LocalClient:
+    """AsyncClient 대용. calls 에 테이블/rpc/auth 별 호출 수가 쌓입니다 (N+1 확인용)."""
+
+    def __init__(self, store: LocalStore, latency_ms: float = 0, jitter_ms: float = 0, seed: int = 0):
+        self.store = store
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rng = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.auth = LocalAuth(self)
+
+    def table(self, name: str) -> LocalQuery:
+        return LocalQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None) -> LocalRpc:
+        return LocalRpc(self, fn, params)
+
+
+def create_local_client() -> LocalClient:
+    """설정값으로 시드한 저장소와 클라이언트를 만듭니다."""
+    store = LocalStore()
+    store.seed_from_csv(LOCAL_DB_SEED_CSV)
+    return LocalClient(store, LOCAL_DB_LATENCY_MS, LOCAL_DB_JITTER_MS, LOCAL_DB_RANDOM_SEED)
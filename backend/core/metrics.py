@@ -0,0 +1,352 @@
+"""
+요청 단위 계측: 라우트별 지연 히스토그램·상태 코드·처리 중 요청 수, 그리고 요청마다의 upstream(데이터 백엔드) 호출 수·시간·행 수.
+
+- MetricsMiddleware: ASGI 미들웨어. 요청마다 RequestStats 를 contextvar 에 넣고, 끝나면 집계합니다.
+- InstrumentedClient: get_db() 가 반환하는 클라이언트를 감싸 .execute() 마다 호출을 기록합니다.
+- registry.render(): Prometheus text exposition format (GET /metrics).
+
+SLOW_REQUEST_MS 를 넘긴 요청은 쿼리 내역과 함께 경고 로그로 남깁니다.
+"""
+import inspect
+import logging
+import time
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .config import SLOW_REQUEST_MS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        # 라벨 → [버킷별 개수..., 합계]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.setdefault(metric.name, metric)
+        return self._metrics[metric.name]
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status"))
+HTTP_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+HTTP_IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being processed.")
+HTTP_IN_FLIGHT.set(0)
+HTTP_SLOW = registry.counter(
+    "http_slow_requests_total", "Requests slower than SLOW_REQUEST_MS.", ("method", "route"))
+REQUEST_QUERIES = registry.histogram(
+    "http_request_upstream_queries", "Upstream data-backend calls made per request.", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS)
+UPSTREAM_DURATION = registry.histogram(
+    "upstream_query_duration_seconds", "Upstream data-backend call latency.", ("target", "op"))
+UPSTREAM_ROWS = registry.counter(
+    "upstream_query_rows_total", "Rows returned by upstream data-backend calls.", ("target", "op"))
+UPSTREAM_ERRORS = registry.counter(
+    "upstream_query_errors_total", "Upstream data-backend calls that raised.", ("target", "op"))
+
+
+# ----------------------------------------
+# 요청 단위 upstream 호출 기록
+# ----------------------------------------
+class RequestStats:
+    def __init__(self):
+        self.queries: List[Tuple[str, str, float, int]] = []  # (target, op, 초, 행 수)
+
+    def record(self, target: str, op: str, seconds: float, rows: int):
+        self.queries.append((target, op, seconds, rows))
+
+    @property
+    def query_seconds(self) -> float:
+        return sum(q[2] for q in self.queries)
+
+    def breakdown(self) -> str:
+        """'rooms.select x3 42.1ms 120 rows, reservations.select x1 ...' (시간 합계 내림차순)"""
+        grouped: Dict[Tuple[str, str], List[float]] = {}
+        for target, op, seconds, rows in self.queries:
+            group = grouped.setdefault((target, op), [0, 0.0, 0])
+            group[0] += 1
+            group[1] += seconds
+            group[2] += rows
+        ordered = sorted(grouped.items(), key=lambda item: -item[1][1])
+        return ", ".join(
+            f"{target}.{op} x{count} {seconds * 1000:.1f}ms {rows} rows"
+            for (target, op), (count, seconds, rows) in ordered
+        )
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+def record_query(target: str, op: str, seconds: float, rows: int, failed: bool = False):
+    UPSTREAM_DURATION.observe(seconds, target=target, op=op)
+    if failed:
+        UPSTREAM_ERRORS.inc(target=target, op=op)
+    else:
+        UPSTREAM_ROWS.inc(rows, target=target, op=op)
+    stats = _current.get()
+    if stats is not None:
+        stats.record(target, op, seconds, rows)
+
+
+def _row_count(data: Any) -> int:
+    if data is None:
+        return 0
+    if isinstance(data, list):
+        return len(data)
+    return 1
+
+
+class _InstrumentedQuery:
+    """쿼리 빌더 체인을 그대로 전달하면서, execute() 만 시간·행 수를 기록합니다."""
+
+    _OPS = ("select", "insert", "upsert", "update", "delete")
+
+    def __init__(self, builder: Any, target: str, op: str):
+        self._builder = builder
+        self._target = target
+        self._op = op
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+        op = name if name in self._OPS and self._op == "select" else self._op
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return _InstrumentedQuery(result, self._target, op)
+            return result
+
+        return call
+
+    async def execute(self):
+        started = time.perf_counter()
+        try:
+            response = await self._builder.execute()
+        except Exception:
+            record_query(self._target, self._op, time.perf_counter() - started, 0, failed=True)
+            raise
+        record_query(self._target, self._op, time.perf_counter() - started, _row_count(getattr(response, "data", None)))
+        return response
+
+
+class _InstrumentedAuth:
+    def __init__(self, auth: Any):
+        self._auth = auth
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._auth, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await attr(*args, **kwargs)
+            except Exception:
+                record_query("auth", name, time.perf_counter() - started, 0, failed=True)
+                raise
+            record_query("auth", name, time.perf_counter() - started, 1)
+            return result
+
+        return call
+
+
+class InstrumentedClient:
+    """AsyncClient(또는 local 백엔드) 래퍼. table / rpc / auth 호출을 계측하고 나머지는 그대로 전달합니다."""
+
+    def __init__(self, client: Any):
+        self._client = client
+        self.auth = _InstrumentedAuth(client.auth)
+
+    def table(self, name: str):
+        return _InstrumentedQuery(self._client.table(name), name, "select")
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None, *args, **kwargs):
+        return _InstrumentedQuery(self._client.rpc(fn, params, *args, **kwargs), f"rpc:{fn}", "call")
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+# ----------------------------------------
+# ASGI 미들웨어
+# ----------------------------------------
+class MetricsMiddleware:
+    def __init__(self, app, slow_request_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            logger.exception("unhandled error on %s %s", scope["method"], scope["path"])
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            _current.reset(token)
+            # 경로 파라미터가 들어간 실제 path 대신 라우트 템플릿으로 집계 (라벨 카디널리티 제한)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route, status=status["code"])
+            HTTP_DURATION.observe(elapsed, method=method, route=route)
+            REQUEST_QUERIES.observe(len(stats.queries), method=method, route=route)
+            if elapsed * 1000 >= self.slow_request_ms:
+                HTTP_SLOW.inc(method=method, route=route)
+                logger.warning(
+                    "slow request %s %s -> %d in %.1fms (%d upstream queries, %.1fms): %s",
+                    method, scope["path"], status["code"], elapsed * 1000,
+                    len(stats.queries), stats.query_seconds * 1000, stats.breakdown() or "-",
+                )
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set
+
+import pytz
+
+from .availability_rpc import rooms_available_at
+from .config import AVAILABILITY_BACKEND, NOTIFICATION_INTERVAL_SECONDS, NOTIFICATION_MINUTES_BEFORE
+from .database import get_db
+from .notification_sinks import NotificationSink
+from .occupancy import DAYS, PAGE_SIZE, get_occupancy_index, room_id_chunks
+from .shared_snapshot import shared_campus
+
+logger = logging.getLogger(__name__)
+
+# 한국 시간대 설정
+KST = pytz.timezone('Asia/Seoul')
+
+FAVORITES_QUERY = "user_id, room_id, rooms(room_number, buildings(code))"
+
+
+async def occupied_room_ids(room_ids: Iterable[int], at: datetime) -> Set[int]:
+    """
+    at 시점에 수업(메모리 시간표 인덱스) 또는 확정 예약이 있는 강의실 ID 집합.
+    예약은 room_ids 전체에 대해 한 번의 쿼리로 확인합니다.
+    AVAILABILITY_BACKEND=rpc 이면 rooms_available_at RPC 한 번으로 판정합니다.
+    """
+    room_ids = list(set(room_ids))
+    if not room_ids:
+        return set()
+
+    if AVAILABILITY_BACKEND == "rpc":
+        free = await rooms_available_at(at, room_ids=room_ids)
+        return set(room_ids) - {row["room_id"] for row in free}
+
+    db = await get_db()
+    index = await get_occupancy_index()
+    day = DAYS[at.weekday()]
+    minute = at.hour * 60 + at.minute
+    occupied = {room_id for room_id in room_ids if index.is_occupied_at(room_id, day, minute)}
+
+    # room_id 필터는 URL 에 담기므로 ROOM_FILTER_SIZE 개씩 나눠 동시에 조회
+    reservation_results = await asyncio.gather(*(
+        db.table("reservations")
+        .select("room_id")
+        .in_("room_id", chunk)
+        .eq("status", "confirmed")
+        .lte("start_at", at.isoformat())
+        .gt("end_at", at.isoformat())
+        .execute()
+        for chunk in room_id_chunks(room_ids)
+    ))
+    for res in reservation_results:
+        occupied.update(row["room_id"] for row in res.data or [])
+    return occupied
+
+
+def build_alert(favorite: dict, target_time: datetime, minutes_before: int) -> dict:
+    """즐겨찾기 한 건(rooms, buildings 조인 포함)으로 알림 데이터를 만듭니다."""
+    room_info = favorite["rooms"]
+    building_code = room_info["buildings"]["code"]
+    room_number = room_info["room_number"]
+    return {
+        "room_id": favorite["room_id"],
+        "room_name": f"{building_code}관 {room_number}호",
+        "target_time": target_time.strftime("%H:%M"),
+        "minutes_left": minutes_before,
+        "message": f"곧 {building_code}관 {room_number}호가 빕니다! ({minutes_before}분 후)"
+    }
+
+
+async def fetch_all_favorites() -> List[dict]:
+    """모든 사용자의 즐겨찾기를 페이지 단위로 한 번에 읽어옵니다."""
+    db = await get_db()
+    rows: List[dict] = []
+    offset = 0
+    while True:
+        res = await db.table("favorites")\
+            .select(FAVORITES_QUERY)\
+            .order("user_id")\
+            .order("room_id")\
+            .range(offset, offset + PAGE_SIZE - 1)\
+            .execute()
+        page = res.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+class NotificationScheduler:
+    """
+    주기적으로 전체 즐겨찾기를 한 번에 평가해, '곧 비는' 강의실 알림을 sink 로 전달합니다.
+
+    target 시각(분 단위) 직전 1분에는 사용 중이고 target 시각에는 비는 강의실만 알림 대상으로 삼아
+    같은 알림이 매 틱마다 반복되지 않도록 합니다. 마지막으로 평가한 target 분을 기억해 두고
+    (마지막, 지금 + minutes_before] 의 모든 분을 평가하므로, 틱이 밀리거나(느린 DB) 주기가 60초가 아니어도
+    건너뛰는 분이 없습니다. 이미 지난 target 은 알릴 의미가 없어 건너뜁니다.
+
+    틱은 interval_seconds 경계(기본: 매 분 정각)에 맞춰 돕니다.
+    공유 스냅샷(멀티 워커)에서는 발행 락을 잡은 워커 하나만 평가해, 같은 알림이 워커 수만큼 가지 않게 합니다.
+    """
+
+    def __init__(
+        self,
+        sink: NotificationSink,
+        interval_seconds: int = NOTIFICATION_INTERVAL_SECONDS,
+        minutes_before: int = NOTIFICATION_MINUTES_BEFORE,
+    ):
+        self.sink = sink
+        self.interval_seconds = interval_seconds
+        self.minutes_before = minutes_before
+        self._task: Optional[asyncio.Task] = None
+        self._last_target: Optional[datetime] = None
+
+    def _targets(self, now_kst: datetime) -> List[datetime]:
+        """이번 틱에 평가할 target 분 목록 (오름차순)."""
+        this_minute = now_kst.replace(second=0, microsecond=0)
+        latest = this_minute + timedelta(minutes=self.minutes_before)
+        first = this_minute + timedelta(minutes=1)
+        if self._last_target is not None:
+            first = max(first, self._last_target + timedelta(minutes=1))
+        else:
+            first = latest
+        targets = []
+        while first <= latest:
+            targets.append(first)
+            first += timedelta(minutes=1)
+        return targets
+
+    async def run_once(self, now: Optional[datetime] = None) -> List[dict]:
+        """한 번의 일괄 평가를 수행하고 전달한 알림 목록을 반환합니다."""
+        now_kst = now or datetime.now(KST)
+        targets = self._targets(now_kst)
+        if not targets:
+            return []
+
+        favorites = await fetch_all_favorites()
+        alerts = []
+        if favorites:
+            room_ids = {fav["room_id"] for fav in favorites}
+            # target 들은 연속된 분이므로 (첫 target - 1분) ~ 마지막 target 의 점유 상태만 조회
+            minutes = [targets[0] - timedelta(minutes=1)] + targets
+            occupied = await asyncio.gather(*(occupied_room_ids(room_ids, at) for at in minutes))
+
+            for i, target_time in enumerate(targets):
+                became_free = occupied[i] - occupied[i + 1]
+                if not became_free:
+                    continue
+                minutes_left = max(1, round((target_time - now_kst).total_seconds() / 60))
+                for fav in favorites:
+                    if fav["room_id"] in became_free and fav.get("rooms"):
+                        alert = build_alert(fav, target_time, minutes_left)
+                        alert["user_id"] = fav["user_id"]
+                        alerts.append(alert)
+
+        if alerts:
+            # sink 는 동기 인터페이스(파일 쓰기, FCM 호출)이므로 스레드에서 실행
+            await asyncio.to_thread(self.sink.deliver, alerts)
+        # 평가·전달이 끝난 뒤에만 전진 (실패하면 다음 틱에서 같은 분을 다시 평가)
+        self._last_target = targets[-1]
+        return alerts
+
+    def _is_leader(self) -> bool:
+        if shared_campus is None:
+            return True
+        if shared_campus.try_lead():
+            return True
+        # 리더가 아닌 동안의 분은 리더가 평가하므로, 리더가 되었을 때 지금부터 다시 시작
+        self._last_target = None
+        return False
+
+    async def _loop(self):
+        while True:
+            # 다음 interval 경계(기본: 다음 분 정각)까지 대기
+            await asyncio.sleep(self.interval_seconds - time.time() % self.interval_seconds)
+            if not self._is_leader():
+                continue
+            try:
+                alerts = await self.run_once()
+                logger.info("notification sweep delivered %d alerts", len(alerts))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("notification sweep failed")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
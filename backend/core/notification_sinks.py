@@ -0,0 +1,92 @@
+import json
+from collections import deque
+from threading import Lock
+from typing import List
+
+from .config import DATA_BACKEND, NOTIFICATION_FILE_PATH, NOTIFICATION_MEMORY_MAX_ALERTS, NOTIFICATION_SINK
+
+
+class NotificationSink:
+    """
+    스케줄러가 만든 알림을 실제로 전달하는 대상의 공통 인터페이스.
+    """
+
+    def deliver(self, alerts: List[dict]) -> None:
+        raise NotImplementedError
+
+
+class InMemorySink(NotificationSink):
+    """테스트·로컬 확인용: 전달된 알림을 메모리에 쌓아 둡니다 (최근 max_alerts 건만, 오래된 것부터 버림)."""
+
+    def __init__(self, max_alerts: int = NOTIFICATION_MEMORY_MAX_ALERTS):
+        self.alerts: deque = deque(maxlen=max_alerts)
+        self._lock = Lock()
+
+    def deliver(self, alerts: List[dict]) -> None:
+        with self._lock:
+            self.alerts.extend(alerts)
+
+    def drain(self) -> List[dict]:
+        with self._lock:
+            alerts = list(self.alerts)
+            self.alerts.clear()
+        return alerts
+
+
+class FileSink(NotificationSink):
+    """알림을 JSON Lines 파일에 한 줄씩 추가합니다."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+
+    def deliver(self, alerts: List[dict]) -> None:
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            for alert in alerts:
+                f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+
+
+class FCMSink(NotificationSink):
+    """
+    Firebase Cloud Messaging 전송 어댑터.
+    앱은 로그인 후 'user-{user_id}' 토픽을 구독하고, 서버는 토픽으로 푸시를 보냅니다.
+    firebase_admin 패키지와 GOOGLE_APPLICATION_CREDENTIALS 설정이 필요합니다.
+    """
+
+    def __init__(self):
+        import firebase_admin
+        from firebase_admin import messaging
+
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app()
+        self._messaging = messaging
+
+    def deliver(self, alerts: List[dict]) -> None:
+        messages = [
+            self._messaging.Message(
+                topic=f"user-{alert['user_id']}",
+                notification=self._messaging.Notification(
+                    title="Classroom Informer",
+                    body=alert["message"],
+                ),
+                data={k: str(v) for k, v in alert.items()},
+            )
+            for alert in alerts
+        ]
+        # send_each 는 한 번에 최대 500건까지 허용
+        for i in range(0, len(messages), 500):
+            self._messaging.send_each(messages[i:i + 500])
+
+
+def create_sink() -> NotificationSink:
+    """NOTIFICATION_SINK 설정(file | fcm | memory)에 맞는 전달 대상을 생성합니다."""
+    if NOTIFICATION_SINK == "fcm":
+        return FCMSink()
+    if NOTIFICATION_SINK == "file":
+        return FileSink(NOTIFICATION_FILE_PATH)
+    if NOTIFICATION_SINK == "memory":
+        # 아무도 drain() 하지 않으므로 실제 배포에서는 알림이 전달되지 않음
+        if DATA_BACKEND != "local":
+            raise ValueError("NOTIFICATION_SINK=memory is only allowed with DATA_BACKEND=local (use file or fcm)")
+        return InMemorySink()
+    raise ValueError(f"NOTIFICATION_SCHEDULER_ENABLED requires NOTIFICATION_SINK=file or fcm (got '{NOTIFICATION_SINK}')")
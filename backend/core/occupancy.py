@@ -0,0 +1,309 @@
+import asyncio
+import hashlib
+import json
+import time as _time
+from bisect import bisect_right
+from datetime import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .config import OCCUPANCY_INDEX_TTL_SECONDS, SHARED_SNAPSHOT_PATH
+from .database import get_db
+
+# public.day_of_week ENUM 순서 (Python weekday(): 0=월 ... 6=일 과 동일)
+DAYS = ["월", "화", "수", "목", "금", "토", "일"]
+
+# 강의실 사용 가능 시간대 (빈 시간 계산 기본 범위)
+DEFAULT_START_TIME = time(9, 0)   # 09:00
+DEFAULT_END_TIME = time(20, 0)    # 20:00
+
+# PostgREST 기본 max-rows(1000)를 넘지 않도록 페이지 단위로 읽어옵니다.
+PAGE_SIZE = 1000
+
+# room_id in (...) 필터 하나에 넣는 ID 수 (PostgREST 는 필터를 URL 에 담으므로 길이 제한)
+ROOM_FILTER_SIZE = 200
+
+
+def room_id_chunks(room_ids: List[int]) -> List[List[int]]:
+    """in_("room_id", ...) 필터용으로 room_ids 를 ROOM_FILTER_SIZE 개씩 나눕니다."""
+    return [room_ids[i:i + ROOM_FILTER_SIZE] for i in range(0, len(room_ids), ROOM_FILTER_SIZE)]
+
+
+Interval = Tuple[int, int]  # (시작 분, 종료 분) - 자정 기준 분 단위, [start, end)
+
+
+def to_minutes(value: Union[str, time]) -> int:
+    """
+    'HH:MM', 'HH:MM:SS', 'HH:MM:SS.ffffff' 문자열 또는 time 객체를 자정 기준 분으로 변환합니다.
+    0 <= 시 <= 24, 0 <= 분 < 60 (24 시는 '24:00' 만, 하루 끝). 범위를 벗어나면 ValueError.
+    """
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    parts = value.strip().split(":")
+    if len(parts) < 2:
+        raise ValueError(f"Invalid time format: {value}")
+    hour, minute = int(parts[0]), int(parts[1])
+    if not (0 <= hour <= 24 and 0 <= minute < 60) or (hour == 24 and (minute or any(float(p) for p in parts[2:]))):
+        raise ValueError(f"Time out of range: {value}")
+    return hour * 60 + minute
+
+
+def format_minutes(minutes: int) -> str:
+    """자정 기준 분을 'HH:MM' 문자열로 변환합니다."""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> Tuple[List[int], List[int]]:
+    """겹치거나 맞닿은 구간을 병합해 시작/종료 배열(둘 다 오름차순)로 반환합니다."""
+    starts: List[int] = []
+    ends: List[int] = []
+    for start, end in sorted(intervals):
+        if ends and start <= ends[-1]:
+            if end > ends[-1]:
+                ends[-1] = end
+            continue
+        starts.append(start)
+        ends.append(end)
+    return starts, ends
+
+
+def free_gaps(starts: List[int], ends: List[int], start: int, end: int, min_duration: int = 0) -> List[Interval]:
+    """
+    병합된 점유 구간(starts, ends) 사이에서 [start, end) 범위의 빈 구간 목록.
+    min_duration(분)보다 짧은 빈 구간은 제외합니다.
+    """
+    min_duration = max(min_duration, 1)
+    free: List[Interval] = []
+    current = start
+    for i in range(bisect_right(ends, start), len(starts)):
+        if starts[i] >= end:
+            break
+        if starts[i] - current >= min_duration:
+            free.append((current, starts[i]))
+        current = max(current, ends[i])
+    if end - current >= min_duration:
+        free.append((current, end))
+    return free
+
+
+def _entry_digest(entry: dict) -> int:
+    return int.from_bytes(hashlib.sha1(json.dumps(entry, sort_keys=True, default=str).encode()).digest()[:8], "big")
+
+
+def _room_intervals(rows: Iterable[dict]) -> Tuple[Dict[str, Tuple[List[int], List[int]]], int]:
+    """한 강의실의 행들을 요일별 병합 구간으로 바꿉니다. (요일 → (starts, ends), 유효한 행 수)"""
+    raw: Dict[str, List[Interval]] = {}
+    count = 0
+    for entry in rows:
+        try:
+            start = to_minutes(entry["start_time"])
+            end = to_minutes(entry["end_time"])
+        except (KeyError, TypeError, ValueError):
+            continue  # 포맷 에러 시 해당 엔트리 무시 (안전장치)
+        if end <= start:
+            continue
+        raw.setdefault(entry["day"], []).append((start, end))
+        count += 1
+    return {day: merge_intervals(intervals) for day, intervals in raw.items()}, count
+
+
+def _sorted_rows(rows: Iterable[dict]) -> List[dict]:
+    """/info/room/timetable 응답 순서 (DB의 order("day").order("start_time") 와 같음)."""
+    day_order = {day: i for i, day in enumerate(DAYS)}
+    return sorted(rows, key=lambda e: (day_order.get(e["day"], len(DAYS)), e["start_time"]))
+
+
+class OccupancyIndex:
+    """
+    timetable_entries 를 (room_id, day) 별로 미리 파싱·정렬해 둔 메모리 인덱스.
+
+    구간은 병합되어 서로 겹치지 않으므로 starts/ends 배열이 모두 정렬되어 있고,
+    시점·구간 점유 여부를 bisect 로 O(log n)에 판단할 수 있습니다.
+    """
+
+    def __init__(self, entries: Iterable[dict], last_seq: int = 0):
+        by_room: Dict[int, List[dict]] = {}
+        self._room_by_entry: Dict[int, int] = {}
+        digest = 0
+        for entry in entries:
+            by_room.setdefault(entry["room_id"], []).append(entry)
+            if entry.get("id") is not None:
+                self._room_by_entry[entry["id"]] = entry["room_id"]
+            digest += _entry_digest(entry)
+
+        self._intervals: Dict[Tuple[int, str], Tuple[List[int], List[int]]] = {}
+        self.entry_count = 0
+        for room_id, rows in by_room.items():
+            intervals, count = _room_intervals(rows)
+            for day, merged in intervals.items():
+                self._intervals[(room_id, day)] = merged
+            self.entry_count += count
+        self.room_ids = frozenset(room_id for room_id, _ in self._intervals)
+
+        # /info/room/timetable 응답용 원본 행
+        self.entries_by_room: Dict[int, List[dict]] = {room_id: _sorted_rows(rows) for room_id, rows in by_room.items()}
+
+        # 내용이 바뀔 때만 달라지는 데이터 버전 (ETag 등에 사용). 행별 해시의 합이라 행 하나만 바뀌어도 증분 계산 가능
+        self.version = f"{digest % 2 ** 64:016x}"
+        self.loaded_at = _time.monotonic()
+        # 시간표를 읽기 직전의 변경 로그 커서: 스냅샷을 받은 앱은 여기서부터 /sync/changes 로 이어 받음
+        self.last_seq = last_seq
+
+    def with_entry(self, entry_id: int, entry: Optional[dict]) -> Tuple["OccupancyIndex", Set[int]]:
+        """
+        timetable_entries 행 하나(entry_id)를 entry 로 바꾼(None 이면 삭제) 새 인덱스와 영향받은 room_id.
+        실시간 변경 이벤트를 DB 재조회 없이 반영할 때 사용합니다.
+        영향받은 강의실만 다시 계산하고, 나머지 강의실의 구간·행 목록은 기존 인덱스와 공유합니다.
+        """
+        old_room = self._room_by_entry.get(entry_id)
+        rooms = {old_room} if old_room is not None else set()
+        if entry is not None:
+            rooms.add(entry["room_id"])
+
+        updated = OccupancyIndex.__new__(OccupancyIndex)
+        updated._intervals = dict(self._intervals)
+        updated.entries_by_room = dict(self.entries_by_room)
+        updated._room_by_entry = dict(self._room_by_entry)
+        updated.entry_count = self.entry_count
+        digest = int(self.version, 16)
+
+        for room_id in rooms:
+            old_rows = self.entries_by_room.get(room_id, [])
+            rows = [e for e in old_rows if e.get("id") != entry_id]
+            digest -= sum(_entry_digest(e) for e in old_rows if e.get("id") == entry_id)
+            if entry is not None and entry["room_id"] == room_id:
+                rows.append(entry)
+                digest += _entry_digest(entry)
+
+            old_intervals, old_count = _room_intervals(old_rows)
+            intervals, count = _room_intervals(rows)
+            for day in old_intervals:
+                del updated._intervals[(room_id, day)]
+            for day, merged in intervals.items():
+                updated._intervals[(room_id, day)] = merged
+            updated.entry_count += count - old_count
+
+            if rows:
+                updated.entries_by_room[room_id] = _sorted_rows(rows)
+            else:
+                updated.entries_by_room.pop(room_id, None)
+
+        updated._room_by_entry.pop(entry_id, None)
+        if entry is not None:
+            updated._room_by_entry[entry_id] = entry["room_id"]
+        updated.room_ids = (self.room_ids - rooms) | {
+            room_id for room_id in rooms if any((room_id, day) in updated._intervals for day in DAYS)
+        }
+        updated.version = f"{digest % 2 ** 64:016x}"
+        updated.loaded_at = self.loaded_at  # TTL 이 지나면 DB 에서 다시 읽어 맞춤
+        updated.last_seq = self.last_seq
+        return updated, rooms
+
+    def items(self) -> Iterable[Tuple[int, str, List[Interval]]]:
+        """(room_id, day, 병합된 점유 구간 목록)을 순회합니다."""
+        for (room_id, day), (starts, ends) in self._intervals.items():
+            yield room_id, day, list(zip(starts, ends))
+
+    def intervals(self, room_id: int, day: str) -> List[Interval]:
+        """해당 강의실·요일의 병합된 점유 구간 목록."""
+        starts, ends = self._intervals.get((room_id, day), ((), ()))
+        return list(zip(starts, ends))
+
+    def is_occupied_at(self, room_id: int, day: str, minute: int) -> bool:
+        """minute 시점에 수업이 진행 중인지 (start <= minute < end)."""
+        starts, ends = self._intervals.get((room_id, day), ((), ()))
+        i = bisect_right(starts, minute) - 1
+        return i >= 0 and ends[i] > minute
+
+    def is_occupied_between(self, room_id: int, day: str, start: int, end: int) -> bool:
+        """[start, end) 구간과 겹치는 수업이 하나라도 있는지."""
+        starts, ends = self._intervals.get((room_id, day), ((), ()))
+        # end > start 인 첫 구간을 찾고, 그 구간이 end 이전에 시작하면 겹침
+        i = bisect_right(ends, start)
+        return i < len(starts) and starts[i] < end
+
+    def free_slots(self, room_id: int, day: str, start: int, end: int, min_duration: int = 0) -> List[Interval]:
+        """[start, end) 범위 안에서 수업이 없는 구간 목록 (min_duration 분 이상만)."""
+        starts, ends = self._intervals.get((room_id, day), ((), ()))
+        return free_gaps(starts, ends, start, end, min_duration)
+
+
+async def fetch_timetable_entries() -> List[dict]:
+    """timetable_entries 전체를 페이지 단위로 조회합니다."""
+    db = await get_db()
+    rows: List[dict] = []
+    offset = 0
+    while True:
+        res = await (
+            db.table("timetable_entries")
+            .select("*")
+            .order("id")
+            .range(offset, offset + PAGE_SIZE - 1)
+            .execute()
+        )
+        page = res.data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        offset += PAGE_SIZE
+
+
+async def fetch_change_log_head() -> int:
+    """변경 로그에 지금까지 발행된 마지막 seq."""
+    db = await get_db()
+    res = await db.rpc("change_feed", {"p_since": 0, "p_limit": 0}).execute()
+    return (res.data or {}).get("last_seq") or 0
+
+
+async def fetch_occupancy_index() -> OccupancyIndex:
+    """
+    커서(last_seq)를 먼저 읽은 뒤 시간표를 읽어 인덱스를 만듭니다.
+    그 사이의 변경은 last_seq 이후로 다시 전달되므로 (행 단위 덮어쓰기) 빠짐없이 이어집니다.
+    """
+    last_seq = await fetch_change_log_head()
+    return OccupancyIndex(await fetch_timetable_entries(), last_seq)
+
+
+# ----------------------------------------
+# 프로세스 전역 인덱스
+# ----------------------------------------
+_index: Optional[OccupancyIndex] = None
+_lock: Optional[asyncio.Lock] = None
+
+
+def _expired(index: Optional[OccupancyIndex]) -> bool:
+    return index is None or _time.monotonic() - index.loaded_at > OCCUPANCY_INDEX_TTL_SECONDS
+
+
+async def load_occupancy_index() -> OccupancyIndex:
+    """DB에서 시간표를 다시 읽어 전역 인덱스를 교체합니다."""
+    global _index
+    _index = await fetch_occupancy_index()
+    return _index
+
+
+def replace_occupancy_index(index: OccupancyIndex):
+    """변경 이벤트로 갱신한 인덱스로 전역 인덱스를 교체합니다."""
+    global _index
+    _index = index
+
+
+async def get_occupancy_index() -> OccupancyIndex:
+    """
+    전역 인덱스를 반환합니다. 아직 로드되지 않았거나 TTL이 지났으면 다시 로드합니다.
+    동시에 들어온 요청들은 하나의 재로딩을 함께 기다립니다.
+    SHARED_SNAPSHOT_PATH 가 설정되어 있으면 워커 공유 스냅샷의 인덱스를 반환합니다.
+    """
+    global _lock
+    if SHARED_SNAPSHOT_PATH:
+        from .shared_snapshot import shared_campus  # 순환 import 방지 (shared_snapshot 이 OccupancyIndex 를 사용)
+        return (await shared_campus.current()).index
+
+    if not _expired(_index):
+        return _index
+
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _expired(_index):
+            await load_occupancy_index()
+    return _index
@@ -0,0 +1,180 @@
+"""
+요청 단위 프로파일링 (opt-in, PROFILING_ENABLED=true 일 때만 미들웨어 등록).
+
+프로파일 대상:
+  - 관리자(profiles.role = 'admin') 토큰으로 보낸 요청 중 `X-Profile: 1` 헤더 또는 `?__profile=1` 쿼리가 있는 요청
+  - PROFILE_SAMPLE_RATE (0~1) 비율로 무작위 선택된 실제 트래픽
+
+요청마다 PROFILE_DIR 에 두 파일을 씁니다.
+  - <id>.prof      : cProfile (결정적) 결과. `python -m pstats`, snakeviz 등으로 확인
+  - <id>.collapsed : 이벤트 루프 스레드를 PROFILE_SAMPLE_INTERVAL_MS 간격으로 샘플링한 스택
+                     ("a;b;c 횟수" 형식, flamegraph.pl / speedscope 호환). 네트워크 대기(select)도 보입니다.
+
+두 프로파일러 모두 이벤트 루프 스레드 전체를 보므로, 같은 시간에 처리된 다른 요청도 섞일 수 있습니다.
+한 번에 하나의 요청만 프로파일링하며, 이미 진행 중이면 건너뜁니다 (응답 헤더 X-Profile: busy).
+"""
+import asyncio
+import cProfile
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_SAMPLE_INTERVAL_MS
+from .database import get_db
+from .jwt_verifier import InvalidToken, VerificationUnavailable, cached_user_id, verify_token
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY = "__profile"
+ADMIN_CACHE_TTL_SECONDS = 60
+
+_profile_lock = threading.Lock()
+_admin_cache: Dict[str, Tuple[bool, float]] = {}
+
+
+class StackSampler(threading.Thread):
+    """대상 스레드의 현재 호출 스택을 주기적으로 읽어 collapsed stack 별로 횟수를 셉니다."""
+
+    def __init__(self, thread_id: int, interval_seconds: float):
+        super().__init__(daemon=True, name="profile-sampler")
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.counts: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def _write_profile(profiler: cProfile.Profile, sampler: StackSampler, base_path: str):
+    os.makedirs(os.path.dirname(base_path), exist_ok=True)
+    profiler.dump_stats(base_path + ".prof")
+    with open(base_path + ".collapsed", "w", encoding="utf-8") as f:
+        for stack, count in sampler.counts.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+async def is_admin(token: str) -> bool:
+    """토큰을 검증하고 profiles.role 이 'admin' 인지 확인합니다 (결과는 잠시 캐시)."""
+    try:
+        user_id = cached_user_id(token) or await run_in_threadpool(verify_token, token)
+    except (InvalidToken, VerificationUnavailable):
+        return False
+
+    cached = _admin_cache.get(user_id)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    db = await get_db()
+    res = await db.table("profiles").select("role").eq("id", user_id).execute()
+    admin = bool(res.data) and res.data[0].get("role") == "admin"
+    _admin_cache[user_id] = (admin, time.monotonic() + ADMIN_CACHE_TTL_SECONDS)
+    return admin
+
+
+def _requested(scope) -> bool:
+    for name, value in scope.get("headers", []):
+        if name == PROFILE_HEADER.encode() and value.strip() in (b"1", b"true"):
+            return True
+    query = parse_qs(scope.get("query_string", b"").decode())
+    return query.get(PROFILE_QUERY, [""])[0] in ("1", "true")
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode().partition(" ")
+            if scheme.lower() == "bearer" and token:
+                return token
+    return None
+
+
+class ProfilingMiddleware:
+    def __init__(
+        self,
+        app,
+        directory: str = PROFILE_DIR,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS,
+    ):
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.interval_seconds = interval_ms / 1000
+
+    async def _should_profile(self, scope) -> bool:
+        if _requested(scope):
+            token = _bearer_token(scope)
+            if token is None:
+                return False
+            try:
+                return await is_admin(token)
+            except Exception:
+                # 권한 확인(DB 조회) 실패는 요청 자체를 실패시키지 않고, 프로파일링 없이 처리
+                logger.warning("admin check for profiling failed, serving %s unprofiled", scope["path"], exc_info=True)
+                return False
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not await self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not _profile_lock.acquire(blocking=False):
+            await self.app(scope, receive, _with_header(send, b"busy"))
+            return
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{slug}-{uuid.uuid4().hex[:6]}"
+        base_path = os.path.join(self.directory, profile_id)
+
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), self.interval_seconds)
+        started = time.perf_counter()
+        try:
+            sampler.start()
+            profiler.enable()
+            try:
+                await self.app(scope, receive, _with_header(send, profile_id.encode()))
+            finally:
+                profiler.disable()
+                sampler.stop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            await asyncio.to_thread(_write_profile, profiler, sampler, base_path)
+            logger.info("profiled %s %s in %.1fms -> %s.{prof,collapsed}", scope["method"], scope["path"], elapsed_ms, base_path)
+        finally:
+            _profile_lock.release()
+
+
+def _with_header(send, value: bytes):
+    """응답 헤더에 X-Profile (프로파일 ID 또는 busy) 를 추가합니다."""
+
+    async def wrapped(message):
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": list(message.get("headers", [])) + [(b"x-profile", value)]}
+        await send(message)
+
+    return wrapped
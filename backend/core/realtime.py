@@ -0,0 +1,181 @@
+"""
+실시간 변경 구독: 캐시 무효화 + 강의실 상태 푸시.
+
+ChangeListener
+  - DATA_BACKEND=supabase: Supabase Realtime(postgres_changes)으로 reservations / timetable_entries 변경을 받아
+    change_bus 에 발행합니다. (db/realtime.sql 로 publication, REPLICA IDENTITY FULL 설정 필요)
+  - DATA_BACKEND=local: local 백엔드가 쓰기마다 change_bus 에 직접 발행합니다.
+  - change_bus 를 구독해 변경된 강의실만 무효화합니다.
+      reservations      → schedule_cache 의 해당 강의실 항목
+      timetable_entries → 메모리 시간표 인덱스에 행 하나만 반영 (DB 재조회 없음, 공유 스냅샷이면 새 세대 발행)
+    합쳐진 조회(core/coalesce.py)의 보관된 결과도 버린 뒤, 해당 강의실의 현재 상태를 다시 계산합니다.
+
+LiveStatusTracker
+  - 강의실별 마지막 상태를 기억했다가 'free' ↔ 'occupied' 가 바뀌면 room_events 에 발행합니다.
+  - 수업 시작·종료처럼 데이터 변경 없이 바뀌는 상태는 매 분 경계에서 다시 계산합니다
+    (/live 구독자가 있을 때만, 전체 강의실에 대해 예약 쿼리 한 번).
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+from .catalog import get_catalog
+from .coalesce import single_flight
+from .config import DATA_BACKEND
+from .database import get_db
+from .events import ChangeEvent, change_bus, room_events
+from .notification_scheduler import KST
+from .occupancy import get_occupancy_index, replace_occupancy_index
+from .room_status import live_statuses
+from .schedule import schedule_cache
+from .shared_snapshot import shared_campus
+
+logger = logging.getLogger(__name__)
+
+WATCHED_TABLES = ("reservations", "timetable_entries")
+
+
+class LiveStatusTracker:
+    def __init__(self):
+        self.statuses: Dict[int, dict] = {}
+
+    async def snapshot(self, room_ids: Optional[Iterable[int]] = None) -> Dict[int, dict]:
+        """현재 상태 (처음이면 전체를 한 번 계산)."""
+        if not self.statuses:
+            await self.refresh()
+        if room_ids is None:
+            return dict(self.statuses)
+        return {room_id: self.statuses[room_id] for room_id in room_ids if room_id in self.statuses}
+
+    async def refresh(self, room_ids: Optional[Iterable[int]] = None, now: Optional[datetime] = None):
+        """room_ids(없으면 전체) 상태를 다시 계산하고, 바뀐 강의실마다 room_events 에 발행합니다."""
+        catalog = await get_catalog()
+        if room_ids is None:
+            room_ids = [room["id"] for room in catalog.rooms]
+        now = now or datetime.now(KST)
+        for room_id, status in (await live_statuses(room_ids, now)).items():
+            previous = self.statuses.get(room_id)
+            self.statuses[room_id] = status
+            if previous is None or (previous["status"], previous["occupied_by"]) == (status["status"], status["occupied_by"]):
+                continue
+            room = catalog.rooms_by_id.get(room_id)
+            room_events.publish({
+                "type": "room_status",
+                "room_id": room_id,
+                "building_id": room["building_id"] if room else None,
+                "building_code": room["building_code"] if room else None,
+                "room_number": room["room_number"] if room else None,
+                "at": now.isoformat(),
+                **status,
+            })
+
+
+class ChangeListener:
+    def __init__(self, tracker: LiveStatusTracker):
+        self.tracker = tracker
+        self._subscription = None
+        self._tasks = []
+        self._channel = None
+
+    async def start(self):
+        self._subscription = change_bus.subscribe()
+        self._tasks = [
+            asyncio.create_task(self._consume(), name="realtime-consume"),
+            asyncio.create_task(self._tick(), name="realtime-tick"),
+        ]
+        if DATA_BACKEND == "supabase":
+            await self._subscribe_supabase()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._subscription is not None:
+            self._subscription.close()
+        if self._channel is not None:
+            try:
+                await self._channel.unsubscribe()
+            except Exception:
+                logger.exception("realtime unsubscribe failed")
+            self._channel = None
+
+    # ---------- 변경 수신 ----------
+    async def _subscribe_supabase(self):
+        db = await get_db()
+        channel = db.channel("classroom-informer-changes")
+        for table in WATCHED_TABLES:
+            channel.on_postgres_changes("*", schema="public", table=table, callback=self._on_postgres_change)
+        self._channel = await channel.subscribe(
+            lambda state, error: logger.info("realtime channel %s%s", state, f" ({error})" if error else "")
+        )
+
+    @staticmethod
+    def _on_postgres_change(payload: dict):
+        data = payload["data"]
+        change_bus.publish(ChangeEvent(
+            table=data["table"],
+            op=str(data["type"]).split(".")[-1].upper(),
+            record=data.get("record") or None,
+            old_record=data.get("old_record") or None,
+        ))
+
+    async def _consume(self):
+        while True:
+            event = await self._subscription.get()
+            try:
+                await self.apply(event)
+            except Exception:
+                logger.exception("failed to apply %s change on %s", event.op, event.table)
+
+    async def apply(self, event: ChangeEvent):
+        """변경 하나를 반영: 영향받은 강의실만 캐시 무효화 + 상태 재계산."""
+        started = time.perf_counter()
+        if event.table == "reservations":
+            rooms = event.room_ids
+            if rooms:
+                for room_id in rooms:
+                    schedule_cache.invalidate(room_id)
+            else:
+                # 삭제 이벤트에 room_id 가 없으면 (REPLICA IDENTITY DEFAULT) 어느 강의실인지 알 수 없음
+                schedule_cache.invalidate()
+        elif event.table == "timetable_entries":
+            if shared_campus is not None:
+                # 워커 공유 스냅샷: 발행 워커가 새 세대를 쓰고 나머지 워커는 그 세대로 갈아탐
+                rooms = await shared_campus.apply_entry(event.row_id, event.record)
+            else:
+                index = await get_occupancy_index()
+                updated, rooms = index.with_entry(event.row_id, event.record)
+                replace_occupancy_index(updated)
+            for room_id in rooms:
+                schedule_cache.invalidate(room_id)
+        else:
+            return
+        single_flight.clear()
+
+        if room_events.subscriber_count:
+            await self.tracker.refresh(rooms or None)
+        else:
+            self.tracker.statuses.clear()
+        logger.debug(
+            "applied %s %s (rooms %s) in %.1fms",
+            event.op, event.table, sorted(rooms) or "all", (time.perf_counter() - started) * 1000,
+        )
+
+    # ---------- 시간 경과 ----------
+    async def _tick(self):
+        while True:
+            # 다음 분 경계까지 대기 (수업 시작·종료는 분 단위)
+            await asyncio.sleep(60 - time.time() % 60 + 0.05)
+            if not room_events.subscriber_count:
+                self.tracker.statuses.clear()  # 구독자가 없으면 추적 중단, 다음 구독 때 새로 계산
+                continue
+            try:
+                await self.tracker.refresh()
+            except Exception:
+                logger.exception("live status refresh failed")
+
+
+tracker = LiveStatusTracker()
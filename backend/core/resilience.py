@@ -0,0 +1,361 @@
+"""
+데이터 백엔드(Supabase) 장애 대응 계층.
+
+InstrumentedClient 와 같은 방식으로 table / rpc 쿼리 빌더를 감싸고 execute() 에서:
+  - 회로 차단기: upstream 장애(타임아웃, 연결 오류, 5xx)가 DB_BREAKER_FAILURES 번 연속되면 열림.
+    열려 있는 동안은 기다리지 않고 바로 실패(또는 마지막 정상 결과)하고,
+    DB_BREAKER_RESET_SECONDS 뒤 요청 하나만 시험 삼아 보내 성공하면 닫힘.
+  - 읽기(select, 읽기 전용 rpc)만:
+      · 마감 시간: 헤지 포함 전체가 DB_READ_DEADLINE_SECONDS 안에 끝나야 함
+      · 헤지: DB_HEDGE_AFTER_SECONDS 안에 응답이 없거나 실패하면 같은 쿼리를 한 번 더 보내 먼저 온 응답 사용
+        (최대 DB_READ_ATTEMPTS 개)
+      · stale-on-error: 쿼리(테이블 + 빌더 호출 체인)별 마지막 정상 결과를 보관했다가,
+        실패·마감 초과·회로 열림일 때만 그 결과를 돌려줍니다 (정상일 때는 항상 upstream 을 읽음).
+        별도의 백그라운드 갱신은 없고, 보관 결과는 다음 정상 읽기에서 바뀝니다. 단, 마감을 넘긴
+        시도는 취소하지 않고 끝까지 기다렸다가 성공하면 보관 결과를 갱신합니다.
+    오래된 결과로 응답한 요청에는 X-Data-Staleness: <초> 헤더가 붙습니다 (StalenessMiddleware).
+  - 쓰기(insert / upsert / update / delete, 그 외 rpc)는 재시도·헤지 없이 차단기만 적용합니다.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Hashable, List, Optional, Tuple
+
+import httpx
+
+from .config import (
+    DB_BREAKER_FAILURES,
+    DB_BREAKER_RESET_SECONDS,
+    DB_HEDGE_AFTER_SECONDS,
+    DB_READ_ATTEMPTS,
+    DB_READ_DEADLINE_SECONDS,
+    STALE_CACHE_MAX_ENTRIES,
+    STALE_MAX_AGE_SECONDS,
+)
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# 부작용 없는 rpc (db/functions.sql, db/change_log.sql) - 헤지·재시도·오래된 결과 사용 가능
+READ_ONLY_RPCS = frozenset({
+    "available_rooms_now", "rooms_available_at", "rooms_free_for_slots", "room_free_slots", "change_feed",
+})
+
+STALENESS_HEADER = "X-Data-Staleness"
+
+RESILIENCE_EVENTS = registry.counter(
+    "upstream_resilience_events_total",
+    "Resilience actions on upstream calls (timeout, hedge, stale, short_circuit).",
+    ("target", "event"))
+BREAKER_STATE = registry.gauge(
+    "upstream_breaker_state", "Upstream circuit breaker state (0 = closed, 1 = open, 2 = half-open).")
+BREAKER_STATE.set(0)
+
+
+class UpstreamUnavailable(Exception):
+    """회로가 열려 있고 돌려줄 이전 결과도 없을 때."""
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """차단기에 셀 실패인지: 타임아웃·연결 오류·5xx (잘못된 쿼리나 제약 조건 위반 같은 4xx 는 제외)."""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError, OSError)):
+        return True
+    code = str(getattr(error, "code", "") or "")
+    return code[:1] == "5"
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 0, 1, 2
+
+    def __init__(self, failure_threshold: int = DB_BREAKER_FAILURES, reset_after: float = DB_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def _set(self, state: int):
+        if state != self.state:
+            logger.warning("upstream circuit %s", ("closed", "open", "half-open")[state])
+        self.state = state
+        BREAKER_STATE.set(state)
+
+    def allow(self) -> bool:
+        """지금 upstream 을 호출해도 되는지. 반쯤 열림에서는 시험 호출 하나만 허용합니다."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_after:
+            self._set(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self._probing = False
+        self._set(self.CLOSED)
+
+    def release_probe(self):
+        """결과 없이 끝난(취소된) 호출. 반쯤 열림의 시험 호출이었다면 다음 호출이 다시 시험할 수 있게 합니다."""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set(self.OPEN)
+
+
+class StaleCache:
+    """쿼리별 마지막 정상 응답 (LRU). 읽기가 실패했을 때만 대신 쓰는 stale-on-error 용."""
+
+    def __init__(self, max_entries: int = STALE_CACHE_MAX_ENTRIES, max_age: float = STALE_MAX_AGE_SECONDS):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._items: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def put(self, key: Hashable, response: Any):
+        self._items[key] = (time.monotonic(), response)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """(경과 초, 응답). 없거나 max_age 보다 오래됐으면 None."""
+        item = self._items.get(key)
+        if item is None:
+            return None
+        age = time.monotonic() - item[0]
+        if age > self.max_age:
+            del self._items[key]
+            return None
+        return age, item[1]
+
+
+breaker = CircuitBreaker()
+stale_cache = StaleCache()
+
+
+# ----------------------------------------
+# 요청 단위 staleness 기록 → 응답 헤더
+# ----------------------------------------
+_staleness: ContextVar[Optional[List[float]]] = ContextVar("data_staleness", default=None)
+
+
+def _mark_stale(age: float):
+    ages = _staleness.get()
+    if ages is not None:
+        ages.append(age)
+
+
+class StalenessMiddleware:
+    """오래된 upstream 결과가 쓰인 응답에 X-Data-Staleness(가장 오래된 결과의 나이, 초)를 붙입니다."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ages: List[float] = []
+        token = _staleness.set(ages)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and ages:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (STALENESS_HEADER.lower().encode(), str(int(max(ages))).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _staleness.reset(token)
+
+
+# ----------------------------------------
+# 클라이언트 래퍼
+# ----------------------------------------
+async def _hedged(
+    target: str,
+    attempt: Callable[[], Awaitable[Any]],
+    deadline: float,
+    store: Callable[[Any], None],
+    may_hedge: Callable[[], bool],
+) -> Any:
+    """
+    attempt() 를 최대 DB_READ_ATTEMPTS 번까지 겹쳐 보내 먼저 성공한 결과를 반환합니다.
+    추가 시도(헤지·재시도)는 may_hedge() 가 참일 때만 (회로가 닫혀 있을 때만) 보냅니다.
+    마감(loop 시각 deadline)을 넘기면 asyncio.TimeoutError. 남은 시도는 백그라운드에서 끝나면 store() 합니다.
+    """
+    loop = asyncio.get_running_loop()
+    tasks: List["asyncio.Task[Any]"] = [asyncio.ensure_future(attempt())]
+    last_error: Optional[BaseException] = None
+
+    def finish_in_background(task: "asyncio.Task[Any]"):
+        def done(t: "asyncio.Task[Any]"):
+            if t.cancelled():
+                return
+            if t.exception() is None:
+                store(t.result())
+
+        task.add_done_callback(done)
+
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            RESILIENCE_EVENTS.inc(target=target, event="timeout")
+            for task in tasks:
+                finish_in_background(task)
+            raise asyncio.TimeoutError(f"{target}: no response within {DB_READ_DEADLINE_SECONDS}s")
+
+        can_hedge = len(tasks) < DB_READ_ATTEMPTS and DB_HEDGE_AFTER_SECONDS > 0 and may_hedge()
+        pending = [task for task in tasks if not task.done()]
+        if not pending and not can_hedge:
+            raise last_error
+
+        wait_for = min(remaining, DB_HEDGE_AFTER_SECONDS) if can_hedge else remaining
+        if pending:
+            done, _ = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            done = set()
+        for task in done:
+            error = task.exception()
+            if error is None or not is_upstream_failure(error):
+                # 성공, 또는 다시 보내도 같은 결과일 오류(잘못된 쿼리 등)
+                for other in tasks:
+                    if other is not task:
+                        other.cancel()
+                return task.result()
+            last_error = error
+
+        # 느리거나(헤지) 실패했으면(재시도) 같은 읽기를 한 번 더
+        if can_hedge and deadline - loop.time() > 0:
+            RESILIENCE_EVENTS.inc(target=target, event="hedge")
+            tasks.append(asyncio.ensure_future(attempt()))
+
+
+class _ResilientQuery:
+    """쿼리 빌더 체인을 그대로 전달하면서 호출 체인을 기억해 두었다가(오래된 결과의 키), execute() 를 보호합니다."""
+
+    _OPS = ("select", "insert", "upsert", "update", "delete")
+
+    def __init__(self, builder: Any, target: str, op: str, read_only: bool, chain: Tuple = ()):
+        self._builder = builder
+        self._target = target
+        self._op = op
+        self._read_only = read_only
+        self._chain = chain
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+        op = name if name in self._OPS and self._op == "select" else self._op
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                chain = self._chain + ((name, repr(args), repr(sorted(kwargs.items()))),)
+                return _ResilientQuery(result, self._target, op, self._read_only, chain)
+            return result
+
+        return call
+
+    @property
+    def _is_read(self) -> bool:
+        return self._op == "select" if self._read_only is None else self._read_only
+
+    async def execute(self):
+        if not self._is_read:
+            return await self._guarded_write()
+
+        key = (self._target, self._chain)
+        if not breaker.allow():
+            RESILIENCE_EVENTS.inc(target=self._target, event="short_circuit")
+            return self._stale_or_raise(key, UpstreamUnavailable(f"{self._target}: upstream circuit open"))
+
+        # 차단기에는 시도 횟수와 관계없이 논리적 읽기 한 번당 결과 하나만 기록.
+        # 반쯤 열림의 시험 호출은 헤지하지 않음 (회복 중인 upstream 에 요청을 겹쳐 보내지 않도록)
+        deadline = asyncio.get_running_loop().time() + DB_READ_DEADLINE_SECONDS
+        try:
+            response = await _hedged(
+                self._target,
+                self._builder.execute,
+                deadline,
+                lambda late: stale_cache.put(key, late),
+                lambda: breaker.state == CircuitBreaker.CLOSED,
+            )
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            if not is_upstream_failure(e):
+                breaker.record_success()  # upstream 은 응답함 (4xx)
+                raise
+            breaker.record_failure()
+            return self._stale_or_raise(key, e)
+        breaker.record_success()
+        stale_cache.put(key, response)
+        return response
+
+    def _stale_or_raise(self, key: Hashable, error: Exception):
+        cached = stale_cache.get(key)
+        if cached is None:
+            raise error
+        age, response = cached
+        RESILIENCE_EVENTS.inc(target=self._target, event="stale")
+        _mark_stale(age)
+        logger.warning("serving %.0fs old %s result (%s)", age, self._target, error)
+        return response
+
+    async def _guarded_write(self):
+        if not breaker.allow():
+            RESILIENCE_EVENTS.inc(target=self._target, event="short_circuit")
+            raise UpstreamUnavailable(f"{self._target}: upstream circuit open")
+        try:
+            response = await self._builder.execute()
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            if is_upstream_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()  # upstream 은 응답함 (4xx)
+            raise
+        breaker.record_success()
+        return response
+
+
+class ResilientClient:
+    """AsyncClient(또는 InstrumentedClient) 래퍼. table / rpc 호출을 보호하고 나머지(auth, channel 등)는 그대로 전달합니다."""
+
+    def __init__(self, client: Any):
+        self._client = client
+        self.auth = client.auth
+
+    def table(self, name: str):
+        # 읽기 여부는 체인의 select / insert ... 로 결정 (None)
+        return _ResilientQuery(self._client.table(name), name, "select", None)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[dict] = None, *args, **kwargs):
+        return _ResilientQuery(
+            self._client.rpc(fn, params, *args, **kwargs),
+            f"rpc:{fn}",
+            "call",
+            fn in READ_ONLY_RPCS,
+            (("rpc", repr(sorted((params or {}).items()))),),
+        )
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
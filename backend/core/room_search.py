@@ -0,0 +1,95 @@
+"""
+"지금 바로 쓸 수 있는 강의실" 검색.
+
+시작 시각부터 연속으로 비어 있는 시간이 긴 순서로 캠퍼스 전체에서 상위 k개 강의실을 고릅니다.
+  1) 카탈로그(메모리)에서 건물 / 수용 인원 / 강의실 유형 / 설비 조건으로 후보를 거릅니다.
+  2) 후보들의 그날 점유 구간(수업 + 확정 예약, core.schedule 의 주 단위 캐시)을 가져옵니다.
+     캐시가 비어 있어도 예약 쿼리는 후보 전체에 대해 한 번입니다.
+  3) 강의실마다 병합된 시작 시각 배열에서 bisect 로 "다음 점유 시작"을 찾고(O(log n)),
+     heapq.nlargest 로 상위 k개만 남깁니다 (O(R log k)).
+"""
+import heapq
+from bisect import bisect_right
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from .catalog import Catalog, parse_features
+from .occupancy import format_minutes
+from .schedule import Merged, busy_between
+
+
+def free_run(merged: Merged, minute: int, until: int) -> int:
+    """minute 부터 until 까지 중 연속으로 비어 있는 시간(분). minute 에 사용 중이면 0."""
+    starts, ends = merged
+    i = bisect_right(starts, minute)  # minute 이후에 시작하는 첫 점유 구간
+    if i > 0 and ends[i - 1] > minute:
+        return 0
+    next_occupied = starts[i] if i < len(starts) else until
+    return max(0, min(next_occupied, until) - minute)
+
+
+def filter_rooms(
+    catalog: Catalog,
+    building_codes: Optional[Iterable[str]] = None,
+    min_capacity: Optional[int] = None,
+    room_type: Optional[str] = None,
+    features: Optional[Iterable[str]] = None,
+) -> List[dict]:
+    """조건에 맞는 후보 강의실. 수용 인원 / 유형 조건이 있으면 값이 비어 있는 강의실은 제외합니다."""
+    if building_codes:
+        rooms = [room for code in dict.fromkeys(building_codes) for room in (catalog.rooms_in(code) or [])]
+    else:
+        rooms = catalog.rooms
+    required = parse_features(",".join(features)) if features else frozenset()
+    return [
+        room for room in rooms
+        if (min_capacity is None or (room.get("capacity") or 0) >= min_capacity)
+        and (room_type is None or (room.get("room_type") or "").lower() == room_type.lower())
+        and required <= catalog.features_by_id.get(room["id"], frozenset())
+    ]
+
+
+async def search_rooms(
+    catalog: Catalog,
+    start: datetime,
+    until: int,
+    limit: int,
+    min_duration: int = 0,
+    building_codes: Optional[Iterable[str]] = None,
+    min_capacity: Optional[int] = None,
+    room_type: Optional[str] = None,
+    features: Optional[Iterable[str]] = None,
+) -> List[dict]:
+    """
+    start(KST) 부터 until(자정 기준 분)까지 연속으로 min_duration 분 이상 비어 있는 강의실 상위 limit 개.
+    빈 시간이 긴 순, 같으면 수용 인원이 작은 순(큰 강의실 아끼기), 강의실 ID 순.
+    """
+    minute = start.hour * 60 + start.minute
+    candidates = filter_rooms(catalog, building_codes, min_capacity, room_type, features)
+    if not candidates or minute >= until:
+        return []
+
+    day = start.date()
+    busy = await busy_between([room["id"] for room in candidates], day, day)
+
+    def scored() -> Iterable[Tuple[Tuple[int, int, int], dict, int]]:
+        for room in candidates:
+            run = free_run(busy[room["id"]][day], minute, until)
+            if run > 0 and run >= min_duration:
+                yield (run, -(room.get("capacity") or 0), -room["id"]), room, run
+
+    top = heapq.nlargest(limit, scored(), key=lambda item: item[0])
+    return [
+        {
+            "room_id": room["id"],
+            "building_code": room["building_code"],
+            "room_number": room["room_number"],
+            "capacity": room.get("capacity"),
+            "room_type": room.get("room_type"),
+            "features": room.get("features"),
+            "free_from": format_minutes(minute),
+            "free_until": format_minutes(minute + run),
+            "free_minutes": run,
+        }
+        for _, room, run in top
+    ]
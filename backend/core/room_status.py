@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from .notification_scheduler import KST
+from .occupancy import (
+    DAYS,
+    DEFAULT_START_TIME,
+    DEFAULT_END_TIME,
+    Interval,
+    OccupancyIndex,
+    format_minutes,
+    free_gaps,
+    get_occupancy_index,
+    merge_intervals,
+    to_minutes,
+)
+from .schedule import MINUTES_PER_DAY, fetch_reservations
+
+
+async def fetch_reservation_intervals(room_ids: List[int], day_start: datetime) -> Dict[int, List[Interval]]:
+    """
+    day_start(KST 자정)부터 하루 동안의 확정 예약을 room_ids 전체에 대해 한 번에 읽어
+    강의실별 (시작 분, 종료 분) 구간으로 반환합니다. 날짜 경계를 넘는 예약은 잘라냅니다.
+    """
+    reservations = await fetch_reservations(room_ids, day_start, day_start + timedelta(days=1))
+    today = day_start.date()
+    return {room_id: by_date.get(today, []) for room_id, by_date in reservations.items()}
+
+
+def room_status(
+    index: OccupancyIndex,
+    reservations: Dict[int, List[Interval]],
+    room_id: int,
+    day: str,
+    minute: int,
+) -> dict:
+    """
+    수업 + 예약을 합친 하루 점유 구간으로 현재 상태를 계산합니다.
+
+    - status: 'free' | 'occupied'
+    - occupied_by: 'class' | 'reservation' (비어 있으면 None)
+    - next_change: 다음 상태 변경 시각 'HH:MM' (사용 중이면 비는 시각, 비어 있으면 다음 사용 시작 시각).
+      오늘 안에 바뀌지 않으면 None
+    - free_slots_today: 사용 가능 시간대(DEFAULT_START_TIME ~ DEFAULT_END_TIME) 중 빈 구간
+    """
+    booked = reservations.get(room_id, [])
+    starts, ends = merge_intervals(index.intervals(room_id, day) + booked)
+
+    occupied_by: Optional[str] = None
+    next_change: Optional[int] = None
+    for start, end in zip(starts, ends):
+        if start <= minute < end:
+            if index.is_occupied_at(room_id, day, minute):
+                occupied_by = "class"
+            else:
+                occupied_by = "reservation"
+            next_change = end if end < MINUTES_PER_DAY else None
+            break
+        if start > minute:
+            next_change = start
+            break
+
+    return {
+        "status": "occupied" if occupied_by else "free",
+        "occupied_by": occupied_by,
+        "next_change": format_minutes(next_change) if next_change is not None else None,
+        "free_slots_today": [
+            {"start": format_minutes(s), "end": format_minutes(e)}
+            for s, e in free_gaps(starts, ends, to_minutes(DEFAULT_START_TIME), to_minutes(DEFAULT_END_TIME))
+        ],
+    }
+
+
+async def live_statuses(room_ids: Iterable[int], now: Optional[datetime] = None) -> Dict[int, dict]:
+    """
+    여러 강의실의 현재 상태를 한 번에 계산합니다.
+    수업은 메모리 시간표 인덱스, 예약은 오늘 하루치 한 번의 쿼리로 확인합니다.
+    """
+    room_ids = sorted(set(room_ids))
+    now_kst = (now or datetime.now(KST)).astimezone(KST)
+    day_start = now_kst.replace(hour=0, minute=0, second=0, microsecond=0)
+    day = DAYS[now_kst.weekday()]
+    minute = now_kst.hour * 60 + now_kst.minute
+
+    index = await get_occupancy_index()
+    reservations = await fetch_reservation_intervals(room_ids, day_start)
+    return {room_id: room_status(index, reservations, room_id, day, minute) for room_id in room_ids}
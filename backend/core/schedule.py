@@ -0,0 +1,239 @@
+"""
+날짜 단위 빈 시간 엔진.
+
+주간 시간표(timetable_entries, 요일 기준)를 실제 KST 날짜에 펼치고, 확정 예약(reservations, timestamptz)을
+합쳐 강의실·날짜별 점유 구간을 만듭니다. 결과는 (room_id, 주 시작일) 단위로 캐시되며,
+시간표 인덱스 버전이 바뀌거나 SCHEDULE_CACHE_TTL_SECONDS 가 지나면 다시 계산합니다.
+"""
+import asyncio
+import time as _time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .catalog import get_catalog
+from .config import SCHEDULE_CACHE_TTL_SECONDS, SCHEDULE_CACHE_MAX_ENTRIES
+from .database import get_db
+from .notification_scheduler import KST
+from .occupancy import (
+    DAYS,
+    PAGE_SIZE,
+    ROOM_FILTER_SIZE,
+    Interval,
+    OccupancyIndex,
+    free_gaps,
+    get_occupancy_index,
+    merge_intervals,
+    room_id_chunks,
+)
+
+MINUTES_PER_DAY = 24 * 60
+
+# 한 번에 계산할 수 있는 최대 기간 (일)
+MAX_RANGE_DAYS = 31
+
+Merged = Tuple[List[int], List[int]]  # merge_intervals 결과 (starts, ends)
+
+
+def week_start(day: date) -> date:
+    """day 가 속한 주의 월요일."""
+    return day - timedelta(days=day.weekday())
+
+
+def kst_midnight(day: date) -> datetime:
+    return KST.localize(datetime(day.year, day.month, day.day))
+
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(KST)
+
+
+def split_by_date(start_at: datetime, end_at: datetime) -> Iterable[Tuple[date, Interval]]:
+    """KST 기준으로 자정을 넘는 구간을 날짜별 (시작 분, 종료 분) 구간으로 나눕니다."""
+    day = start_at.date()
+    while day <= end_at.date():
+        midnight = kst_midnight(day)
+        start = max(0, int((start_at - midnight).total_seconds() // 60))
+        end = min(MINUTES_PER_DAY, -int(-(end_at - midnight).total_seconds() // 60))
+        if end > start:
+            yield day, (start, end)
+        day += timedelta(days=1)
+
+
+async def fetch_reservations(
+    room_ids: Optional[List[int]],
+    start: datetime,
+    end: datetime,
+) -> Dict[int, Dict[date, List[Interval]]]:
+    """
+    [start, end) 와 겹치는 확정 예약을 (페이지 단위) 쿼리로 읽어
+    강의실 → 날짜 → 점유 구간으로 반환합니다. room_ids 가 None 이면 전체 강의실.
+    room_id 필터는 ROOM_FILTER_SIZE 개씩 나눠 동시에 조회하며(URL 길이 제한), 캠퍼스 전체를 덮으면 필터 없이 읽습니다.
+    """
+    if room_ids is not None and not room_ids:
+        return {}
+    if room_ids is not None and len(room_ids) > ROOM_FILTER_SIZE:
+        catalog = await get_catalog()
+        if set(room_ids) >= catalog.rooms_by_id.keys():
+            room_ids = None
+
+    db = await get_db()
+
+    async def fetch(chunk: Optional[List[int]]) -> List[dict]:
+        rows: List[dict] = []
+        offset = 0
+        while True:
+            query = db.table("reservations")\
+                .select("id, room_id, start_at, end_at")\
+                .eq("status", "confirmed")\
+                .lt("start_at", end.isoformat())\
+                .gt("end_at", start.isoformat())
+            if chunk is not None:
+                query = query.in_("room_id", chunk)
+            res = await query.order("id").range(offset, offset + PAGE_SIZE - 1).execute()
+            page = res.data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            offset += PAGE_SIZE
+
+    chunks = [None] if room_ids is None else room_id_chunks(list(room_ids))
+    rows = [row for chunk_rows in await asyncio.gather(*(fetch(chunk) for chunk in chunks)) for row in chunk_rows]
+
+    result: Dict[int, Dict[date, List[Interval]]] = {}
+    for row in rows:
+        by_date = result.setdefault(row["room_id"], {})
+        for day, interval in split_by_date(parse_timestamp(row["start_at"]), parse_timestamp(row["end_at"])):
+            by_date.setdefault(day, []).append(interval)
+    return result
+
+
+def build_week(
+    index: OccupancyIndex,
+    room_id: int,
+    monday: date,
+    reservations: Dict[date, List[Interval]],
+) -> Dict[date, Merged]:
+    """한 강의실의 한 주(월~일) 날짜별 점유 구간: 요일 시간표 + 그날의 예약을 정렬·병합."""
+    week = {}
+    for offset in range(7):
+        day = monday + timedelta(days=offset)
+        week[day] = merge_intervals(index.intervals(room_id, DAYS[offset]) + reservations.get(day, []))
+    return week
+
+
+class WeekScheduleCache:
+    """(room_id, 주 시작일) → 날짜별 점유 구간. LRU + TTL, 시간표 인덱스 버전이 바뀌면 무효."""
+
+    def __init__(self, max_entries: int = SCHEDULE_CACHE_MAX_ENTRIES, ttl_seconds: float = SCHEDULE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[Tuple[int, date], Tuple[str, float, Dict[date, Merged]]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, room_id: int, monday: date, version: str) -> Optional[Dict[date, Merged]]:
+        key = (room_id, monday)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            item_version, loaded_at, week = item
+            if item_version != version or _time.monotonic() - loaded_at > self.ttl_seconds:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return week
+
+    def put(self, room_id: int, monday: date, version: str, week: Dict[date, Merged]):
+        with self._lock:
+            self._items[(room_id, monday)] = (version, _time.monotonic(), week)
+            self._items.move_to_end((room_id, monday))
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def invalidate(self, room_id: Optional[int] = None):
+        """예약이 바뀐 강의실(없으면 전체)의 캐시를 지웁니다."""
+        with self._lock:
+            if room_id is None:
+                self._items.clear()
+                return
+            for key in [key for key in self._items if key[0] == room_id]:
+                del self._items[key]
+
+
+schedule_cache = WeekScheduleCache()
+
+
+async def get_week_busy(room_ids: List[int], monday: date) -> Dict[int, Dict[date, Merged]]:
+    """
+    여러 강의실의 한 주 점유 구간. 캐시에 없는 강의실만 모아 예약을 한 번의 쿼리로 읽어 채웁니다.
+    """
+    index = await get_occupancy_index()
+    result: Dict[int, Dict[date, Merged]] = {}
+    missing: List[int] = []
+    for room_id in room_ids:
+        week = schedule_cache.get(room_id, monday, index.version)
+        if week is None:
+            missing.append(room_id)
+        else:
+            result[room_id] = week
+
+    if missing:
+        start = kst_midnight(monday)
+        reservations = await fetch_reservations(missing, start, kst_midnight(monday + timedelta(days=7)))
+        for room_id in missing:
+            week = build_week(index, room_id, monday, reservations.get(room_id, {}))
+            schedule_cache.put(room_id, monday, index.version, week)
+            result[room_id] = week
+    return result
+
+
+def overlaps(merged: Merged, start: int, end: int) -> bool:
+    """병합된 점유 구간 중 [start, end) 와 겹치는 것이 있는지."""
+    starts, ends = merged
+    i = bisect_right(ends, start)
+    return i < len(starts) and starts[i] < end
+
+
+def validate_range(start_date: date, end_date: date):
+    """잘못된 기간이면 ValueError."""
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+    if (end_date - start_date).days + 1 > MAX_RANGE_DAYS:
+        raise ValueError(f"date range must be at most {MAX_RANGE_DAYS} days")
+
+
+async def busy_between(room_ids: List[int], start_date: date, end_date: date) -> Dict[int, Dict[date, Merged]]:
+    """[start_date, end_date] 각 날짜의 점유 구간 (주 단위 캐시를 이어 붙임)."""
+    validate_range(start_date, end_date)
+    room_ids = list(dict.fromkeys(room_ids))
+    result: Dict[int, Dict[date, Merged]] = {room_id: {} for room_id in room_ids}
+    monday = week_start(start_date)
+    while monday <= end_date:
+        for room_id, week in (await get_week_busy(room_ids, monday)).items():
+            for day, merged in week.items():
+                if start_date <= day <= end_date:
+                    result[room_id][day] = merged
+        monday += timedelta(days=7)
+    return result
+
+
+async def free_slots_between(
+    room_ids: List[int],
+    start_date: date,
+    end_date: date,
+    window_start: int,
+    window_end: int,
+    min_duration: int = 0,
+) -> Dict[int, Dict[date, List[Interval]]]:
+    """강의실·날짜별 빈 구간 ([window_start, window_end) 범위, min_duration 분 이상)."""
+    busy = await busy_between(room_ids, start_date, end_date)
+    return {
+        room_id: {
+            day: free_gaps(starts, ends, window_start, window_end, min_duration)
+            for day, (starts, ends) in sorted(days.items())
+        }
+        for room_id, days in busy.items()
+    }
@@ -0,0 +1,503 @@
+"""
+멀티 워커(uvicorn --workers N) 공유 캠퍼스 스냅샷.
+
+워커마다 카탈로그·시간표 인덱스를 따로 들고 있으면 메모리가 워커 수만큼 늘고,
+TTL 재로딩 시점이 달라 워커마다 다른 상태를 보게 됩니다. SHARED_SNAPSHOT_PATH 를 설정하면:
+
+  - 발행 워커: {path}.lock 에 flock 을 잡은 워커 하나만 DB 에서 읽어 스냅샷 파일을 씁니다.
+    {path}.{pid}.tmp 에 쓴 뒤 os.replace 로 바꿔치기하므로(원자적) 읽는 쪽은 항상 완성된 파일만 봅니다.
+    헤더의 generation 은 발행할 때마다 1씩 증가합니다. 발행 워커가 죽으면 다른 워커가 락을 잡아 이어서 발행합니다.
+  - 모든 워커(발행 워커 포함): 파일을 mmap 으로 열어 numpy 배열 뷰로 씁니다 (복사 없음).
+    SHARED_SNAPSHOT_POLL_SECONDS 마다 파일이 바뀌었는지(inode) 확인하고, 새 세대면 재시작 없이 갈아탑니다.
+    /dev/shm 아래에 두면 공유 메모리 세그먼트와 같습니다 (페이지 캐시 한 벌을 모든 워커가 공유).
+
+파일 형식 (리틀 엔디언):
+  HEADER | manifest(JSON) | 64바이트 정렬된 고정 폭 배열들
+  - 문자열: strings_blob(uint8, UTF-8 연결) + strings_offsets(int64) - 열에는 int32 코드 (-1 = None)
+  - buildings / rooms / entries: 열 단위 배열 (정수 int64, 실수 float64, bool int8 (-1 = None), 문자열 int32 코드)
+  - entries 는 강의실 → (요일, 시작 시간) 순으로 정렬, entry_rooms + entry_offsets 로 강의실별 구간 (CSR)
+  - 병합된 점유 구간: interval_keys(room_id * 8 + 요일) + interval_offsets + interval_starts / interval_ends (분)
+  - 점유 비트맵: bitmap_room_ids + bitmap_bits (rooms, 7, 36) - AvailabilityMatrix 가 그대로 사용
+
+큰 배열(시간표 열, 병합 구간, 비트맵)은 워커가 늘어도 한 벌이고, 워커마다 따로 만드는 것은
+강의실 수만큼의 카탈로그 dict 와 요청 때 필요한 행만 디코딩한 dict 뿐입니다.
+"""
+import asyncio
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from collections.abc import Mapping
+from functools import cached_property
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .availability_matrix import AvailabilityMatrix
+from .catalog import Catalog, fetch_catalog
+from .config import (
+    CATALOG_TTL_SECONDS,
+    OCCUPANCY_INDEX_TTL_SECONDS,
+    SHARED_SNAPSHOT_PATH,
+    SHARED_SNAPSHOT_POLL_SECONDS,
+    SHARED_SNAPSHOT_WAIT_SECONDS,
+)
+from .metrics import registry
+from .occupancy import DAYS, OccupancyIndex, fetch_occupancy_index
+
+try:
+    import fcntl
+except ImportError:  # Windows: 공유 스냅샷 미지원
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CISNAP01"
+# magic, generation, catalog_version, index_version, catalog_loaded_at, index_loaded_at, published_at, manifest 길이
+HEADER = struct.Struct("<8sQ16s16sdddQ")
+ALIGN = 64
+NULL_INT = np.iinfo(np.int64).min
+NULL_BOOL = -1
+DAY_CODES = {day: i for i, day in enumerate(DAYS)}
+
+# 워커가 카탈로그 dict 에 덧붙이는 열 (스냅샷에는 원본 행만 저장)
+DERIVED_ROOM_KEYS = ("building", "building_code")
+
+SHARED_SNAPSHOT_GENERATION = registry.gauge(
+    "shared_snapshot_generation", "Generation of the shared campus snapshot this worker is attached to.")
+SHARED_SNAPSHOT_PUBLISHES = registry.counter(
+    "shared_snapshot_publishes_total", "Shared campus snapshots written by this worker.")
+
+
+# ----------------------------------------
+# 쓰기
+# ----------------------------------------
+class _StringPool:
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [value.encode() for value in self.values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _column_kind(values: Sequence[Any]) -> str:
+    present = [value for value in values if value is not None]
+    if not present:
+        return "str"
+    if all(isinstance(v, bool) for v in present):
+        return "bool"
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return "int"
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return "float"
+    if all(isinstance(v, str) for v in present):
+        return "str"
+    kinds = sorted({type(v).__name__ for v in present})
+    raise TypeError(f"cannot store a column of {', '.join(kinds)} in the shared snapshot")
+
+
+def _encode_table(prefix: str, rows: List[dict], strings: _StringPool, arrays: Dict[str, np.ndarray]) -> List[List[str]]:
+    """행 목록을 열 배열로 바꿔 arrays 에 넣고 [[열 이름, 종류], ...] 를 반환합니다."""
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    columns = []
+    for name in names:
+        values = [row.get(name) for row in rows]
+        kind = _column_kind(values)
+        if kind == "bool":
+            data = np.array([NULL_BOOL if v is None else v for v in values], dtype=np.int8)
+        elif kind == "int":
+            data = np.array([NULL_INT if v is None else v for v in values], dtype=np.int64)
+        elif kind == "float":
+            data = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        else:
+            data = np.array([strings.encode(v) for v in values], dtype=np.int32)
+        arrays[f"{prefix}.{name}"] = data
+        columns.append([name, kind])
+    return columns
+
+
+def _room_rows(catalog: Catalog) -> List[dict]:
+    return [{k: v for k, v in room.items() if k not in DERIVED_ROOM_KEYS} for room in catalog.rooms]
+
+
+def write_snapshot(
+    path: str,
+    generation: int,
+    catalog: Catalog,
+    index: OccupancyIndex,
+    catalog_loaded_at: float,
+    index_loaded_at: float,
+):
+    """카탈로그 + 시간표 인덱스를 스냅샷 파일로 쓰고 path 로 원자적으로 바꿔치기합니다."""
+    strings = _StringPool()
+    arrays: Dict[str, np.ndarray] = {}
+    columns = {
+        "buildings": _encode_table("buildings", catalog.buildings, strings, arrays),
+        "rooms": _encode_table("rooms", _room_rows(catalog), strings, arrays),
+    }
+
+    # 시간표 원본 행 (강의실별로 이미 요일·시작 시간 순 정렬)
+    entry_rooms = sorted(index.entries_by_room)
+    entries = [entry for room_id in entry_rooms for entry in index.entries_by_room[room_id]]
+    columns["entries"] = _encode_table("entries", entries, strings, arrays)
+    arrays["entry_rooms"] = np.array(entry_rooms, dtype=np.int64)
+    arrays["entry_offsets"] = np.zeros(len(entry_rooms) + 1, dtype=np.int64)
+    np.cumsum([len(index.entries_by_room[room_id]) for room_id in entry_rooms], out=arrays["entry_offsets"][1:])
+
+    # 병합된 점유 구간 (CSR)
+    merged = sorted((room_id * 8 + DAY_CODES[day], intervals) for room_id, day, intervals in index.items())
+    arrays["interval_keys"] = np.array([key for key, _ in merged], dtype=np.int64)
+    arrays["interval_offsets"] = np.zeros(len(merged) + 1, dtype=np.int64)
+    np.cumsum([len(intervals) for _, intervals in merged], out=arrays["interval_offsets"][1:])
+    arrays["interval_starts"] = np.array([s for _, intervals in merged for s, _ in intervals], dtype=np.int32)
+    arrays["interval_ends"] = np.array([e for _, intervals in merged for _, e in intervals], dtype=np.int32)
+
+    matrix = AvailabilityMatrix(index)
+    arrays["bitmap_room_ids"] = np.ascontiguousarray(matrix.room_ids, dtype=np.int64)
+    arrays["bitmap_bits"] = np.ascontiguousarray(matrix.bits, dtype=np.uint8)
+
+    arrays["strings_blob"], arrays["strings_offsets"] = strings.arrays()
+
+    # 배열 위치 계산 (manifest 길이가 위치에 영향을 주므로 manifest 뒤를 ALIGN 단위로 맞춤)
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        offset = -(-offset // ALIGN) * ALIGN
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset += array.nbytes
+    manifest = json.dumps({
+        "columns": columns,
+        "entry_count": index.entry_count,
+        "last_seq": index.last_seq,
+        "arrays": layout,
+    }, ensure_ascii=False).encode()
+    data_start = -(-(HEADER.size + len(manifest)) // ALIGN) * ALIGN
+
+    header = HEADER.pack(
+        MAGIC,
+        generation,
+        catalog.version.encode().ljust(16)[:16],
+        index.version.encode().ljust(16)[:16],
+        catalog_loaded_at,
+        index_loaded_at,
+        time.time(),
+        len(manifest),
+    )
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(manifest)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    SHARED_SNAPSHOT_PUBLISHES.inc()
+
+
+# ----------------------------------------
+# 읽기 (mmap, 복사 없음)
+# ----------------------------------------
+class SnapshotFile:
+    """스냅샷 파일 하나를 mmap 으로 연 것. 배열은 모두 읽기 전용 뷰입니다."""
+
+    def __init__(self, fd: int):
+        self._mmap = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        (magic, self.generation, catalog_version, index_version,
+         self.catalog_loaded_at, self.index_loaded_at, self.published_at, manifest_length) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError("Not a campus snapshot file")
+        self.catalog_version = catalog_version.decode().strip()
+        self.index_version = index_version.decode().strip()
+
+        manifest = json.loads(self._mmap[HEADER.size:HEADER.size + manifest_length])
+        data_start = -(-(HEADER.size + manifest_length) // ALIGN) * ALIGN
+        self.columns: Dict[str, List[List[str]]] = manifest["columns"]
+        self.entry_count: int = manifest["entry_count"]
+        self.last_seq: int = manifest.get("last_seq", 0)
+        self.arrays: Dict[str, np.ndarray] = {
+            name: np.frombuffer(
+                self._mmap,
+                dtype=np.dtype(spec["dtype"]),
+                count=int(np.prod(spec["shape"])),
+                offset=data_start + spec["offset"],
+            ).reshape(spec["shape"])
+            for name, spec in manifest["arrays"].items()
+        }
+        self._blob = self.arrays["strings_blob"]
+        self._string_offsets = self.arrays["strings_offsets"]
+
+    def string(self, code: int) -> Optional[str]:
+        if code < 0:
+            return None
+        return self._blob[self._string_offsets[code]:self._string_offsets[code + 1]].tobytes().decode()
+
+    def rows(self, table: str, start: int = 0, stop: Optional[int] = None) -> List[dict]:
+        """table 의 [start, stop) 행을 dict 로 디코딩합니다."""
+        decoded = []
+        for name, kind in self.columns[table]:
+            values = self.arrays[f"{table}.{name}"][start:stop].tolist()
+            if kind == "bool":
+                values = [None if v == NULL_BOOL else bool(v) for v in values]
+            elif kind == "int":
+                values = [None if v == NULL_INT else v for v in values]
+            elif kind == "float":
+                values = [None if v != v else v for v in values]  # NaN → None
+            else:
+                values = [self.string(v) for v in values]
+            decoded.append((name, values))
+        count = len(decoded[0][1]) if decoded else 0
+        return [{name: values[i] for name, values in decoded} for i in range(count)]
+
+    def catalog(self) -> Catalog:
+        catalog = Catalog(self.rows("buildings"), self.rows("rooms"))
+        catalog.version = self.catalog_version  # 모든 워커가 같은 버전 (ETag 등)
+        return catalog
+
+
+class _EntriesByRoom(Mapping):
+    """OccupancyIndex.entries_by_room 대체: 요청한 강의실의 행만 그때그때 디코딩합니다."""
+
+    def __init__(self, snapshot: SnapshotFile):
+        self._snapshot = snapshot
+        self._rooms = snapshot.arrays["entry_rooms"]
+        self._offsets = snapshot.arrays["entry_offsets"]
+
+    def __getitem__(self, room_id: int) -> List[dict]:
+        i = int(np.searchsorted(self._rooms, room_id))
+        if i >= len(self._rooms) or self._rooms[i] != room_id:
+            raise KeyError(room_id)
+        return self._snapshot.rows("entries", int(self._offsets[i]), int(self._offsets[i + 1]))
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._rooms.tolist())
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+
+class _MergedIntervals(Mapping):
+    """OccupancyIndex._intervals 대체: (room_id, day) → (starts, ends) 를 CSR 배열에서 잘라 줍니다."""
+
+    def __init__(self, snapshot: SnapshotFile):
+        self._keys = snapshot.arrays["interval_keys"]
+        self._offsets = snapshot.arrays["interval_offsets"]
+        self._starts = snapshot.arrays["interval_starts"]
+        self._ends = snapshot.arrays["interval_ends"]
+
+    def __getitem__(self, key: Tuple[int, str]) -> Tuple[List[int], List[int]]:
+        room_id, day = key
+        if day not in DAY_CODES:
+            raise KeyError(key)
+        code = room_id * 8 + DAY_CODES[day]
+        i = int(np.searchsorted(self._keys, code))
+        if i >= len(self._keys) or self._keys[i] != code:
+            raise KeyError(key)
+        start, stop = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._starts[start:stop].tolist(), self._ends[start:stop].tolist()
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        return ((key // 8, DAYS[key % 8]) for key in self._keys.tolist())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class SharedOccupancyIndex(OccupancyIndex):
+    """스냅샷 배열 위에서 동작하는 OccupancyIndex (조회 메서드는 부모 것을 그대로 사용)."""
+
+    def __init__(self, snapshot: SnapshotFile):
+        self._intervals = _MergedIntervals(snapshot)
+        self.entries_by_room = _EntriesByRoom(snapshot)
+        self.room_ids = frozenset((snapshot.arrays["interval_keys"] // 8).tolist())
+        self.entry_count = snapshot.entry_count
+        self.version = snapshot.index_version
+        self.loaded_at = time.monotonic()
+        self.last_seq = snapshot.last_seq
+        self.bitmap = (snapshot.arrays["bitmap_room_ids"], snapshot.arrays["bitmap_bits"])
+
+    @cached_property
+    def _room_by_entry(self) -> Dict[int, int]:
+        # with_entry(실시간 변경 반영)에서만 필요 - 처음 쓸 때 만듦
+        return {
+            entry["id"]: room_id
+            for room_id, rows in self.entries_by_room.items()
+            for entry in rows
+            if entry.get("id") is not None
+        }
+
+    def entry_room(self, entry_id: Any) -> Optional[int]:
+        return self._room_by_entry.get(entry_id)
+
+
+class CampusState:
+    """워커가 붙어 있는 스냅샷 한 세대."""
+
+    def __init__(self, snapshot: SnapshotFile):
+        self.snapshot = snapshot
+        self.generation = snapshot.generation
+        self.catalog = snapshot.catalog()
+        self.index = SharedOccupancyIndex(snapshot)
+
+
+# ----------------------------------------
+# 워커별 관리자
+# ----------------------------------------
+class SharedCampus:
+    def __init__(self, path: str):
+        if fcntl is None:
+            raise RuntimeError("SHARED_SNAPSHOT_PATH requires a POSIX platform (fcntl.flock)")
+        self.path = path
+        self._state: Optional[CampusState] = None
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+        self._lock_fd: Optional[int] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._publish_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def is_publisher(self) -> bool:
+        return self._lock_fd is not None
+
+    def try_lead(self) -> bool:
+        """발행 락(flock)을 잡았거나 지금 잡을 수 있으면 True. 워커 하나에서만 돌아야 하는 작업(알림 스케줄러)도 이 락을 씁니다."""
+        return self._try_acquire()
+
+    async def current(self) -> CampusState:
+        """지금 세대. POLL 주기가 지났으면 새 세대가 있는지 확인합니다 (발행 워커는 TTL 이 지났으면 새로 발행)."""
+        if self._state is not None and time.monotonic() - self._checked_at < SHARED_SNAPSHOT_POLL_SECONDS:
+            return self._state
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._state is None or time.monotonic() - self._checked_at >= SHARED_SNAPSHOT_POLL_SECONDS:
+                await self._refresh()
+                self._checked_at = time.monotonic()
+        return self._state
+
+    async def _refresh(self):
+        self._attach_latest()
+        if self._try_acquire():
+            await self._publish_if_stale()
+
+        deadline = time.monotonic() + SHARED_SNAPSHOT_WAIT_SECONDS
+        while self._state is None:
+            # 아직 발행된 스냅샷이 없음: 발행 워커를 기다리거나, 그 워커가 죽었으면 대신 발행
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"No shared snapshot was published at {self.path}")
+            await asyncio.sleep(0.1)
+            if self._try_acquire():
+                await self._publish_if_stale()
+            self._attach_latest()
+
+    def _try_acquire(self) -> bool:
+        if self._lock_fd is not None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        logger.info("worker %s publishes the shared snapshot %s", os.getpid(), self.path)
+        return True
+
+    def _attach_latest(self) -> bool:
+        """파일이 바뀌었으면 새 세대로 갈아탑니다. 갈아탔으면 True."""
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        try:
+            stat = os.fstat(fd)
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return False
+            snapshot = SnapshotFile(fd)  # mmap 은 fd 를 닫아도 유지됨
+        finally:
+            os.close(fd)
+
+        self._signature = signature
+        if self._state is not None and snapshot.generation == self._state.generation:
+            return False
+        self._state = CampusState(snapshot)
+        SHARED_SNAPSHOT_GENERATION.set(snapshot.generation)
+        logger.info("attached shared snapshot generation %s", snapshot.generation)
+        return True
+
+    async def _publish_if_stale(self):
+        """(발행 워커) 카탈로그·시간표 중 TTL 이 지난 것만 DB 에서 다시 읽어 새 세대를 발행합니다."""
+        now = time.time()
+        state = self._state
+        catalog_stale = state is None or now - state.snapshot.catalog_loaded_at > CATALOG_TTL_SECONDS
+        index_stale = state is None or now - state.snapshot.index_loaded_at > OCCUPANCY_INDEX_TTL_SECONDS
+        if not (catalog_stale or index_stale):
+            return
+
+        catalog, index = await asyncio.gather(
+            fetch_catalog() if catalog_stale else asyncio.sleep(0),
+            fetch_occupancy_index() if index_stale else asyncio.sleep(0),
+        )
+        async with self._publishing():
+            # 다시 읽지 않은 쪽은 락을 잡은 시점의 최신 세대(그 사이 apply_entry 반영분 포함)를 그대로 씀
+            state = self._state
+            await self._publish(
+                catalog if catalog_stale else state.catalog,
+                index if index_stale else state.index,
+                now if catalog_stale else state.snapshot.catalog_loaded_at,
+                now if index_stale else state.snapshot.index_loaded_at,
+            )
+
+    def _publishing(self) -> asyncio.Lock:
+        """발행(인코딩·쓰기)은 스레드에서 하므로, 그 사이 다른 발행이 끼어들지 않게 하는 락."""
+        if self._publish_lock is None:
+            self._publish_lock = asyncio.Lock()
+        return self._publish_lock
+
+    async def _publish(self, catalog: Catalog, index: OccupancyIndex, catalog_loaded_at: float, index_loaded_at: float):
+        """(_publishing() 안에서) 새 세대를 씁니다. 인코딩·파일 쓰기는 이벤트 루프를 막지 않도록 스레드에서."""
+        generation = (self._state.generation if self._state else 0) + 1
+        await asyncio.to_thread(write_snapshot, self.path, generation, catalog, index, catalog_loaded_at, index_loaded_at)
+        self._attach_latest()
+
+    async def apply_entry(self, entry_id: Any, entry: Optional[dict]) -> Set[int]:
+        """
+        timetable_entries 행 변경 반영. 발행 워커가 새 세대를 쓰고, 나머지 워커는 그 세대를 잠시 기다립니다.
+        영향받은 room_id 를 반환합니다.
+        """
+        state = await self.current()
+        if self._try_acquire():
+            async with self._publishing():
+                # 락을 기다리는 동안 다른 변경이 발행되었을 수 있으므로 최신 세대에 반영
+                state = self._state
+                # 스냅샷 배열을 dict 로 펼치므로 이벤트 루프 밖에서
+                index, rooms = await asyncio.to_thread(state.index.with_entry, entry_id, entry)
+                await self._publish(state.catalog, index, state.snapshot.catalog_loaded_at, state.snapshot.index_loaded_at)
+            return rooms
+
+        rooms = {state.index.entry_room(entry_id), (entry or {}).get("room_id")} - {None}
+        deadline = time.monotonic() + SHARED_SNAPSHOT_POLL_SECONDS
+        while not self._attach_latest() and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        return rooms
+
+
+shared_campus: Optional[SharedCampus] = SharedCampus(SHARED_SNAPSHOT_PATH) if SHARED_SNAPSHOT_PATH else None
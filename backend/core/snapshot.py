@@ -0,0 +1,80 @@
+import json
+from typing import Dict, List, Optional
+
+from .catalog import Catalog
+from .occupancy import DAYS, OccupancyIndex, to_minutes
+
+try:
+    import msgpack
+except ImportError:  # msgpack 미설치 시 JSON 만 제공
+    msgpack = None
+
+SNAPSHOT_FORMATS = ("json", "msgpack") if msgpack is not None else ("json",)
+
+ROOM_COLUMNS = ("id", "building_id", "room_number", "capacity", "room_type", "features", "photo_url")
+DICT_COLUMNS = ("course_code", "course_name", "department", "instructor")
+
+
+def snapshot_version(catalog: Catalog, index: OccupancyIndex) -> str:
+    return f"{catalog.version}.{index.version}"
+
+
+class _StringTable:
+    """반복되는 문자열을 정수 코드로 바꾸는 사전 인코더 (None → -1)."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def build_snapshot(catalog: Catalog, index: OccupancyIndex) -> dict:
+    """
+    캠퍼스 전체(건물, 강의실, 시간표)를 열(column) 단위로 인코딩합니다.
+
+    - day: DAYS 의 인덱스 (0=월 ... 6=일)
+    - start / end: 자정 기준 분
+    - course_code / course_name / department / instructor: strings 배열의 인덱스 (-1 = 없음)
+    - last_seq: 이 시간표 이후의 변경을 받을 /sync/changes 의 since 값
+    """
+    strings = _StringTable()
+    timetable = {name: [] for name in ("id", "room_id", "day", "start", "end") + DICT_COLUMNS}
+    day_codes = {day: i for i, day in enumerate(DAYS)}
+
+    for room_id in sorted(index.entries_by_room):
+        for entry in index.entries_by_room[room_id]:
+            timetable["id"].append(entry.get("id"))
+            timetable["room_id"].append(room_id)
+            timetable["day"].append(day_codes[entry["day"]])
+            timetable["start"].append(to_minutes(entry["start_time"]))
+            timetable["end"].append(to_minutes(entry["end_time"]))
+            for name in DICT_COLUMNS:
+                timetable[name].append(strings.encode(entry.get(name)))
+
+    return {
+        "version": snapshot_version(catalog, index),
+        "last_seq": index.last_seq,
+        "days": DAYS,
+        "buildings": {
+            "id": [b["id"] for b in catalog.buildings],
+            "code": [b["code"] for b in catalog.buildings],
+            "name": [b.get("name") for b in catalog.buildings],
+        },
+        "rooms": {name: [room.get(name) for room in catalog.rooms] for name in ROOM_COLUMNS},
+        "strings": strings.values,
+        "timetable": timetable,
+    }
+
+
+def serialize_snapshot(snapshot: dict, fmt: str) -> bytes:
+    if fmt == "msgpack":
+        return msgpack.packb(snapshot, use_bin_type=True)
+    return json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")).encode()
@@ -0,0 +1,98 @@
+"""
+앱 시작 시 예열과 준비 상태.
+
+main.py 의 lifespan 이 run_until_ready() 를 시작합니다.
+  - database : 데이터 클라이언트 생성 (local 백엔드면 CSV 시드)
+  - catalog  : 건물·강의실 카탈로그
+  - timetable: 시간표 인덱스 + 점유 비트맵
+세 단계는 동시에 진행되며(카탈로그·시간표는 클라이언트 생성을 함께 기다림), 단계마다 걸린 시간을 로그로 남기고
+GET /readyz 에서 진행 상황을 보여 줍니다. 공유 스냅샷을 쓰면(SHARED_SNAPSHOT_PATH) 카탈로그·시간표는
+발행 워커가 DB 에서 읽고 나머지 워커는 스냅샷에 붙습니다.
+실패하면 WARMUP_RETRY_SECONDS 뒤 다시 시도하며, 그동안 /readyz 는 503 입니다 (요청은 필요할 때 로드).
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .availability_matrix import get_availability_matrix
+from .catalog import get_catalog
+from .config import WARMUP_RETRY_SECONDS
+from .database import get_db
+from .occupancy import get_occupancy_index
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_timetable():
+    index = await get_occupancy_index()
+    await get_availability_matrix()
+    return index
+
+
+class Warmup:
+    def __init__(self):
+        self.ready = False
+        self.attempts = 0
+        self.steps: Dict[str, dict] = {}
+        self.seconds: Optional[float] = None
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "attempts": self.attempts,
+            "warmup_ms": None if self.seconds is None else round(self.seconds * 1000, 1),
+            "steps": self.steps,
+        }
+
+    async def _step(self, name: str, load: Callable[[], Awaitable[Any]], describe: Callable[[Any], dict]):
+        self.steps[name] = {"status": "running"}
+        started = time.perf_counter()
+        try:
+            result = await load()
+        except Exception as e:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.steps[name] = {"status": "failed", "ms": round(elapsed, 1), "error": str(e)}
+            logger.warning("warm-up: %s failed after %.1fms: %s", name, elapsed, e)
+            raise
+        elapsed = (time.perf_counter() - started) * 1000
+        details = describe(result)
+        self.steps[name] = {"status": "done", "ms": round(elapsed, 1), **details}
+        logger.info("warm-up: %s ready in %.1fms %s", name, elapsed, details)
+
+    async def run(self):
+        """모든 단계를 동시에 한 번 실행합니다. 하나라도 실패하면 예외."""
+        self.attempts += 1
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            self._step("database", get_db, lambda db: {}),
+            self._step("catalog", get_catalog, lambda catalog: {
+                "buildings": len(catalog.buildings),
+                "rooms": len(catalog.rooms),
+                "version": catalog.version,
+            }),
+            self._step("timetable", _warm_timetable, lambda index: {
+                "entries": index.entry_count,
+                "rooms": len(index.room_ids),
+                "version": index.version,
+            }),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+        self.seconds = time.perf_counter() - started
+        self.ready = True
+        logger.info("warm-up: ready in %.1fms (attempt %d)", self.seconds * 1000, self.attempts)
+
+    async def run_until_ready(self):
+        while True:
+            try:
+                await self.run()
+                return
+            except Exception:
+                logger.exception("warm-up failed, retrying in %.0fs", WARMUP_RETRY_SECONDS)
+            await asyncio.sleep(WARMUP_RETRY_SECONDS)
+
+
+warmup = Warmup()
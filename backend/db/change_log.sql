@@ -0,0 +1,258 @@
+-- change_log.sql
+-- Classroom Informer – incremental change feed (delta sync)
+--
+-- Every insert / update / delete on reservations and timetable_entries is
+-- appended to public.change_log. Clients keep the last cursor (seq) they
+-- have seen and call
+--   GET /sync/changes?since=<seq>
+-- to receive only what changed after it.
+--
+-- Why seq and not the identity column:
+--   identity values are handed out at INSERT, but transactions commit in
+--   a different order. A reader could see version 11 (committed) while
+--   version 10 is still in flight, move its cursor to 11 and never see 10.
+--   So rows get their cursor value (seq) only once every transaction that
+--   could still commit an older row has finished: publish_change_log()
+--   numbers rows whose txid is below the snapshot xmin, in (txid, version)
+--   order, under an advisory lock. Later rows always get a larger seq.
+--   It runs in one place only (pg_cron job below, or the service role);
+--   change_feed() itself is a plain read.
+
+-- =========================
+-- TABLE: change_log
+-- =========================
+create table if not exists public.change_log (
+  version    bigint generated always as identity primary key,  -- insert order (internal)
+  txid       xid8        not null default pg_current_xact_id(),
+  seq        bigint      unique,              -- client cursor, null until published by publish_change_log()
+  table_name text        not null,            -- 'reservations' | 'timetable_entries'
+  row_id     bigint      not null,
+  op         text        not null,            -- 'insert' | 'update' | 'cancel' | 'delete'
+  row_data   jsonb,                           -- new row (null for delete)
+  changed_at timestamptz not null default now()
+);
+
+-- Upgrading an existing change_log: existing rows keep their version as
+-- seq, so cursors that clients already hold stay valid.
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = 'change_log' AND column_name = 'seq'
+  ) THEN
+    ALTER TABLE public.change_log
+      ADD COLUMN txid xid8 NOT NULL DEFAULT pg_current_xact_id(),
+      ADD COLUMN seq bigint UNIQUE;
+    UPDATE public.change_log SET seq = version;
+  END IF;
+END;
+$$;
+
+create index if not exists idx_change_log_changed_at
+  on public.change_log (changed_at);
+
+create index if not exists idx_change_log_unpublished
+  on public.change_log (txid, version) where seq is null;
+
+-- Highest seq removed by prune_change_log (single row).
+create table if not exists public.change_log_watermark (
+  id             boolean primary key default true check (id),
+  pruned_through bigint  not null default 0
+);
+
+insert into public.change_log_watermark (id) values (true)
+on conflict (id) do nothing;
+
+ALTER TABLE public.change_log ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.change_log_watermark ENABLE ROW LEVEL SECURITY;  -- only via the functions below
+
+DROP POLICY IF EXISTS public_read_change_log ON public.change_log;
+
+-- Only availability-relevant columns are logged (see record_change),
+-- so the feed is readable by everyone like the timetable itself.
+CREATE POLICY public_read_change_log
+ON public.change_log
+FOR SELECT
+USING (true);
+
+-- =====================================================
+-- record_change trigger
+--   Reservations are logged without user_id / purpose, so the feed
+--   never exposes who booked a room.
+-- =====================================================
+CREATE OR REPLACE FUNCTION public.record_change()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $function$
+DECLARE
+  v_op   text := lower(TG_OP);
+  v_data jsonb;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    INSERT INTO public.change_log (table_name, row_id, op, row_data)
+    VALUES (TG_TABLE_NAME, OLD.id, 'delete', NULL);
+    RETURN OLD;
+  END IF;
+
+  IF TG_TABLE_NAME = 'reservations' THEN
+    v_data := jsonb_build_object(
+      'id',      NEW.id,
+      'room_id', NEW.room_id,
+      'start_at', NEW.start_at,
+      'end_at',  NEW.end_at,
+      'status',  NEW.status
+    );
+    IF NEW.status = 'cancelled' THEN
+      v_op := 'cancel';
+    END IF;
+  ELSE
+    v_data := to_jsonb(NEW);
+  END IF;
+
+  INSERT INTO public.change_log (table_name, row_id, op, row_data)
+  VALUES (TG_TABLE_NAME, NEW.id, v_op, v_data);
+  RETURN NEW;
+END;
+$function$;
+
+DROP TRIGGER IF EXISTS reservations_change_log ON public.reservations;
+
+CREATE TRIGGER reservations_change_log
+AFTER INSERT OR UPDATE OR DELETE ON public.reservations
+FOR EACH ROW
+EXECUTE FUNCTION public.record_change();
+
+DROP TRIGGER IF EXISTS timetable_entries_change_log ON public.timetable_entries;
+
+CREATE TRIGGER timetable_entries_change_log
+AFTER INSERT OR UPDATE OR DELETE ON public.timetable_entries
+FOR EACH ROW
+EXECUTE FUNCTION public.record_change();
+
+-- =====================================================
+-- publish_change_log
+--   Assigns seq to finished rows (see header). Serialised by the
+--   advisory lock, so only one publisher numbers rows at a time.
+--   Returns the number of rows published.
+-- =====================================================
+CREATE OR REPLACE FUNCTION public.publish_change_log()
+RETURNS bigint
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $function$
+DECLARE
+  v_count bigint;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('public.change_log.seq'));
+
+  -- Statement snapshot: every txid below its xmin has committed or aborted
+  WITH base AS (
+    SELECT greatest(
+      (SELECT coalesce(max(seq), 0) FROM public.change_log),
+      (SELECT pruned_through FROM public.change_log_watermark)
+    ) AS last_seq
+  ), ready AS (
+    SELECT version, row_number() OVER (ORDER BY txid, version) AS rn
+    FROM public.change_log
+    WHERE seq IS NULL
+      AND txid < pg_snapshot_xmin(pg_current_snapshot())
+  )
+  UPDATE public.change_log c
+  SET seq = base.last_seq + ready.rn
+  FROM ready, base
+  WHERE c.version = ready.version;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$function$;
+
+REVOKE EXECUTE ON FUNCTION public.publish_change_log() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.publish_change_log() TO service_role;
+
+-- Publish every few seconds when pg_cron is available (Supabase:
+-- Database → Extensions → pg_cron). Without it, call
+-- `select public.publish_change_log()` periodically with the service role.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+    PERFORM cron.schedule('publish-change-log', '2 seconds', 'SELECT public.publish_change_log()');
+  END IF;
+END;
+$$;
+
+-- =====================================================
+-- change_feed (GET /sync/changes)
+--   Read-only: returns up to p_limit published rows after p_since, the
+--   prune watermark and the newest published seq:
+--   {"pruned_through": n, "last_seq": n,
+--    "changes": [{version (= seq), table_name, row_id, op, row_data}, ...]}
+--   Rows of transactions still in flight have no seq yet; they get a
+--   larger seq than everything already served once they are published.
+-- =====================================================
+CREATE OR REPLACE FUNCTION public.change_feed(p_since bigint, p_limit integer DEFAULT 500)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $function$
+  SELECT jsonb_build_object(
+    'pruned_through', w.pruned_through,
+    'last_seq', greatest((SELECT coalesce(max(seq), 0) FROM public.change_log), w.pruned_through),
+    'changes', coalesce((
+      SELECT jsonb_agg(to_jsonb(r) ORDER BY r.version)
+      FROM (
+        SELECT seq AS version, table_name, row_id, op, row_data
+        FROM public.change_log
+        WHERE seq > p_since
+        ORDER BY seq
+        LIMIT p_limit
+      ) r
+    ), '[]'::jsonb)
+  )
+  FROM public.change_log_watermark w;
+$function$;
+
+GRANT EXECUTE ON FUNCTION public.change_feed(bigint, integer) TO anon, authenticated;
+
+-- =====================================================
+-- prune_change_log
+--   Drop published entries older than p_keep and remember the highest
+--   removed seq. Clients whose cursor is below it get 410 from
+--   /sync/changes and must do a full re-download (e.g. /info/snapshot).
+--   (Gaps from rolled-back inserts never reach seq, so they are not
+--   mistaken for pruning.)
+-- =====================================================
+CREATE OR REPLACE FUNCTION public.prune_change_log(p_keep interval DEFAULT interval '30 days')
+RETURNS bigint
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $function$
+DECLARE
+  v_count bigint;
+  v_max   bigint;
+BEGIN
+  PERFORM pg_advisory_xact_lock(hashtext('public.change_log.seq'));
+
+  WITH deleted AS (
+    DELETE FROM public.change_log
+    WHERE seq IS NOT NULL
+      AND changed_at < now() - p_keep
+      -- keep the newest published row so the next seq continues from it
+      AND seq < (SELECT max(seq) FROM public.change_log)
+    RETURNING seq
+  )
+  SELECT count(*), max(seq) INTO v_count, v_max FROM deleted;
+
+  IF v_max IS NOT NULL THEN
+    UPDATE public.change_log_watermark
+    SET pruned_through = greatest(pruned_through, v_max);
+  END IF;
+  RETURN v_count;
+END;
+$function$;
@@ -6,7 +6,7 @@ CREATE EXTENSION IF NOT EXISTS btree_gist;
 
 -- =====================================================
 -- 1) Available rooms right now
---    Uses timetables + reservations, filtered by building
+--    Thin wrapper kept for existing callers; see rooms_available_at (5)
 -- =====================================================
 CREATE OR REPLACE FUNCTION public.available_rooms_now(p_building_code text)
 RETURNS TABLE(room_id bigint, building_code text, room_number text)
@@ -15,38 +15,148 @@ SECURITY DEFINER
 AS $function$
 BEGIN
   RETURN QUERY
-  WITH now_korea AS (
+  SELECT a.room_id, a.building_code, a.room_number
+  FROM public.rooms_available_at(now(), p_building_code) a
+  ORDER BY a.room_number;
+END;
+$function$;
+
+-- =====================================================
+-- 2) handle_new_user trigger
+--    Automatically create a profile row when a new auth user is created
+-- =====================================================
+CREATE OR REPLACE FUNCTION public.handle_new_user()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $function$
+BEGIN
+  -- Create a profile row for this new auth user.
+  -- Only 'id' is required; other columns use defaults.
+  INSERT INTO public.profiles (id)
+  VALUES (NEW.id)
+  ON CONFLICT (id) DO NOTHING;  -- avoid error if row already exists
+
+  RETURN NEW;
+END;
+$function$;
+
+-- =====================================================
+-- 3) toggle_favorite
+--    Adds the favorite if missing, removes it if present,
+--    in one statement (one round trip, no select-then-insert race).
+--    Returns the new state: true = favorited, false = removed.
+--    Called by the backend with the service role, hence p_user_id.
+-- =====================================================
+CREATE OR REPLACE FUNCTION public.toggle_favorite(p_user_id uuid, p_room_id bigint)
+RETURNS boolean
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $function$
+  WITH deleted AS (
+    DELETE FROM public.favorites f
+    WHERE f.user_id = p_user_id
+      AND f.room_id = p_room_id
+    RETURNING 1
+  ),
+  inserted AS (
+    INSERT INTO public.favorites (user_id, room_id)
+    SELECT p_user_id, p_room_id
+    WHERE NOT EXISTS (SELECT 1 FROM deleted)
+    -- a concurrent toggle already inserted it: keep it, no pkey error
+    ON CONFLICT (user_id, room_id) DO NOTHING
+    RETURNING 1
+  )
+  SELECT NOT EXISTS (SELECT 1 FROM deleted);
+$function$;
+
+-- =====================================================
+-- 4) set_favorites
+--    Batch add / remove for one user in a single statement.
+--    Unknown room ids are ignored; an id in both arrays is added.
+--    Returns only the rows that actually changed.
+-- =====================================================
+CREATE OR REPLACE FUNCTION public.set_favorites(
+  p_user_id uuid,
+  p_add     bigint[] DEFAULT '{}',
+  p_remove  bigint[] DEFAULT '{}'
+)
+RETURNS TABLE(room_id bigint, favorited boolean)
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $function$
+  WITH removed AS (
+    DELETE FROM public.favorites f
+    WHERE f.user_id = p_user_id
+      AND f.room_id = ANY(p_remove)
+      AND NOT (f.room_id = ANY(p_add))
+    RETURNING f.room_id
+  ),
+  added AS (
+    INSERT INTO public.favorites (user_id, room_id)
+    SELECT p_user_id, r.id
+    FROM public.rooms r
+    WHERE r.id = ANY(p_add)
+    ON CONFLICT (user_id, room_id) DO NOTHING
+    RETURNING favorites.room_id
+  )
+  SELECT a.room_id, true FROM added a
+  UNION ALL
+  SELECT d.room_id, false FROM removed d;
+$function$;
+
+-- Both functions take the user id as a parameter, so only the backend
+-- (service role) may call them.
+REVOKE EXECUTE ON FUNCTION public.toggle_favorite(uuid, bigint) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.set_favorites(uuid, bigint[], bigint[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.toggle_favorite(uuid, bigint) TO service_role;
+GRANT EXECUTE ON FUNCTION public.set_favorites(uuid, bigint[], bigint[]) TO service_role;
+
+-- =====================================================
+-- Availability functions (5 ~ 7)
+--   One set-based statement per question instead of one round trip per room.
+--   All intervals are half-open [start, end) and wall-clock times are KST.
+--   Classes are matched through idx_timetable_room_day_time (room_id, day, start_time, end_time),
+--   reservations through idx_reservations_room_time (room_id, start_at, end_at).
+--   Called by the backend when AVAILABILITY_BACKEND=rpc (core/availability_rpc.py).
+-- =====================================================
+
+-- =====================================================
+-- 5) rooms_available_at
+--    Rooms with no class and no confirmed reservation at p_at.
+--    Optional filters: building code and / or an explicit room id list.
+-- =====================================================
+CREATE OR REPLACE FUNCTION public.rooms_available_at(
+  p_at            timestamptz DEFAULT now(),
+  p_building_code text        DEFAULT NULL,
+  p_room_ids      bigint[]    DEFAULT NULL
+)
+RETURNS TABLE(room_id bigint, building_code text, room_number text)
+LANGUAGE sql
+STABLE
+SET search_path = public, pg_temp
+AS $function$
+  WITH at_korea AS (
     SELECT
-      now() AT TIME ZONE 'Asia/Seoul' AS now_ts,
-      (now() AT TIME ZONE 'Asia/Seoul')::time AS t,
-      CASE
-        WHEN extract(isodow FROM now() AT TIME ZONE 'Asia/Seoul') = 1 THEN '월'::day_of_week
-        WHEN extract(isodow FROM now() AT TIME ZONE 'Asia/Seoul') = 2 THEN '화'::day_of_week
-        WHEN extract(isodow FROM now() AT TIME ZONE 'Asia/Seoul') = 3 THEN '수'::day_of_week
-        WHEN extract(isodow FROM now() AT TIME ZONE 'Asia/Seoul') = 4 THEN '목'::day_of_week
-        WHEN extract(isodow FROM now() AT TIME ZONE 'Asia/Seoul') = 5 THEN '금'::day_of_week
-        WHEN extract(isodow FROM now() AT TIME ZONE 'Asia/Seoul') = 6 THEN '토'::day_of_week
-        ELSE '일'::day_of_week
-      END AS dow
+      (p_at AT TIME ZONE 'Asia/Seoul')::time AS t,
+      (enum_range(NULL::public.day_of_week))[extract(isodow FROM p_at AT TIME ZONE 'Asia/Seoul')::int] AS dow
   )
-  SELECT
-    r.id         AS room_id,
-    b.code       AS building_code,
-    r.room_number
+  SELECT r.id, b.code, r.room_number
   FROM public.rooms r
-  JOIN public.buildings b
-    ON r.building_id = b.id
-  CROSS JOIN now_korea n
-  WHERE
-    -- if p_building_code is given, limit to that building
-    (p_building_code IS NULL OR b.code = p_building_code)
+  JOIN public.buildings b ON b.id = r.building_id
+  CROSS JOIN at_korea n
+  WHERE (p_building_code IS NULL OR b.code = p_building_code)
+    AND (p_room_ids IS NULL OR r.id = ANY(p_room_ids))
     -- not in a scheduled class
     AND NOT EXISTS (
       SELECT 1
       FROM public.timetable_entries te
       WHERE te.room_id = r.id
         AND te.day = n.dow
-        AND n.t BETWEEN te.start_time AND te.end_time
+        AND te.start_time <= n.t
+        AND te.end_time > n.t
     )
     -- not reserved at this moment
     AND NOT EXISTS (
@@ -54,28 +164,152 @@ BEGIN
       FROM public.reservations rs
       WHERE rs.room_id = r.id
         AND rs.status = 'confirmed'
-        AND n.now_ts BETWEEN rs.start_at AND rs.end_at
+        AND rs.start_at <= p_at
+        AND rs.end_at > p_at
     )
-  ORDER BY r.room_number;
-END;
+  ORDER BY r.id;
 $function$;
 
 -- =====================================================
--- 2) handle_new_user trigger
---    Automatically create a profile row when a new auth user is created
+-- 6) rooms_free_for_slots
+--    Rooms free in every requested slot.
+--    Slots are parallel arrays: p_days[i] ('월'..'일', NULL = every day), p_starts[i], p_ends[i].
+--    With p_date, every slot is checked on that date (its weekday) and
+--    confirmed reservations on that date are checked as well.
 -- =====================================================
-CREATE OR REPLACE FUNCTION public.handle_new_user()
-RETURNS trigger
-LANGUAGE plpgsql
-SECURITY DEFINER
+CREATE OR REPLACE FUNCTION public.rooms_free_for_slots(
+  p_days          text[],
+  p_starts        time[],
+  p_ends          time[],
+  p_building_code text     DEFAULT NULL,
+  p_room_ids      bigint[] DEFAULT NULL,
+  p_date          date     DEFAULT NULL
+)
+RETURNS TABLE(room_id bigint, building_code text, room_number text)
+LANGUAGE sql
+STABLE
+SET search_path = public, pg_temp
 AS $function$
-BEGIN
-  -- Create a profile row for this new auth user.
-  -- Only 'id' is required; other columns use defaults.
-  INSERT INTO public.profiles (id)
-  VALUES (NEW.id)
-  ON CONFLICT (id) DO NOTHING;  -- avoid error if row already exists
+  WITH slots AS (
+    SELECT
+      CASE
+        WHEN p_date IS NOT NULL
+          THEN (enum_range(NULL::public.day_of_week))[extract(isodow FROM p_date)::int]
+        ELSE s.day::public.day_of_week
+      END AS dow,
+      s.start_time,
+      s.end_time
+    FROM unnest(p_days, p_starts, p_ends) AS s(day, start_time, end_time)
+  )
+  SELECT r.id, b.code, r.room_number
+  FROM public.rooms r
+  JOIN public.buildings b ON b.id = r.building_id
+  WHERE (p_building_code IS NULL OR b.code = p_building_code)
+    AND (p_room_ids IS NULL OR r.id = ANY(p_room_ids))
+    AND NOT EXISTS (
+      SELECT 1
+      FROM slots s
+      JOIN public.timetable_entries te
+        ON te.room_id = r.id
+       AND (s.dow IS NULL OR te.day = s.dow)
+       AND te.start_time < s.end_time
+       AND te.end_time > s.start_time
+    )
+    AND (p_date IS NULL OR NOT EXISTS (
+      SELECT 1
+      FROM slots s
+      JOIN public.reservations rs
+        ON rs.room_id = r.id
+       AND rs.status = 'confirmed'
+       AND rs.start_at < (p_date + s.end_time) AT TIME ZONE 'Asia/Seoul'
+       AND rs.end_at > (p_date + s.start_time) AT TIME ZONE 'Asia/Seoul'
+    ))
+  ORDER BY r.id;
+$function$;
 
-  RETURN NEW;
-END;
+-- =====================================================
+-- 7) room_free_slots
+--    Free gaps per room per day between p_start and p_end, for every date in [p_from, p_to].
+--    Busy = classes on that weekday + confirmed reservations on that date, merged with
+--    a running max of end times (gaps and islands). Gaps shorter than p_min_minutes are dropped.
+--    Days without any free gap return no rows.
+-- =====================================================
+CREATE OR REPLACE FUNCTION public.room_free_slots(
+  p_from          date,
+  p_to            date,
+  p_start         time     DEFAULT '09:00',
+  p_end           time     DEFAULT '20:00',
+  p_building_code text     DEFAULT NULL,
+  p_room_ids      bigint[] DEFAULT NULL,
+  p_min_minutes   integer  DEFAULT 0
+)
+RETURNS TABLE(room_id bigint, day date, slot_start time, slot_end time)
+LANGUAGE sql
+STABLE
+SET search_path = public, pg_temp
+AS $function$
+  WITH target_rooms AS (
+    SELECT r.id
+    FROM public.rooms r
+    JOIN public.buildings b ON b.id = r.building_id
+    WHERE (p_building_code IS NULL OR b.code = p_building_code)
+      AND (p_room_ids IS NULL OR r.id = ANY(p_room_ids))
+  ),
+  days AS (
+    SELECT
+      d::date AS day,
+      (enum_range(NULL::public.day_of_week))[extract(isodow FROM d)::int] AS dow,
+      d::date + p_start AS window_start,
+      d::date + p_end   AS window_end
+    FROM generate_series(p_from::timestamp, p_to::timestamp, interval '1 day') AS d
+  ),
+  busy AS (
+    -- scheduled classes on that weekday
+    SELECT tr.id AS room_id, d.day, d.day + te.start_time AS s, d.day + te.end_time AS e
+    FROM target_rooms tr
+    CROSS JOIN days d
+    JOIN public.timetable_entries te
+      ON te.room_id = tr.id
+     AND te.day = d.dow
+     AND te.start_time < p_end
+     AND te.end_time > p_start
+    UNION ALL
+    -- confirmed reservations overlapping that date's window (KST wall clock)
+    SELECT tr.id, d.day, rs.start_at AT TIME ZONE 'Asia/Seoul', rs.end_at AT TIME ZONE 'Asia/Seoul'
+    FROM target_rooms tr
+    CROSS JOIN days d
+    JOIN public.reservations rs
+      ON rs.room_id = tr.id
+     AND rs.status = 'confirmed'
+     AND rs.start_at < d.window_end AT TIME ZONE 'Asia/Seoul'
+     AND rs.end_at > d.window_start AT TIME ZONE 'Asia/Seoul'
+    UNION ALL
+    -- zero-length markers at both window edges so leading / trailing gaps are found
+    SELECT tr.id, d.day, edge, edge
+    FROM target_rooms tr
+    CROSS JOIN days d
+    CROSS JOIN LATERAL (VALUES (d.window_start), (d.window_end)) AS edges(edge)
+  ),
+  clipped AS (
+    SELECT bz.room_id, bz.day, greatest(bz.s, d.window_start) AS s, least(bz.e, d.window_end) AS e
+    FROM busy bz
+    JOIN days d ON d.day = bz.day
+  ),
+  ordered AS (
+    SELECT
+      c.room_id,
+      c.day,
+      c.s,
+      max(c.e) OVER (
+        PARTITION BY c.room_id, c.day
+        ORDER BY c.s, c.e
+        ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+      ) AS free_from
+    FROM clipped c
+  )
+  SELECT o.room_id, o.day, o.free_from::time, o.s::time
+  FROM ordered o
+  WHERE o.s > o.free_from
+    AND o.s - o.free_from >= make_interval(mins => p_min_minutes)
+  ORDER BY o.room_id, o.day, o.free_from;
 $function$;
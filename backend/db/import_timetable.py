@@ -0,0 +1,437 @@
+"""
+Final_timetable.csv → buildings / rooms / timetable_entries 일괄 임포터.
+
+import_timetable.sql(행마다 INSERT + raw_timetable_csv 스테이징)을 대체합니다.
+CSV 를 (건물, 강의실) 순으로 외부 정렬한 뒤(임시 파일), 강의실 단위로 묶은 batch 를 스트리밍하면서
+
+  1. 요일(day_of_week ENUM)·시간 형식 검증
+  2. 파일 안의 중복 행 / 같은 강의실·요일의 시간 겹침 검출
+  3. 없는 건물·강의실을 한 번에 upsert
+  4. 자연키 (room_id, day, start_time, end_time, course_code) 기준으로 바뀐 행만 일괄 upsert
+  5. (--prune) CSV 에 없는 같은 source 의 기존 행 삭제
+
+를 수행하며, 여러 번 실행해도 결과가 같습니다(idempotent).
+중복·겹침·기존 행 비교는 모두 강의실 안에서만 일어나므로, 메모리는 파일 크기가 아니라
+batch 크기(+ 강의실 수)에 비례합니다. 검사 메시지는 강의실 순으로 출력됩니다.
+schema.sql 의 uq_rooms_building_room, uq_timetable_natural_key 인덱스가 필요하며,
+DATA_BACKEND=supabase 와 SUPABASE_URL / SUPABASE_KEY 가 설정되어 있어야 합니다.
+
+    cd backend
+    python -m db.import_timetable db/Final_timetable.csv --dry-run
+    python -m db.import_timetable db/Final_timetable.csv --chunk-size 5000 --prune
+"""
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+import tempfile
+import time
+from itertools import groupby, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from postgrest.types import ReturnMethod
+
+from core.config import DATA_BACKEND, get_supabase, require_supabase_credentials
+from core.catalog import normalize_building_code, normalize_room_number
+from core.occupancy import DAYS, PAGE_SIZE, room_id_chunks
+
+NATURAL_KEY = ("room_id", "day", "start_time", "end_time", "course_code")
+VALUE_COLUMNS = ("course_name", "department", "instructor", "source")
+
+Key = Tuple[int, str, str, str, Optional[str]]
+
+# 외부 정렬 시 한 번에 메모리에서 정렬하는 행 수 (임시 파일 하나)
+SORT_RUN_ROWS = 100_000
+
+
+class ImportStats:
+    def __init__(self):
+        self.read = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self.overlaps = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.stale = 0
+        self.deleted = 0
+        self.buildings_created = 0
+        self.rooms_created = 0
+        self.started = time.perf_counter()
+
+    def report(self, dry_run: bool) -> str:
+        elapsed = time.perf_counter() - self.started
+        verb = "would be" if dry_run else ""
+        lines = [
+            f"rows read        {self.read}",
+            f"invalid          {self.invalid}",
+            f"duplicates       {self.duplicates}",
+            f"overlaps         {self.overlaps}",
+            f"buildings new    {self.buildings_created} {verb}".rstrip(),
+            f"rooms new        {self.rooms_created} {verb}".rstrip(),
+            f"inserted         {self.inserted} {verb}".rstrip(),
+            f"updated          {self.updated} {verb}".rstrip(),
+            f"unchanged        {self.unchanged}",
+            f"stale in DB      {self.stale}" + (f" (deleted {self.deleted})" if self.deleted else ""),
+            f"elapsed          {elapsed:.2f} s ({self.read / elapsed if elapsed else 0:,.0f} rows/s)",
+        ]
+        return "\n".join(lines)
+
+
+def _normalize_time(value: str) -> str:
+    """'9:00' / '09:00' / '09:00:00' → '09:00:00'"""
+    parts = value.strip().split(":")
+    if len(parts) not in (2, 3):
+        raise ValueError(f"invalid time '{value}'")
+    hour, minute = int(parts[0]), int(parts[1])
+    second = int(parts[2]) if len(parts) == 3 else 0
+    if not (0 <= hour < 24 and 0 <= minute < 60 and 0 <= second < 60):
+        raise ValueError(f"invalid time '{value}'")
+    return f"{hour:02d}:{minute:02d}:{second:02d}"
+
+
+def parse_row(row: dict) -> dict:
+    """CSV 한 행을 검증·정규화합니다. 잘못된 행이면 ValueError."""
+    day = (row.get("day") or "").strip()
+    if day not in DAYS:
+        raise ValueError(f"invalid day '{day}'")
+
+    start_time = _normalize_time(row.get("start_time") or "")
+    end_time = _normalize_time(row.get("end_time") or "")
+    if end_time <= start_time:
+        raise ValueError(f"end_time {end_time} is not after start_time {start_time}")
+
+    building = normalize_building_code(row.get("building") or "")
+    room = normalize_room_number(row.get("room") or "")
+    if not building or not room:
+        raise ValueError("missing building or room")
+
+    def clean(name):
+        value = (row.get(name) or "").strip()
+        return value or None
+
+    return {
+        "building": building,
+        "room": room,
+        "day": day,
+        "start_time": start_time,
+        "end_time": end_time,
+        "course_code": clean("code"),
+        "course_name": clean("course"),
+        "department": clean("department"),
+        "instructor": clean("professor"),
+    }
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[List[Tuple[int, dict]]]:
+    """(CSV 줄 번호, 행) 목록을 파일 순서대로 chunk_size 개씩 내보냅니다."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = enumerate(csv.DictReader(f), start=2)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def _room_key(row: dict) -> Tuple[str, str]:
+    return normalize_building_code(row.get("building") or ""), normalize_room_number(row.get("room") or "")
+
+
+def read_sorted(path: str, run_rows: int = SORT_RUN_ROWS) -> Iterator[Tuple[int, dict]]:
+    """
+    (CSV 줄 번호, 행) 을 (건물, 강의실, 줄 번호) 순으로 내보냅니다.
+    run_rows 행씩 정렬해 임시 파일에 쓰고 heapq.merge 로 합치므로 메모리는 run_rows 행 + 파일당 한 행입니다.
+    """
+    runs = []
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = enumerate(csv.DictReader(f), start=2)
+            while True:
+                run = list(islice(rows, run_rows))
+                if not run:
+                    break
+                run.sort(key=lambda item: (_room_key(item[1]), item[0]))
+                tmp = tempfile.TemporaryFile("w+", encoding="utf-8")
+                for item in run:
+                    tmp.write(json.dumps(item, ensure_ascii=False) + "\n")
+                tmp.seek(0)
+                runs.append(tmp)
+
+        streams = [(json.loads(line) for line in tmp) for tmp in runs]
+        for line_no, row in heapq.merge(*streams, key=lambda item: (_room_key(item[1]), item[0])):
+            yield line_no, row
+    finally:
+        for tmp in runs:
+            tmp.close()
+
+
+def room_batches(rows: Iterable[Tuple[int, dict]], batch_size: int) -> Iterator[List[Tuple[int, dict]]]:
+    """정렬된 행을 약 batch_size 행씩 묶습니다. 한 강의실의 행은 항상 같은 batch 에 들어갑니다."""
+    batch: List[Tuple[int, dict]] = []
+    for _, room_rows in groupby(rows, key=lambda item: _room_key(item[1])):
+        batch.extend(room_rows)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _iter_rows(table: str, columns: str, room_ids: Optional[List[int]] = None, **filters) -> Iterator[dict]:
+    """id 키셋 페이지네이션 (읽는 도중 앞쪽 행을 지워도 건너뛰는 행이 없음)."""
+    last_id = 0
+    while True:
+        query = get_supabase().table(table).select(columns).gt("id", last_id)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        if room_ids is not None:
+            query = query.in_("room_id", room_ids)
+        page = query.order("id").limit(PAGE_SIZE).execute().data or []
+        yield from page
+        if len(page) < PAGE_SIZE:
+            return
+        last_id = page[-1]["id"]
+
+
+def _fetch_all(table: str, columns: str, **filters) -> List[dict]:
+    return list(_iter_rows(table, columns, **filters))
+
+
+def _batched(items: List[dict], size: int) -> Iterator[List[dict]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class TimetableImporter:
+    def __init__(self, source: str, chunk_size: int, dry_run: bool, strict: bool):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.strict = strict
+        self.stats = ImportStats()
+
+        # 현재 DB 상태 (건물·강의실 ID). 기존 시간표는 batch 마다 그 강의실들만 읽음
+        self.building_ids: Dict[str, int] = {
+            b["code"]: b["id"] for b in _fetch_all("buildings", "id, code")
+        }
+        self.room_ids: Dict[Tuple[int, str], int] = {
+            (r["building_id"], normalize_room_number(r["room_number"])): r["id"]
+            for r in _fetch_all("rooms", "id, building_id, room_number")
+        }
+        # CSV 에 나온 강의실 (나머지 강의실의 기존 행은 finish 에서 stale 처리)
+        self.rooms_done: Set[int] = set()
+
+        # 가짜 ID (dry-run 에서 새로 생길 건물·강의실)
+        self._next_fake_id = -1
+
+    def _fake_id(self) -> int:
+        self._next_fake_id -= 1
+        return self._next_fake_id
+
+    def log(self, line_no: int, message: str):
+        print(f"line {line_no}: {message}", file=sys.stderr)
+
+    def diff(self, mark: str, row: dict):
+        """dry-run 일 때 변경 예정 행을 '+ / ~ / -' 로 출력합니다."""
+        if self.dry_run:
+            print(
+                f"{mark} {row.get('building', '')}-{row.get('room', row.get('room_id'))} {row['day']} "
+                f"{row['start_time']}-{row['end_time']} {row.get('course_code') or ''} {row.get('course_name') or ''}"
+            )
+
+    # ----------------------------------------
+    # 건물·강의실 일괄 생성
+    # ----------------------------------------
+    def ensure_rooms(self, rows: List[dict]):
+        new_buildings = sorted({r["building"] for r in rows} - self.building_ids.keys())
+        if new_buildings:
+            self.stats.buildings_created += len(new_buildings)
+            if self.dry_run:
+                self.building_ids.update({code: self._fake_id() for code in new_buildings})
+            else:
+                res = get_supabase().table("buildings").upsert(
+                    [{"code": code, "name": f"{code}관"} for code in new_buildings],
+                    on_conflict="code",
+                ).execute()
+                self.building_ids.update({b["code"]: b["id"] for b in res.data})
+
+        new_rooms = sorted({
+            (self.building_ids[r["building"]], r["room"]) for r in rows
+        } - self.room_ids.keys())
+        if new_rooms:
+            self.stats.rooms_created += len(new_rooms)
+            if self.dry_run:
+                self.room_ids.update({key: self._fake_id() for key in new_rooms})
+            else:
+                res = get_supabase().table("rooms").upsert(
+                    [{"building_id": b, "room_number": n} for b, n in new_rooms],
+                    on_conflict="building_id,room_number",
+                ).execute()
+                self.room_ids.update({(r["building_id"], r["room_number"]): r["id"] for r in res.data})
+
+    def existing_entries(self, room_ids: List[int]) -> Dict[int, Dict[Key, dict]]:
+        """이 batch 강의실들의 (이 source) 기존 시간표: room_id → 자연키 → 행."""
+        existing: Dict[int, Dict[Key, dict]] = {room_id: {} for room_id in room_ids}
+        real_ids = [room_id for room_id in room_ids if room_id > 0]  # dry-run 가짜 ID 는 DB 에 없음
+        columns = "id, " + ", ".join(NATURAL_KEY + VALUE_COLUMNS)
+        for chunk in room_id_chunks(real_ids):
+            for e in _iter_rows("timetable_entries", columns, chunk, source=self.source):
+                existing[e["room_id"]][tuple(e[c] for c in NATURAL_KEY)] = e
+        return existing
+
+    # ----------------------------------------
+    # 중복·겹침 검사 (강의실 하나 안에서)
+    # ----------------------------------------
+    def check_overlap(self, intervals: Dict[str, List[Tuple[str, str, Optional[str], int]]], line_no: int, row: dict) -> bool:
+        """같은 요일에 이미 읽은 수업과 겹치면 True (완전히 같은 행은 중복으로 별도 처리)."""
+        day_intervals = intervals.setdefault(row["day"], [])
+        for start, end, code, other_line in day_intervals:
+            if row["start_time"] < end and start < row["end_time"]:
+                self.log(line_no, f"overlaps line {other_line} ({code}) in {row['building']}-{row['room']} {row['day']}")
+                self.stats.overlaps += 1
+                if self.strict:
+                    return True
+        day_intervals.append((row["start_time"], row["end_time"], row["course_code"], line_no))
+        return False
+
+    def diff_room(self, room_id: int, rows: List[Tuple[int, dict]], existing: Dict[Key, dict]) -> Tuple[List[dict], List[dict]]:
+        """강의실 하나의 CSV 행과 기존 행을 비교해 (upsert 할 행, stale 기존 행) 을 반환합니다."""
+        seen: Set[Key] = set()
+        intervals: Dict[str, List[Tuple[str, str, Optional[str], int]]] = {}
+        upserts = []
+        for line_no, row in rows:
+            key = (room_id, row["day"], row["start_time"], row["end_time"], row["course_code"])
+            if key in seen:
+                self.stats.duplicates += 1
+                self.log(line_no, "duplicate row")
+                continue
+            if self.check_overlap(intervals, line_no, row):
+                continue
+            seen.add(key)
+
+            record = {
+                "room_id": room_id,
+                "day": row["day"],
+                "start_time": row["start_time"],
+                "end_time": row["end_time"],
+                "course_code": row["course_code"],
+                "course_name": row["course_name"],
+                "department": row["department"],
+                "instructor": row["instructor"],
+                "source": self.source,
+            }
+            current = existing.get(key)
+            if current is None:
+                self.stats.inserted += 1
+                self.diff("+", row)
+            elif any(current.get(c) != record[c] for c in VALUE_COLUMNS):
+                self.stats.updated += 1
+                self.diff("~", row)
+            else:
+                self.stats.unchanged += 1
+                continue
+            upserts.append(record)
+
+        stale = [e for key, e in existing.items() if key not in seen]
+        return upserts, stale
+
+    # ----------------------------------------
+    # batch 처리 (강의실 단위로 묶인 행)
+    # ----------------------------------------
+    def process_batch(self, batch: List[Tuple[int, dict]], prune: bool):
+        parsed: List[Tuple[int, dict]] = []
+        for line_no, raw in batch:
+            self.stats.read += 1
+            try:
+                parsed.append((line_no, parse_row(raw)))
+            except ValueError as e:
+                self.stats.invalid += 1
+                self.log(line_no, str(e))
+
+        self.ensure_rooms([row for _, row in parsed])
+
+        by_room: Dict[int, List[Tuple[int, dict]]] = {}
+        for line_no, row in parsed:
+            room_id = self.room_ids[(self.building_ids[row["building"]], row["room"])]
+            by_room.setdefault(room_id, []).append((line_no, row))
+        existing = self.existing_entries(list(by_room))
+
+        upserts: List[dict] = []
+        stale: List[dict] = []
+        for room_id, rows in by_room.items():
+            room_upserts, room_stale = self.diff_room(room_id, rows, existing[room_id])
+            upserts.extend(room_upserts)
+            stale.extend(room_stale)
+        self.rooms_done.update(by_room)
+
+        if upserts and not self.dry_run:
+            for batch_rows in _batched(upserts, PAGE_SIZE):
+                get_supabase().table("timetable_entries").upsert(
+                    batch_rows,
+                    on_conflict=",".join(NATURAL_KEY),
+                    returning=ReturnMethod.minimal,
+                ).execute()
+        self.remove_stale(stale, prune)
+
+    def remove_stale(self, stale: List[dict], prune: bool):
+        self.stats.stale += len(stale)
+        for e in stale:
+            self.diff("-", e)
+        if prune and stale and not self.dry_run:
+            ids = [e["id"] for e in stale]
+            for i in range(0, len(ids), PAGE_SIZE):
+                get_supabase().table("timetable_entries").delete().in_("id", ids[i:i + PAGE_SIZE]).execute()
+            self.stats.deleted += len(ids)
+
+    def finish(self, prune: bool):
+        """CSV 에 한 번도 나오지 않은 강의실의 기존 행 (페이지 단위로 처리)."""
+        columns = "id, " + ", ".join(NATURAL_KEY + VALUE_COLUMNS)
+        page: List[dict] = []
+        for e in _iter_rows("timetable_entries", columns, source=self.source):
+            if e["room_id"] not in self.rooms_done:
+                page.append(e)
+            if len(page) >= PAGE_SIZE:
+                self.remove_stale(page, prune)
+                page = []
+        self.remove_stale(page, prune)
+
+    def run(self, path: str, prune: bool) -> ImportStats:
+        for batch in room_batches(read_sorted(path, max(self.chunk_size, SORT_RUN_ROWS)), self.chunk_size):
+            self.process_batch(batch, prune)
+        self.finish(prune)
+        return self.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path", help="시간표 CSV (day,start_time,end_time,code,course,department,professor,room,building)")
+    parser.add_argument("--source", help="timetable_entries.source 값 (기본: CSV 파일 이름)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="한 번에 처리할 CSV 행 수 (강의실 단위로 묶음)")
+    parser.add_argument("--dry-run", action="store_true", help="DB를 바꾸지 않고 변경 예정 내역만 출력")
+    parser.add_argument("--prune", action="store_true", help="CSV에 없는 같은 source 의 기존 시간표 삭제")
+    parser.add_argument("--strict", action="store_true", help="시간이 겹치는 행은 가져오지 않음")
+    args = parser.parse_args()
+
+    # 임포터는 실제 Supabase DB 에만 씁니다 (local 백엔드는 서버 프로세스 메모리 안에만 있음)
+    if DATA_BACKEND != "supabase":
+        parser.error(f"requires DATA_BACKEND=supabase (got '{DATA_BACKEND}')")
+    try:
+        require_supabase_credentials()
+    except ValueError as e:
+        parser.error(str(e))
+
+    importer = TimetableImporter(
+        source=args.source or os.path.basename(args.csv_path),
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run,
+        strict=args.strict,
+    )
+    stats = importer.run(args.csv_path, args.prune)
+    print(stats.report(args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+-- realtime.sql
+-- Classroom Informer – Supabase Realtime setup for the backend change listener
+--
+-- The backend (core/realtime.py) subscribes to postgres_changes on
+-- reservations and timetable_entries to invalidate its caches room by room
+-- and to push live room status over /live/rooms (SSE) and /live/ws.
+
+-- Stream both tables through the Realtime publication
+ALTER PUBLICATION supabase_realtime ADD TABLE public.reservations;
+ALTER PUBLICATION supabase_realtime ADD TABLE public.timetable_entries;
+
+-- Include the full old row in UPDATE / DELETE events.
+-- Without this a delete only carries the primary key, so the backend cannot
+-- tell which room changed and has to drop every cached reservation week.
+ALTER TABLE public.reservations REPLICA IDENTITY FULL;
+ALTER TABLE public.timetable_entries REPLICA IDENTITY FULL;
@@ -1,10 +1,65 @@
-from fastapi import FastAPI
-from api import auth, favorites, notifications, student_timetable, info
+import time
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import JSONResponse
+from api import auth, favorites, notifications, student_timetable, info, sync, metrics, live, health
+from core.config import NOTIFICATION_SCHEDULER_ENABLED, METRICS_ENABLED, PROFILING_ENABLED, REALTIME_ENABLED, DB_RESILIENCE_ENABLED, DB_BREAKER_RESET_SECONDS, WARMUP_BLOCKING, WARMUP_TIMEOUT_SECONDS
+from core.database import close_db
+from core.notification_scheduler import NotificationScheduler
+from core.notification_sinks import create_sink
+from core.metrics import MetricsMiddleware
+from core.profiling import ProfilingMiddleware
+from core.resilience import StalenessMiddleware, UpstreamUnavailable
+from core.realtime import ChangeListener, tracker
+from core.warmup import warmup
+
+logger = logging.getLogger(__name__)
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("startup: modules imported in %.1fms", IMPORT_SECONDS * 1000)
+
+    # 카탈로그·시간표 인덱스·점유 비트맵을 병렬로 예열 (GET /readyz 로 진행 상황 확인).
+    # WARMUP_BLOCKING 이면 끝날 때까지 연결을 받지 않아, 워커가 차가운 캐시로 첫 요청을 처리하지 않음
+    warmup_task = asyncio.create_task(warmup.run_until_ready())
+    if WARMUP_BLOCKING:
+        try:
+            await asyncio.wait_for(asyncio.shield(warmup_task), WARMUP_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("startup: warm-up not finished after %.0fs, accepting connections (readyz stays 503)", WARMUP_TIMEOUT_SECONDS)
+
+    # 즐겨찾기 알림을 서버에서 일괄 평가해 푸시 (앱 폴링 대체)
+    if NOTIFICATION_SCHEDULER_ENABLED:
+        app.state.notification_scheduler = NotificationScheduler(create_sink())
+        app.state.notification_scheduler.start()
+
+    # reservations / timetable_entries 변경 구독 → 강의실 단위 캐시 무효화 + /live 상태 푸시
+    if REALTIME_ENABLED:
+        app.state.change_listener = ChangeListener(tracker)
+        await app.state.change_listener.start()
+
+    yield
+
+    listener = getattr(app.state, "change_listener", None)
+    if listener:
+        await listener.stop()
+    scheduler = getattr(app.state, "notification_scheduler", None)
+    if scheduler:
+        await scheduler.stop()
+    warmup_task.cancel()
+    await close_db()
 
 app = FastAPI(
     title="Classroom Informer API",
     description="Backend API for Team 7 Classroom Informer Project",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # 라우터 등록
@@ -13,6 +68,43 @@ app.include_router(info.router)           # /info
 app.include_router(favorites.router)      # /favorites (Protected)
 app.include_router(notifications.router)  # /notifications (Protected)
 app.include_router(student_timetable.router) #/timetable (Protected)
+app.include_router(sync.router)           # /sync/changes
+if REALTIME_ENABLED:
+    # 변경 구독(ChangeListener)이 없으면 상태가 갱신되지 않으므로 /live 자체를 열지 않음
+    app.include_router(live.router)       # /live/rooms (SSE), /live/ws (WebSocket)
+app.include_router(health.router)         # /healthz, /readyz
+
+# upstream 장애 시 마지막 정상 결과로 응답한 경우 X-Data-Staleness 헤더 (core/resilience.py)
+if DB_RESILIENCE_ENABLED:
+    app.add_middleware(StalenessMiddleware)
+
+def unavailable_response(exc: UpstreamUnavailable) -> JSONResponse:
+    # 회로가 열려 있고 이전 결과도 없으면 기다리지 않고 503
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Database unavailable: {exc}"},
+        headers={"Retry-After": str(int(DB_BREAKER_RESET_SECONDS))},
+    )
+
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable(request, exc: UpstreamUnavailable):
+    return unavailable_response(exc)
+
+@app.exception_handler(HTTPException)
+async def upstream_unavailable_in_handler(request, exc: HTTPException):
+    # 라우터가 except Exception 으로 감싼 500 (Database error) 도 원인이 회로 열림이면 503
+    if exc.status_code == 500 and isinstance(exc.__context__, UpstreamUnavailable):
+        return unavailable_response(exc.__context__)
+    return await http_exception_handler(request, exc)
+
+# 요청 계측: 라우트별 지연 히스토그램, 상태 코드, upstream 호출 수 (GET /metrics)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router)    # /metrics
+
+# 요청 프로파일링 (opt-in): 관리자 요청의 X-Profile 헤더 또는 PROFILE_SAMPLE_RATE → PROFILE_DIR
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 
 @app.get("/")
 def root():
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Any
 from datetime import time, datetime
 
 # --- Buildings 모델 ---
@@ -39,25 +39,94 @@ class FreeSlotDto(BaseModel):
     start: str
     end: str
 
+class RoomSearchResult(BaseModel):
+    room_id: int
+    building_code: str
+    room_number: str
+    capacity: Optional[int] = None
+    room_type: Optional[str] = None
+    features: Optional[str] = None
+    free_from: str      # "HH:MM" (검색 시작 시각)
+    free_until: str     # "HH:MM" (다음 수업·예약 시작 또는 검색 종료 시각)
+    free_minutes: int
+
+class GapClassDto(BaseModel):
+    course_name: Optional[str] = None
+    start: str  # "HH:MM"
+    end: str
+    room_id: Optional[int] = None
+    building_code: Optional[str] = None
+    room_number: Optional[str] = None
+
+class GapRoomDto(BaseModel):
+    room_id: int
+    building_code: str
+    room_number: str
+    same_building: bool  # 앞뒤 수업과 같은 건물인지
+
+class TimetableGapDto(BaseModel):
+    day: str
+    date: Optional[str] = None  # "YYYY-MM-DD" (날짜로 조회한 경우, 예약 반영)
+    start: str  # "HH:MM"
+    end: str
+    minutes: int
+    previous_class: GapClassDto
+    next_class: GapClassDto
+    rooms: List[GapRoomDto]
+
 class FreeSlotsResponseDto(BaseModel):
     building_code: str
     room_number: str
     free_slots_by_day: Dict[str, List[FreeSlotDto]]
+    free_slots_by_date: Optional[Dict[str, List[FreeSlotDto]]] = None  # start_date 지정 시 "YYYY-MM-DD" → 빈 시간
+
+# --- 변경 피드(Delta Sync) 모델 ---
+class ChangeEntry(BaseModel):
+    table: str  # 'reservations' | 'timetable_entries'
+    id: int
+    op: str     # 'insert' | 'update' | 'cancel' | 'delete'
+    version: int
+    data: Optional[Dict[str, Any]] = None  # delete 인 경우 None
+
+class ChangeFeedResponse(BaseModel):
+    cursor: int      # 다음 요청의 since 값
+    has_more: bool   # true 이면 cursor 로 바로 다시 요청
+    changes: List[ChangeEntry]
 
 # --- 즐겨찾기 관련 모델 ---
 class FavoriteToggleRequest(BaseModel):
     room_id: int
 
+# 한 번에 추가/삭제할 수 있는 강의실 수 상한
+MAX_FAVORITES_BATCH = 500
+
+class FavoriteBatchRequest(BaseModel):
+    # 같은 room_id 가 양쪽에 있으면 추가가 우선
+    add: List[int] = Field(default_factory=list, max_length=MAX_FAVORITES_BATCH)
+    remove: List[int] = Field(default_factory=list, max_length=MAX_FAVORITES_BATCH)
+
+class FavoriteBatchResponse(BaseModel):
+    # 실제로 바뀐 room_id 만 포함 (이미 같은 상태였거나 없는 강의실은 제외)
+    added: List[int]
+    removed: List[int]
+
 class RoomDetail(BaseModel):
     id: int
     room_number: str
     building_code: str # building 테이블 조인 결과
 
+class RoomAvailability(BaseModel):
+    status: str                          # "free" | "occupied"
+    occupied_by: Optional[str] = None    # "class" | "reservation"
+    next_change: Optional[str] = None    # 다음 상태 변경 시각 "HH:MM" (오늘 안에 없으면 None)
+    free_slots_today: List[FreeSlotDto]  # 오늘 사용 가능 시간대 중 빈 구간
+
 class FavoriteResponse(BaseModel):
     user_id: str
     room_id: int
     created_at: datetime
     room: Optional[RoomDetail] = None # 상세 정보 포함
+    availability: Optional[RoomAvailability] = None # include_status=true 일 때만
 
 # --- 알림 설정 관련 모델 ---
 class NotificationCheckRequest(BaseModel):
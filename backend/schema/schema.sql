@@ -134,6 +134,22 @@ create table if not exists public.timetable_entries (
   created_at  timestamptz default now()
 );
 
+-- =========================
+-- TABLE: student_timetable
+-- (each student's own classes, read by GET /timetable and /timetable/gaps)
+-- =========================
+create table if not exists public.student_timetable (
+  id          bigint generated always as identity primary key,
+  student_id  uuid   not null references public.profiles(id) on delete cascade,
+  day         public.day_of_week not null,
+  start_time  time not null,
+  end_time    time not null,
+  course_code text,
+  course_name text,
+  room_id     bigint references public.rooms(id) on delete set null,
+  created_at  timestamptz default now()
+);
+
 -- Helpful indexes for queries
 create index if not exists idx_rooms_building_room
   on public.rooms (building_id, room_number);
@@ -147,6 +163,17 @@ create index if not exists idx_reservations_room_time
 create index if not exists idx_favorites_user
   on public.favorites (user_id);
 
+create index if not exists idx_student_timetable_student_day_time
+  on public.student_timetable (student_id, day, start_time);
+
+-- Natural keys used by the bulk importer (db/import_timetable.py) for upserts
+create unique index if not exists uq_rooms_building_room
+  on public.rooms (building_id, room_number);
+
+create unique index if not exists uq_timetable_natural_key
+  on public.timetable_entries (room_id, day, start_time, end_time, course_code)
+  nulls not distinct;
+
 -- 1) Needed once per database
 CREATE EXTENSION IF NOT EXISTS btree_gist;
 